@@ -0,0 +1,53 @@
+"""Benchmark: limpiar_texto (NFD carácter a carácter) vs motor con tabla + memo.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_limpiar_texto.py [--cells 500000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.day1.text_normalizer import _strip_marks_nfd, limpiar_texto_rapido, quitar_acentos  # noqa: E402
+
+
+def reference(texto):
+    return _strip_marks_nfd(texto.strip())
+
+
+def make_cells(n, distinct=5000, seed=7):
+    """Celdas tipo CSV: pocas variantes distintas que se repiten mucho."""
+    rng = random.Random(seed)
+    words = ["Tecnología", "Hogar", "Lámpara", "Jardín", "Camión", "Ana López", "Pingüino",
+             "Madrid", "Málaga", "Cádiz", "Ñandú", "Electrónica", "Teclado", "Plaza España"]
+    variants = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f" {i}"
+                for i in range(distinct)]
+    return [rng.choice(variants) for _ in range(n)]
+
+
+def timeit(fn, cells):
+    t0 = time.perf_counter()
+    for c in cells:
+        fn(c)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cells", type=int, default=500_000)
+    args = parser.parse_args()
+
+    cells = make_cells(args.cells)
+    base = timeit(reference, cells)
+    table = timeit(lambda c: quitar_acentos(c.strip()), cells)
+    limpiar_texto_rapido.cache_clear()
+    memo = timeit(limpiar_texto_rapido, cells)
+    for name, t in (("NFD por carácter", base), ("tabla", table), ("tabla + memo", memo)):
+        print(f"{name:<18} {t:7.3f} s  x{base / t:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: ensamblado MIME mensaje a mensaje vs CampaignMessageBuilder.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_mailer_build.py [--recipients 10000] [--attach data/informe.xlsx]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from email.message import EmailMessage
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.day3 import mailer  # noqa: E402
+from src.day3.message_builder import CampaignMessageBuilder  # noqa: E402
+
+
+def legacy(n, tmpl, attachments):
+    for i in range(n):
+        html = tmpl.render(nombre=f"Cliente {i}")
+        msg = EmailMessage()
+        msg["From"] = "rpa@example.com"
+        msg["To"] = f"c{i}@example.com"
+        msg["Subject"] = f"Informe de ventas - Cliente {i}"
+        msg.set_content(mailer._simple_text_from_html(html))
+        msg.add_alternative(html, subtype="html")
+        for a in attachments:
+            mailer._attach_file_to_msg(msg, a)
+        msg.as_bytes()
+
+
+def campaign(n, tmpl, attachments):
+    builder = CampaignMessageBuilder(attachments, from_addr="rpa@example.com")
+    for i in range(n):
+        html = tmpl.render(nombre=f"Cliente {i}")
+        builder.build(f"c{i}@example.com", f"Informe de ventas - Cliente {i}", html).as_bytes()
+
+
+def run(fn, *args):
+    # tiempo sin tracemalloc (su overhead distorsiona el throughput); memoria en una segunda pasada
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=10_000)
+    parser.add_argument("--attach", nargs="*", default=["data/informe.xlsx"])
+    args = parser.parse_args()
+
+    tmpl = mailer.env.get_template("email.html")
+    attachments = [Path(a) for a in args.attach]
+    for name, fn in (("mensaje a mensaje", legacy), ("builder de campaña", campaign)):
+        elapsed, peak = run(fn, args.recipients, tmpl, attachments)
+        print(f"{name:<20} {elapsed:8.2f} s  {args.recipients / elapsed:9.0f} msg/s  "
+              f"pico memoria {peak / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: latencia extremo a extremo de `rpa_lab pipeline` con el scraper en
+proceso vs en subproceso (intérprete nuevo + CSV + relectura).
+
+Sirve la página grabada de tests/fixtures/clima.html en local y apunta el mapa de
+ciudades a ella. Necesita Chrome y chromedriver (CHROMEDRIVER_PATH o webdriver_manager).
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_pipeline_modes.py [--runs 5] [--fast]
+"""
+import argparse
+import http.server
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def make_handler(template: str):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            slug = self.path.rsplit("/", 1)[-1]
+            body = template.format(ciudad=slug.title(), slug=slug, temperatura="21°", estado="Soleado")
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fast", action="store_true", help="Usar el modo rápido del scraper en ambos casos")
+    args = parser.parse_args()
+
+    template = (ROOT / "tests" / "fixtures" / "clima.html").read_text(encoding="utf-8")
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), make_handler(template))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mapa = Path(tmp) / "ciudades.json"
+        mapa.write_text(json.dumps({"Madrid": f"http://127.0.0.1:{server.server_address[1]}/clima/madrid"}))
+        os.environ["CIUDADES_JSON"] = str(mapa)  # lo hereda también el subproceso
+
+        from rpa_lab import pipeline
+        pipeline.DATA_DIR = Path(tmp)
+
+        print(f"runs={args.runs} fast={args.fast}")
+        for modo in pipeline.SCRAPER_MODES:
+            cmd = ["--city", "Madrid", "--force-scrape", "--retries", "1", "--scraper-mode", modo]
+            if args.fast:
+                cmd.append("--fast-scrape")
+            tiempos = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                rc = pipeline.main(cmd)
+                tiempos.append(time.perf_counter() - t0)
+                if rc != 0:
+                    raise SystemExit(f"pipeline devolvió {rc} en modo {modo}")
+            print(f"{modo:10s} media={statistics.mean(tiempos):6.2f} s  "
+                  f"p50={statistics.median(tiempos):6.2f} s  max={max(tiempos):6.2f} s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark: latencia por ciudad del scraper clásico vs modo rápido sobre una página local.
+
+La página de prueba (tests/fixtures/clima.html) se sirve en local con una hoja de
+estilos, imágenes, una fuente y un script de anuncios que tardan en responder,
+como la página real. Necesita Chrome y chromedriver (CHROMEDRIVER_PATH o
+webdriver_manager). Todavía no hay cifras medidas de este benchmark: la mejora del
+modo rápido sobre el clásico está sin cuantificar.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_scraper_latency.py [--pages 20] [--delay 0.3]
+"""
+import argparse
+import http.server
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.day5 import scraper  # noqa: E402
+
+CIUDADES = ["Madrid", "Sevilla", "Bilbao"]
+RECURSOS = """
+<link rel="stylesheet" href="/static/estilos.css" />
+<link rel="preload" as="font" href="/static/fuente.woff2" crossorigin="anonymous" />
+<script src="/ads/anuncios.js"></script>
+<img src="/static/mapa.png" /><img src="/static/radar.jpg" />
+"""
+
+
+def make_handler(template: str, delay: float):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/clima/"):
+                slug = self.path.rsplit("/", 1)[-1]
+                body = template.format(ciudad=slug.title(), slug=slug, temperatura="21°", estado="Soleado")
+                body = body.replace("</head>", RECURSOS + "</head>").encode("utf-8")
+                ctype = "text/html; charset=utf-8"
+            else:
+                time.sleep(delay)  # subrecursos lentos (CDN, anuncios)
+                body = b"/* */" if self.path.endswith((".css", ".js")) else b"\x00" * 2048
+                ctype = "application/octet-stream"
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def medir(driver, base_url, pages, espera):
+    tiempos = []
+    for i in range(pages):
+        ciudad = CIUDADES[i % len(CIUDADES)]
+        t0 = time.perf_counter()
+        scraper.extraer_clima(driver, ciudad, f"{base_url}/clima/{ciudad.lower()}", espera=espera)
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos
+
+
+def percentiles(tiempos):
+    q = statistics.quantiles(tiempos, n=100, method="inclusive")
+    return q[49], q[94]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.3, help="Latencia de cada subrecurso (s)")
+    args = parser.parse_args()
+
+    template = (ROOT / "tests" / "fixtures" / "clima.html").read_text(encoding="utf-8")
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), make_handler(template, args.delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    modos = [("clásico", dict(headless=True), scraper.ESPERA_CARGA),
+             ("rápido", dict(rapido=True), 0)]
+    print(f"páginas={args.pages} retardo subrecursos={args.delay}s")
+    for nombre, opciones, espera in modos:
+        driver = scraper.crear_driver(**opciones)
+        try:
+            tiempos = medir(driver, base_url, args.pages, espera)
+        finally:
+            driver.quit()
+        p50, p95 = percentiles(tiempos)
+        print(f"{nombre:8s} p50={p50 * 1000:8.1f} ms  p95={p95 * 1000:8.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark de arranque: tiempo de importación (`python -X importtime`) y de pared
+de `python -m rpa_lab pipeline --help` y de un dry-run sin scraping (observación en el almacén).
+
+Sale con código 1 si algún camino supera su presupuesto, para poder usarlo en CI.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_startup.py [--runs 5] [--budget-help-ms 200] [--budget-dry-run-ms 1500]
+"""
+import argparse
+import csv
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def run(args, runs):
+    """(mejor tiempo de pared, µs de importación del mejor run, 5 módulos top-level más caros)."""
+    best = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        res = subprocess.run([sys.executable, "-X", "importtime", "-m", "rpa_lab", "pipeline", *args],
+                             cwd=ROOT, capture_output=True, text=True)
+        wall = time.perf_counter() - t0
+        if res.returncode != 0:
+            raise SystemExit(f"rpa_lab pipeline {' '.join(args)} falló:\n{res.stderr[-2000:]}")
+        tops = [(int(m.group(2)), m.group(4)) for m in IMPORTTIME.finditer(res.stderr)
+                if len(m.group(3)) == 1]  # sólo imports de primer nivel
+        total = sum(us for us, _ in tops)
+        if best is None or wall < best[0]:
+            best = (wall, total, sorted(tops, reverse=True)[:5])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-help-ms", type=float, default=200)
+    parser.add_argument("--budget-dry-run-ms", type=float, default=1500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        from src.day5.observation_store import ObservationStore
+        with open(ROOT / "data" / "webdata.csv", encoding="utf-8-sig", newline="") as f, \
+                ObservationStore(Path(tmp) / "observaciones.sqlite") as store:
+            store.add(list(csv.DictReader(f)))
+        caminos = [
+            ("--help", ["--help"], args.budget_help_ms),
+            ("dry-run", ["--send", "--dry-run", "--format", "csv", "--data-dir", tmp], args.budget_dry_run_ms),
+        ]
+        fallos = 0
+        for nombre, cli, budget in caminos:
+            wall, imports_us, tops = run(cli, args.runs)
+            estado = "OK" if wall * 1000 <= budget else "EXCEDIDO"
+            fallos += estado != "OK"
+            print(f"{nombre:8s} pared={wall * 1000:7.1f} ms  imports={imports_us / 1000:7.1f} ms  "
+                  f"presupuesto={budget:.0f} ms  {estado}")
+            for us, mod in tops:
+                print(f"           {us / 1000:7.1f} ms  {mod}")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
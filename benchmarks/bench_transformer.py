@@ -0,0 +1,62 @@
+"""Benchmark: agregado de ventas con lambda por grupo vs columna vectorizada.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_transformer.py [--rows 10000000] [--days 365]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.day2 import transformer  # noqa: E402
+
+
+def make_sales(rows, days, seed=0):
+    rng = np.random.default_rng(seed)
+    fechas = pd.date_range("2020-01-01", periods=days).strftime("%Y-%m-%d").to_numpy()
+    categorias = np.array(["Tecnología", "Hogar", "Jardín", "Ropa", "Deporte", "Libros"])
+    return pd.DataFrame({
+        "fecha": fechas[rng.integers(0, days, rows)],
+        "categoria": categorias[rng.integers(0, len(categorias), rows)],
+        "precio": rng.integers(1, 1000, rows).astype("float64"),
+        "cantidad": rng.integers(1, 10, rows).astype("float64"),
+    })
+
+
+def legacy(valid_rows):
+    return (
+        valid_rows
+        .groupby(['fecha', 'categoria'])
+        .agg(total_ingresos=('precio', lambda x: (x * valid_rows.loc[x.index, 'cantidad']).sum()),
+             total_unidades=('cantidad', 'sum'))
+        .reset_index()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    df = make_sales(args.rows, args.days)
+    t0 = time.perf_counter()
+    old = legacy(df)
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = transformer.resumir(df)
+    t_new = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(old, new)
+    print(f"filas={args.rows:,} grupos={len(new):,}")
+    print(f"lambda por grupo   {t_old:7.2f} s")
+    print(f"vectorizado        {t_new:7.2f} s  x{t_old / t_new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: validación histórica (to_numeric + isnull) vs esquema compilado con máscara de bits.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_validation.py [--rows 10000000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.day2 import transformer  # noqa: E402
+
+COLS = ['fecha', 'categoria', 'producto', 'precio', 'cantidad']
+
+
+def make_raw(rows, seed=0):
+    """Ventas tal como llegan del CSV: precio/cantidad como texto con ~1% de errores."""
+    rng = np.random.default_rng(seed)
+    fechas = pd.date_range("2020-01-01", periods=365).strftime("%Y-%m-%d").to_numpy()
+    categorias = np.array(["Tecnología", "Hogar", "Jardín", "Ropa", None])
+    precio = rng.integers(1, 1000, rows).astype(str).astype(object)
+    precio[rng.random(rows) < 0.01] = "n/a"
+    return pd.DataFrame({
+        "fecha": fechas[rng.integers(0, 365, rows)],
+        "categoria": categorias[rng.integers(0, len(categorias), rows)],
+        "producto": np.array(["Silla", "Mesa", "Lámpara"])[rng.integers(0, 3, rows)],
+        "precio": precio,
+        "cantidad": rng.integers(1, 10, rows).astype(str),
+    })
+
+
+def legacy(df):
+    df = df.copy()
+    df['precio'] = pd.to_numeric(df['precio'], errors='coerce')
+    df['cantidad'] = pd.to_numeric(df['cantidad'], errors='coerce')
+    invalid_mask = df[COLS].isnull().any(axis=1)
+    return df[~invalid_mask].copy(), df[invalid_mask]
+
+
+def best_of(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_raw(args.rows)
+    (old_valid, old_invalid), t_old = best_of(legacy, df, args.repeat)
+    (new_valid, new_invalid), t_new = best_of(transformer.validar, df, args.repeat)
+
+    pd.testing.assert_frame_equal(old_valid, new_valid)
+    pd.testing.assert_frame_equal(old_invalid, new_invalid.drop(columns="motivo"))
+    print(f"filas={args.rows:,} rechazadas={len(new_invalid):,}")
+    print(f"histórica          {t_old:7.2f} s")
+    print(f"esquema + motivos  {t_new:7.2f} s  ({(t_new / t_old - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
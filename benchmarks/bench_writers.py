@@ -0,0 +1,71 @@
+"""Benchmark: tiempo y pico de memoria de cada backend de informe.
+
+Cada backend se mide en un proceso nuevo (ru_maxrss incluye las reservas en C
+de openpyxl/pyarrow, que tracemalloc no ve).
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_writers.py [--rows 300000] [--backends openpyxl xlsx-stream csv parquet]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def _child(backend, rows, out_dir):
+    import numpy as np
+    import pandas as pd
+    from src.day2.report_writers import write_report
+
+    rng = np.random.default_rng(0)
+    datos = pd.DataFrame({
+        "fecha": pd.date_range("2020-01-01", periods=365).strftime("%Y-%m-%d").to_numpy()[rng.integers(0, 365, rows)],
+        "categoria": np.array(["Hogar", "Tecnología", "Jardín"])[rng.integers(0, 3, rows)],
+        "producto": np.array(["Silla", "Mesa", "Lámpara", "Teclado"])[rng.integers(0, 4, rows)],
+        "precio": rng.integers(1, 1000, rows).astype("float64"),
+        "cantidad": rng.integers(1, 10, rows).astype("float64"),
+    })
+    resumen = datos.groupby(["fecha", "categoria"], as_index=False)[["precio", "cantidad"]].sum()
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    write_report({"Datos": datos, "Resumen": resumen}, Path(out_dir) / "informe.xlsx", backend)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"backend": backend, "s": elapsed, "peak_mib": peak / 1024,
+                      "extra_mib": (peak - base_rss) / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--backends", nargs="*", default=["openpyxl", "xlsx-stream", "csv", "parquet"])
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.rows, args.out)
+        return
+
+    print(f"filas Datos={args.rows:,}")
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory() as tmp:
+            res = subprocess.run([sys.executable, __file__, "--child", backend, "--rows", str(args.rows),
+                                  "--out", tmp], capture_output=True, text=True)
+        if res.returncode != 0:
+            print(f"{backend:<12} error: {res.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(res.stdout.strip().splitlines()[-1])
+        print(f"{backend:<12} {r['s']:7.2f} s  pico RSS {r['peak_mib']:7.1f} MiB  "
+              f"(+{r['extra_mib']:.1f} MiB al escribir)")
+
+
+if __name__ == "__main__":
+    main()
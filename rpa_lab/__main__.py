@@ -1,14 +1,32 @@
 # rpa_lab/__main__.py
 import sys
-from . import pipeline
 
 def _usage():
     print("Uso: python -m rpa_lab pipeline [--city CITY] [--send] [--dry-run]")
+    print("     python -m rpa_lab compact [--store PATH] [--keep-days N]")
+    print("     python -m rpa_lab stats [--metrics PATH] [--app pipeline|day7] [--last-runs N]")
+    print("     python -m rpa_lab serve [--workers N] [--pool-size N] [--queue PATH] [--until-empty]")
+    print("     python -m rpa_lab submit [--wait] -- [args de pipeline]")
+    print("     python -m rpa_lab status [JOB_ID] [--queue PATH]")
     print("Ejemplo: python -m rpa_lab pipeline --city Madrid --send")
 
 if __name__ == "__main__":
     if len(sys.argv) >= 2 and sys.argv[1] == "pipeline":
+        from . import pipeline  # el resto de subcomandos no paga su importación
+
         # pasar solo los args tras 'pipeline' a pipeline.main
         sys.exit(pipeline.main(sys.argv[2:]))
+    elif len(sys.argv) >= 2 and sys.argv[1] == "compact":
+        from src.day5 import observation_store
+
+        sys.exit(observation_store.main(sys.argv[2:]))
+    elif len(sys.argv) >= 2 and sys.argv[1] == "stats":
+        from .metrics import stats_main
+
+        sys.exit(stats_main(sys.argv[2:]))
+    elif len(sys.argv) >= 2 and sys.argv[1] in ("serve", "submit", "status"):
+        from . import daemon
+
+        sys.exit(getattr(daemon, f"{sys.argv[1]}_main")(sys.argv[2:]))
     else:
-        _usage()
\ No newline at end of file
+        _usage()
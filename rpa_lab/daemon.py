@@ -0,0 +1,346 @@
+# rpa_lab/daemon.py
+"""`rpa_lab serve`: proceso residente que ejecuta trabajos del pipeline desde una cola SQLite.
+
+El proceso paga una sola vez el arranque (pandas, tenacity, openpyxl, .env y los
+navegadores del BrowserPool) y cada trabajo es una llamada a `pipeline.main` con
+los argumentos encolados. `rpa_lab submit` encola (y opcionalmente espera) y
+`rpa_lab status` consulta la cola; cron y peticiones puntuales comparten así el
+mismo proceso caliente.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+QUEUE_DB = PROJECT_ROOT / "data" / "jobs.sqlite"
+POLL_SECONDS = 0.5
+LEASE_SECONDS = 60  # un trabajo running sin latido durante este tiempo se da por abandonado
+
+
+# ---------------- Cola ----------------
+class JobQueue:
+    """Cola durable de trabajos del pipeline (argv + estado + código de salida) en SQLite.
+
+    Una conexión por hilo; `claim` reserva el trabajo más antiguo dentro de una
+    transacción IMMEDIATE, así dos workers (o dos daemons) nunca toman el mismo.
+    Cada trabajo running tiene un dueño (`worker`) y un lease que su daemon
+    renueva con `heartbeat`; sólo se reencolan los trabajos con el lease vencido.
+    """
+
+    def __init__(self, path: Path = QUEUE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id           INTEGER PRIMARY KEY,
+                    argv         TEXT NOT NULL,
+                    status       TEXT NOT NULL DEFAULT 'queued',
+                    rc           INTEGER,
+                    error        TEXT,
+                    worker       TEXT,
+                    lease_until  REAL,
+                    submitted_at REAL NOT NULL,
+                    started_at   REAL,
+                    finished_at  REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_id ON jobs (status, id);
+            """)
+            if "lease_until" not in {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")  # colas creadas antes del lease
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def submit(self, argv) -> int:
+        cur = self._conn().execute("INSERT INTO jobs (argv, submitted_at) VALUES (?, ?)",
+                                   (json.dumps(list(argv)), time.time()))
+        return cur.lastrowid
+
+    def claim(self, worker: str, lease: float = LEASE_SECONDS):
+        """Marca como running (de `worker`, con lease de `lease` s) el trabajo en cola más antiguo
+        y lo devuelve (o None)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id, argv FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute("UPDATE jobs SET status = 'running', worker = ?, started_at = ?, lease_until = ? "
+                             "WHERE id = ?", (worker, now, now + lease, row["id"]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return None if row is None else (row["id"], json.loads(row["argv"]))
+
+    def heartbeat(self, job_ids, worker_prefix: str, lease: float = LEASE_SECONDS) -> int:
+        """Renueva el lease de los trabajos `job_ids` que sigan siendo de workers `worker_prefix*`."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        marks = ",".join("?" * len(job_ids))
+        return self._conn().execute(
+            f"UPDATE jobs SET lease_until = ? WHERE status = 'running' AND worker LIKE ? AND id IN ({marks})",
+            (time.time() + lease, worker_prefix + "%", *job_ids)).rowcount
+
+    def finish(self, job_id: int, rc: int, error: str = None, worker: str = None) -> bool:
+        """Cierra el trabajo; con `worker`, sólo si sigue siendo suyo (no se reencoló entretanto)."""
+        sql = "UPDATE jobs SET status = ?, rc = ?, error = ?, finished_at = ?, lease_until = NULL WHERE id = ?"
+        params = ["done" if rc == 0 else "failed", rc, error, time.time(), job_id]
+        if worker is not None:
+            sql += " AND status = 'running' AND worker = ?"
+            params.append(worker)
+        return self._conn().execute(sql, params).rowcount == 1
+
+    def requeue_expired(self, now: float = None) -> int:
+        """Devuelve a la cola los trabajos running cuyo lease venció (daemon caído a mitad)."""
+        return self._conn().execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL, lease_until = NULL "
+            "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+            (time.time() if now is None else now,)).rowcount
+
+    def get(self, job_id: int):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else dict(row)
+
+    def list(self, limit: int = 20) -> list:
+        rows = self._conn().execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def counts(self) -> dict:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+
+# ---------------- Daemon ----------------
+def warm_up(fast: bool = False, pool_size: int = 1):
+    """Importa lo pesado, carga .env y arranca los navegadores; devuelve el BrowserPool.
+
+    pipeline importa pandas, tenacity y el scraper de forma perezosa: aquí se
+    cargan a propósito para que el primer trabajo no pague esas importaciones.
+    """
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+    import tenacity  # noqa: F401
+    from dotenv import load_dotenv
+
+    import src.day5.scraper  # noqa: F401
+    from src.day2.report_writers import write_report  # noqa: F401
+    from src.day5.observation_store import ObservationStore  # noqa: F401
+    from . import pipeline
+
+    load_dotenv(PROJECT_ROOT / ".env")
+    pool = pipeline._make_pool(pool_size, fast)
+    try:
+        pool.warm()
+    except Exception as e:  # sin navegador: el pool arrancará sesiones bajo demanda
+        logging.warning("No se pudieron precalentar los navegadores: %s", e)
+    return pool
+
+
+class Daemon:
+    """`workers` hilos que toman trabajos de la cola y ejecutan `pipeline.main(argv, pool)`."""
+
+    def __init__(self, queue: JobQueue, pool=None, workers: int = 1, poll: float = POLL_SECONDS,
+                 lease: float = LEASE_SECONDS):
+        self.queue = queue
+        self.pool = pool
+        self.workers = workers
+        self.poll = poll
+        self.lease = lease
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stop = threading.Event()
+        self.processed = 0
+        self._running = set()  # trabajos en curso en este daemon (para el latido)
+        self._lock = threading.Lock()
+
+    def run_job(self, job_id: int, argv: list, worker: str):
+        from . import pipeline
+
+        logging.info("[%s] Trabajo %d: pipeline %s", worker, job_id, " ".join(argv))
+        t0 = time.perf_counter()
+        error = None
+        try:
+            rc = pipeline.main(argv, pool=self.pool)
+        except SystemExit as e:  # argparse: argumentos inválidos
+            rc = e.code if isinstance(e.code, int) else 2
+            error = "argumentos inválidos"
+        except Exception as e:
+            logging.exception("[%s] Trabajo %d falló", worker, job_id)
+            rc, error = 1, f"{type(e).__name__}: {e}"
+        with self._lock:
+            self._running.discard(job_id)
+            self.processed += 1
+        if not self.queue.finish(job_id, rc or 0, error, worker):
+            logging.warning("[%s] Trabajo %d ya no era de este daemon (lease vencido): no se marca", worker, job_id)
+        logging.info("[%s] Trabajo %d terminado rc=%s en %.2f s", worker, job_id, rc, time.perf_counter() - t0)
+
+    def _worker(self, name: str, until_empty: bool):
+        try:
+            while not self.stop.is_set():
+                job = self.queue.claim(f"{self.id}/{name}", self.lease)
+                if job is None:
+                    if until_empty:
+                        return
+                    self.stop.wait(self.poll)
+                    continue
+                with self._lock:
+                    self._running.add(job[0])
+                self.run_job(*job, f"{self.id}/{name}")
+        finally:
+            self.queue.close()
+
+    def _heartbeat(self, done: threading.Event):
+        """Renueva el lease de los trabajos en curso y reencola los abandonados por otros daemons."""
+        try:
+            while not done.wait(self.lease / 3):
+                with self._lock:
+                    running = list(self._running)
+                self.queue.heartbeat(running, self.id + "/", self.lease)
+                if self.queue.requeue_expired():
+                    logging.warning("Reencolados trabajos con el lease vencido")
+        finally:
+            self.queue.close()
+
+    def serve(self, until_empty: bool = False):
+        """Bloquea hasta `stop` (o, con `until_empty`, hasta vaciar la cola).
+
+        Con Ctrl+C se deja de tomar trabajos y se esperan los que están en curso.
+        """
+        requeued = self.queue.requeue_expired()
+        if requeued:
+            logging.warning("Reencolados %d trabajos que quedaron a medias", requeued)
+        done = threading.Event()
+        latido = threading.Thread(target=self._heartbeat, args=(done,), name="rpa-heartbeat", daemon=True)
+        latido.start()
+        threads = [threading.Thread(target=self._worker, args=(f"w{i}", until_empty), name=f"rpa-worker-{i}")
+                   for i in range(self.workers)]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.2)  # join con timeout: deja llegar SIGINT al hilo principal
+        except KeyboardInterrupt:
+            logging.info("Deteniendo daemon: se terminan los trabajos en curso")
+            self.stop.set()
+            for t in threads:
+                t.join()
+        finally:
+            done.set()
+            latido.join()
+
+
+# ---------------- CLI ----------------
+def serve_main(argv=None):
+    parser = argparse.ArgumentParser(prog="rpa_lab serve", description="Worker residente del pipeline")
+    parser.add_argument("--queue", type=Path, default=QUEUE_DB, help="Cola SQLite de trabajos")
+    parser.add_argument("--workers", type=int, default=2, help="Trabajos simultáneos")
+    parser.add_argument("--pool-size", type=int, default=None, help="Navegadores calientes (por defecto = workers)")
+    parser.add_argument("--fast", action="store_true", help="Navegadores del pool en modo rápido")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Segundos entre consultas a la cola vacía")
+    parser.add_argument("--until-empty", action="store_true", help="Salir al vaciar la cola (útil en cron)")
+    args = parser.parse_args(argv)
+
+    from .pipeline import setup_logging
+
+    setup_logging()
+    t0 = time.perf_counter()
+    pool = warm_up(args.fast, args.pool_size or args.workers)
+    logging.info("Daemon listo en %.2f s (workers=%d, cola=%s)", time.perf_counter() - t0, args.workers, args.queue)
+
+    daemon = Daemon(JobQueue(args.queue), pool, args.workers, args.poll)
+    previo = signal.signal(signal.SIGTERM, lambda *_: daemon.stop.set())
+    try:
+        daemon.serve(args.until_empty)
+    finally:
+        signal.signal(signal.SIGTERM, previo)
+        pool.close()
+    logging.info("Daemon detenido tras %d trabajos", daemon.processed)
+    return 0
+
+
+def _fmt_ts(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else "-"
+
+
+def submit_main(argv=None):
+    parser = argparse.ArgumentParser(prog="rpa_lab submit",
+                                     description="Encola un trabajo del pipeline: rpa_lab submit [--wait] -- --city Madrid")
+    parser.add_argument("--queue", type=Path, default=QUEUE_DB, help="Cola SQLite de trabajos")
+    parser.add_argument("--wait", action="store_true", help="Esperar a que termine y salir con su código")
+    parser.add_argument("--timeout", type=float, default=None, help="Máximo de segundos con --wait")
+    parser.add_argument("pipeline_args", nargs=argparse.REMAINDER, help="Argumentos de `rpa_lab pipeline`")
+    args = parser.parse_args(argv)
+
+    pipeline_args = args.pipeline_args[1:] if args.pipeline_args[:1] == ["--"] else args.pipeline_args
+    queue = JobQueue(args.queue)
+    job_id = queue.submit(pipeline_args)
+    print(job_id)
+    if not args.wait:
+        return 0
+    limite = None if args.timeout is None else time.monotonic() + args.timeout
+    while True:
+        job = queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job["rc"]
+        if limite is not None and time.monotonic() > limite:
+            print(f"Trabajo {job_id} sigue {job['status']}", file=sys.stderr)
+            return 124
+        time.sleep(POLL_SECONDS)
+
+
+def status_main(argv=None):
+    parser = argparse.ArgumentParser(prog="rpa_lab status", description="Estado de la cola de trabajos")
+    parser.add_argument("job_id", nargs="?", type=int, help="Trabajo concreto (por defecto los últimos)")
+    parser.add_argument("--queue", type=Path, default=QUEUE_DB, help="Cola SQLite de trabajos")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Salida JSON")
+    args = parser.parse_args(argv)
+
+    if not args.queue.exists():
+        print(f"No existe la cola {args.queue}", file=sys.stderr)
+        return 1
+    queue = JobQueue(args.queue)
+    if args.job_id is not None:
+        job = queue.get(args.job_id)
+        if job is None:
+            print(f"No existe el trabajo {args.job_id}", file=sys.stderr)
+            return 1
+        jobs = [job]
+    else:
+        jobs = queue.list(args.limit)
+    if args.json:
+        print(json.dumps(jobs, ensure_ascii=False, indent=2))
+        return 0
+    print("  ".join(f"{s}={n}" for s, n in sorted(queue.counts().items())) or "cola vacía")
+    for j in jobs:
+        dur = f"{j['finished_at'] - j['started_at']:.2f}s" if j["finished_at"] and j["started_at"] else "-"
+        print(f"{j['id']:5d} {j['status']:8s} rc={j['rc'] if j['rc'] is not None else '-':<3} "
+              f"{_fmt_ts(j['submitted_at'])} {dur:>8s}  {' '.join(json.loads(j['argv']))}"
+              + (f"  ({j['error']})" if j["error"] else ""))
+    return 0
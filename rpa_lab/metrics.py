@@ -0,0 +1,189 @@
+# rpa_lab/metrics.py
+"""Spans por etapa (scrape, informe, email...) volcados como JSON por líneas.
+
+Cada línea: {"ts", "run", "app", "stage", "duration_s", "outcome", ...campos}
+con campos opcionales city/client/bytes/retries/error. `python -m rpa_lab stats`
+agrega p50/p95/p99 y throughput por etapa sobre ese fichero.
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+METRICS_FILE = PROJECT_ROOT / "logs" / "metrics.jsonl"
+
+_active = threading.local()  # pila de spans abiertos en cada hilo (para contar reintentos)
+
+
+# ---------------- Emisión ----------------
+class MetricsWriter:
+    """Escribe spans en `path` (append, seguro entre hilos); con path=None no escribe nada."""
+
+    def __init__(self, path: Path = None, app: str = "pipeline", profiler=None):
+        self.path = Path(path) if path else None
+        self.app = app
+        self.profiler = profiler  # rpa_lab.profiling.Profiler con --profile
+        self.run = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._fh = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def emit(self, record: dict):
+        if self._fh is None:
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+
+    @contextmanager
+    def span(self, stage: str, profile: bool = True, **fields):
+        """Mide el bloque; el dict devuelto admite bytes/retries/outcome u otros campos.
+
+        Si el bloque lanza, el span queda con outcome "error" y el tipo de excepción.
+        Con un profiler, las etapas hoja (`profile=True`) se perfilan además.
+        """
+        record = {"ts": time.time(), "run": self.run, "app": self.app, "stage": stage, "retries": 0}
+        record.update({k: v for k, v in fields.items() if v is not None})
+        stack = _active.__dict__.setdefault("stack", [])
+        stack.append(record)
+        profiling = self.profiler.stage(stage, **fields) if profile and self.profiler else nullcontext()
+        t0 = time.perf_counter()
+        try:
+            with profiling:
+                yield record
+        except BaseException as e:
+            record["outcome"] = "error"
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            record["duration_s"] = round(time.perf_counter() - t0, 6)
+            record.setdefault("outcome", "ok")
+            stack.pop()
+            self.emit(record)
+
+
+    def record(self, stage: str, ts: float, duration_s: float, error: BaseException = None, **fields):
+        """Emite un span medido fuera de `span` (p.ej. un cliente repartido entre varios hilos)."""
+        record = {"ts": ts, "run": self.run, "app": self.app, "stage": stage, "retries": 0}
+        record.update({k: v for k, v in fields.items() if v is not None})
+        record.update(duration_s=round(duration_s, 6), outcome="error" if error is not None else "ok")
+        if error is not None:
+            record["error"] = type(error).__name__
+        self.emit(record)
+
+
+def note_retry(retry_state=None):
+    """`before_sleep` de tenacity: suma un reintento al span abierto en este hilo."""
+    stack = getattr(_active, "stack", None)
+    if stack:
+        stack[-1]["retries"] += 1
+
+
+def file_size(path) -> int:
+    try:
+        return Path(path).stat().st_size
+    except (OSError, TypeError):
+        return None
+
+
+# ---------------- Agregación ----------------
+def load(path: Path) -> list:
+    """Spans del fichero; ignora líneas corruptas (p.ej. un proceso cortado a mitad)."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados."""
+    if not sorted_values:
+        return float("nan")
+    k = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[k]
+
+
+def summarize(records, app: str = None, last_runs: int = None) -> list:
+    """Una fila por (app, etapa): n, errores, reintentos, p50/p95/p99, spans/s y bytes/s."""
+    if app:
+        records = [r for r in records if r.get("app") == app]
+    if last_runs:
+        runs = []
+        for r in records:
+            if r.get("run") not in runs:
+                runs.append(r.get("run"))
+        keep = set(runs[-last_runs:])
+        records = [r for r in records if r.get("run") in keep]
+
+    grupos = {}
+    for r in records:
+        grupos.setdefault((r.get("app"), r.get("stage")), []).append(r)
+
+    filas = []
+    for (app_, stage), rs in grupos.items():
+        durs = sorted(r["duration_s"] for r in rs)
+        inicio = min(r["ts"] for r in rs)
+        fin = max(r["ts"] + r["duration_s"] for r in rs)
+        ventana = fin - inicio
+        total_bytes = sum(r.get("bytes") or 0 for r in rs)
+        filas.append({
+            "app": app_, "stage": stage, "n": len(rs),
+            "errors": sum(r.get("outcome") != "ok" for r in rs),
+            "retries": sum(r.get("retries") or 0 for r in rs),
+            "p50_s": percentile(durs, 50), "p95_s": percentile(durs, 95), "p99_s": percentile(durs, 99),
+            "per_s": len(rs) / ventana if ventana > 0 else None,
+            "bytes_per_s": total_bytes / ventana if ventana > 0 and total_bytes else None,
+        })
+    return sorted(filas, key=lambda f: (f["app"] or "", f["stage"] or ""))
+
+
+def format_table(filas) -> str:
+    cab = f"{'app':9s} {'stage':14s} {'n':>5s} {'err':>4s} {'retry':>5s} " \
+          f"{'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'spans/s':>8s} {'KB/s':>9s}"
+    lineas = [cab, "-" * len(cab)]
+    for f in filas:
+        per_s = f"{f['per_s']:8.2f}" if f["per_s"] is not None else f"{'-':>8s}"
+        kb_s = f"{f['bytes_per_s'] / 1024:9.1f}" if f["bytes_per_s"] is not None else f"{'-':>9s}"
+        lineas.append(f"{f['app'] or '-':9s} {f['stage']:14s} {f['n']:5d} {f['errors']:4d} {f['retries']:5d} "
+                      f"{f['p50_s'] * 1000:9.1f} {f['p95_s'] * 1000:9.1f} {f['p99_s'] * 1000:9.1f} {per_s} {kb_s}")
+    return "\n".join(lineas)
+
+
+def stats_main(argv=None):
+    parser = argparse.ArgumentParser(prog="rpa_lab stats", description="Latencias y throughput por etapa")
+    parser.add_argument("--metrics", type=Path, default=METRICS_FILE, help="Fichero JSONL de spans")
+    parser.add_argument("--app", default=None, help="Filtrar por aplicación (pipeline, day7)")
+    parser.add_argument("--last-runs", type=int, default=None, help="Sólo las N últimas ejecuciones")
+    parser.add_argument("--json", action="store_true", help="Salida JSON en vez de tabla")
+    args = parser.parse_args(argv)
+
+    if not args.metrics.exists():
+        print(f"No existe {args.metrics}", file=sys.stderr)
+        return 1
+    filas = summarize(load(args.metrics), args.app, args.last_runs)
+    print(json.dumps(filas, indent=2) if args.json else format_table(filas))
+    return 0
@@ -3,30 +3,33 @@ import argparse
 import logging
 import os
 import sys
-import subprocess
-import time
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
-import smtplib
-from email.message import EmailMessage
 
-from tenacity import retry, wait_exponential, stop_after_attempt, RetryError
-from dotenv import load_dotenv
+# pandas, tenacity, dotenv, smtplib y el scraper se importan en las funciones que
+# los usan: `--help` y la importación del módulo no cargan nada pesado ni tocan disco
+from src.day2.report_writers import BACKENDS, DEFAULT_BACKEND
+from .metrics import MetricsWriter, file_size, note_retry
 
 # ---------------- Paths ----------------
 PROJECT_ROOT = Path(__file__).resolve().parents[1]  # rpa_lab/ -> parent = repo root
 DATA_DIR = PROJECT_ROOT / "data"
 LOGS_DIR = PROJECT_ROOT / "logs"
-DATA_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOGS_DIR / "pipeline.log"
 
-SCRAPER_SCRIPT = PROJECT_ROOT / "src" / "day5" / "scraper.py"  # se ejecuta por subprocess
+SCRAPER_SCRIPT = PROJECT_ROOT / "src" / "day5" / "scraper.py"  # modo --scraper-mode subprocess
+SCRAPER_MODES = ("inproc", "subprocess")
+CITIES_REPORT = "informe_web_ciudades.xlsx"  # informe conjunto de --cities
+OBSERVATIONS_DB = "observaciones.sqlite"  # histórico de observaciones dentro de --data-dir
+TTL_SECONDS = 30 * 60
+CACHE_DIR_NAME = ".cache"  # caché de artefactos dentro de --data-dir
 
 # ---------------- Logging ----------------
 def setup_logging():
     logger = logging.getLogger()
+    if any(getattr(h, "baseFilename", None) == str(LOG_FILE) for h in logger.handlers):
+        return  # main() ya se llamó en este proceso
+    LOGS_DIR.mkdir(exist_ok=True)
     logger.setLevel(logging.INFO)
 
     # File handler (UTF-8)
@@ -42,35 +45,199 @@ def setup_logging():
     ch.setFormatter(fmt)
     logger.addHandler(ch)
 
-setup_logging()
-
 # ---------------- Utils / retries factory ----------------
 def make_retry_decorator(retries: int):
+    from tenacity import retry, wait_exponential, stop_after_attempt
+
     return retry(
         wait=wait_exponential(multiplier=1, min=2, max=30),
         stop=stop_after_attempt(retries),
+        before_sleep=note_retry,  # cuenta el reintento en el span abierto (métricas)
         reraise=True,
     )
 
 # ---------------- Scraper runner ----------------
-def _scraper_impl(city: str):
-    if not SCRAPER_SCRIPT.exists():
-        raise FileNotFoundError(f"Scraper script not found at {SCRAPER_SCRIPT}")
-
-    env = os.environ.copy()
-    env["CITY"] = city  # si el scraper lo soporta, lo recibirá; si no, se ignora
-    logging.info(f"Ejecutando scraper (script): {SCRAPER_SCRIPT}  city={city}")
-
-    # Usamos el mismo intérprete (sys.executable) para ejecutar el script
-    res = subprocess.run([sys.executable, str(SCRAPER_SCRIPT)], env=env, cwd=str(PROJECT_ROOT),
-                         capture_output=True, text=True)
-    if res.returncode != 0:
-        logging.error("Scraper stderr: %s", res.stderr)
-        raise RuntimeError(f"Scraper failed (code {res.returncode})")
+def _scraper_impl(city: str, fast: bool = False, aislado: bool = False, data_dir: Path = None,
+                  pool=None) -> list:
+    """Devuelve los registros del scraper; `aislado` lo ejecuta en otro intérprete y
+    `pool` (BrowserPool) presta un navegador ya abierto."""
+    from src.day5 import scraper
+
+    if aislado:
+        if not SCRAPER_SCRIPT.exists():
+            raise FileNotFoundError(f"Scraper script not found at {SCRAPER_SCRIPT}")
+        logging.info(f"Ejecutando scraper (subproceso): {SCRAPER_SCRIPT}  city={city} fast={fast}")
+        registros = scraper.scrape_en_subproceso(city, rapido=fast, data_dir=data_dir or DATA_DIR)
+    elif pool is not None:
+        logging.info(f"Ejecutando scraper (pool)  city={city} fast={fast}")
+        with pool.session() as driver:
+            registros = scraper.scrape(city, rapido=fast, driver=driver)
+    else:
+        logging.info(f"Ejecutando scraper (en proceso)  city={city} fast={fast}")
+        registros = scraper.scrape(city, rapido=fast)
     logging.info("Scraper finalizado correctamente")
+    return registros
+
+def pick_city_record(city: str, registros: list):
+    """Último registro de `city` (sin distinguir mayúsculas) o None."""
+    for registro in reversed(registros):
+        if str(registro.get("Ciudad", "")).lower() == city.lower():
+            return registro
+    return None
+
+# ---------------- Varias ciudades ----------------
+def parse_cities(value: str) -> list:
+    """'Madrid,Sevilla' o ruta a un fichero con una ciudad por línea (# = comentario)."""
+    path = Path(value)
+    if path.is_file():
+        lines = path.read_text(encoding="utf-8").splitlines()
+    else:
+        lines = value.split(",")
+    cities = []
+    for line in lines:
+        city = line.split("#", 1)[0].strip()
+        if city and city.lower() not in (c.lower() for c in cities):
+            cities.append(city)
+    return cities
+
+def _make_pool(size: int, fast: bool):
+    from src.day5.browser_pool import BrowserPool
+    return BrowserPool(size=size, headless=fast, rapido=fast)
+
+def scrape_cities(cities, run_scraper, fast: bool = False, aislado: bool = False,
+                  concurrency: int = 4, data_dir: Path = None, metrics: MetricsWriter = None, pool=None):
+    """Scrapea las ciudades con como mucho `concurrency` a la vez.
+
+    Un fallo (tras reintentos) sólo afecta a su ciudad: devuelve
+    ({ciudad: registros}, {ciudad: error}) en el orden pedido. Sin `pool`
+    (BrowserPool ya caliente, p.ej. del daemon) se abre uno para la llamada.
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from src.day5 import scraper
+
+    metrics = metrics or MetricsWriter(None)
+    mode = "subprocess" if aislado else "inproc"
+
+    def scrape_one(city, dest):
+        # el span se abre en el hilo del worker: los reintentos de tenacity se le suman
+        with metrics.span("scrape", city=city, mode=mode) as span:
+            records = run_scraper(city, fast, aislado, dest, pool)
+            span["records"] = len(records)
+            return records
+
+    results, errors = {}, {}
+    pending = []
+    for city in cities:
+        try:
+            scraper.url_para(city)  # en lote no se cae a Madrid: la ciudad se reporta como fallida
+            pending.append(city)
+        except KeyError as e:
+            errors[city] = str(e).strip("'\"")
+
+    own_pool = pool is None and not aislado
+    if own_pool:
+        pool = _make_pool(min(concurrency, max(len(pending), 1)), fast)
+    elif aislado:
+        pool = None
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # en subproceso cada ciudad escribe en su carpeta para no pisarse webdata.csv
+        futures = {city: executor.submit(scrape_one, city, Path(tmp) / f"c{i}" if aislado else data_dir)
+                   for i, city in enumerate(pending)}
+        for city, future in futures.items():
+            try:
+                results[city] = future.result()
+            except Exception as e:
+                logging.error("Scraper falló para %s: %s", city, e)
+                errors[city] = str(e) or type(e).__name__
+    if own_pool:
+        pool.close()
+    ordered = {c: results[c] for c in cities if c in results}
+    return ordered, {c: errors[c] for c in cities if c in errors}
+
+def _sheet_name(city: str, used: set) -> str:
+    """Nombre de hoja válido en Excel (31 caracteres, sin []:*?/\\) y único."""
+    base = "".join("_" if ch in '[]:*?/\\' else ch for ch in city)[:31] or "Ciudad"
+    name, i = base, 2
+    while name.lower() in used:
+        suffix = f" ({i})"
+        name, i = base[:31 - len(suffix)] + suffix, i + 1
+    used.add(name.lower())
+    return name
+
+def build_cities_sheets(results: dict, errors: dict, layout: str = "sheets") -> dict:
+    """Una sola pasada sobre los resultados -> {hoja: DataFrame} del informe conjunto."""
+    import pandas as pd
+
+    if layout == "summary":
+        rows = [r for records in results.values() for r in records]
+        sheets = {"Resumen": pd.DataFrame(rows)}
+    else:
+        used = set()
+        sheets = {_sheet_name(city, used): pd.DataFrame(records) for city, records in results.items()}
+    if errors:
+        sheets["Errores"] = pd.DataFrame({"Ciudad": list(errors), "Error": list(errors.values())})
+    return sheets
+
+def _run_cities(args, data_dir: Path, run_scraper, send_email, metrics) -> int:
+
+    cities = parse_cities(args.cities)
+    if not cities:
+        logging.error("--cities no contiene ninguna ciudad")
+        return 4
+    logging.info("Pipeline multi-ciudad: %d ciudades (concurrencia=%d)", len(cities), args.concurrency)
+    from src.day5.observation_store import ObservationStore
+
+    with ObservationStore(args.store or data_dir / OBSERVATIONS_DB) as store:
+        cached = {}
+        if not args.force_scrape:
+            with metrics.span("store_lookup", cities=len(cities)) as span:
+                for city in cities:
+                    registro = store.latest(city, args.ttl)
+                    if registro is not None:
+                        cached[city] = [registro]
+                span["hits"] = len(cached)
+        if cached:
+            logging.info("Servidas desde el almacén (ttl=%ss): %s", args.ttl, ", ".join(cached))
+        misses = [c for c in cities if c not in cached]
+        scraped, errors = scrape_cities(misses, run_scraper, args.fast_scrape, args.scraper_mode == "subprocess",
+                                        args.concurrency, data_dir, metrics, args.pool) if misses else ({}, {})
+        for records in scraped.values():
+            store.add(records)
+    results = {c: cached.get(c) or scraped[c] for c in cities if c in cached or c in scraped}
+    for city, error in errors.items():
+        logging.warning("Ciudad fallida %s: %s", city, error)
+    if not results:
+        logging.error("Todas las ciudades fallaron")
+        return 2
+
+    report_paths = _write_report(metrics, build_cities_sheets(results, errors, args.layout),
+                                 data_dir / CITIES_REPORT, args.format, _cache_dir(args, data_dir),
+                                 cities=len(results))
+    if report_paths is None:
+        return 6
+    logging.info("%d ciudades OK, %d fallidas", len(results), len(errors))
+
+    if args.send:
+        subject = f"Informe web - {len(results)} ciudades - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        body = (f"Adjunto informe automático para {', '.join(results)} generado el {datetime.now().isoformat()}.\n")
+        if errors:
+            body += "\nCiudades sin datos:\n" + "".join(f"- {c}: {e}\n" for c, e in errors.items())
+        body += "\n(Generado por rpa_lab pipeline)"
+        rc = _send_report(args, send_email, subject, body, report_paths, metrics)
+        if rc:
+            return rc
+
+    logging.info("Pipeline completado (%d/%d ciudades)", len(results), len(cities))
+    return 0
 
 # ---------------- Email sender impl ----------------
-def _send_email_impl(subject: str, body: str, attachment_path: Path):
+def _send_email_impl(subject: str, body: str, attachments):
+    """Envía un correo con `attachments` (una ruta o una lista: csv/parquet escriben un fichero por hoja)."""
+    import smtplib
+    from email.message import EmailMessage
+    from dotenv import load_dotenv
+
     # cargar .env
     load_dotenv(PROJECT_ROOT / ".env")
 
@@ -90,13 +257,15 @@ def _send_email_impl(subject: str, body: str, attachment_path: Path):
     msg["Subject"] = subject
     msg.set_content(body)
 
-    with open(attachment_path, "rb") as f:
-        data = f.read()
-        maintype = "application"
-        subtype = "octet-stream"
-        if attachment_path.suffix.lower() == ".xlsx":
-            subtype = "vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=attachment_path.name)
+    for attachment_path in ([attachments] if isinstance(attachments, (str, Path)) else attachments):
+        attachment_path = Path(attachment_path)
+        with open(attachment_path, "rb") as f:
+            data = f.read()
+            maintype = "application"
+            subtype = "octet-stream"
+            if attachment_path.suffix.lower() == ".xlsx":
+                subtype = "vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=attachment_path.name)
 
     with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as s:
         s.starttls()
@@ -105,14 +274,45 @@ def _send_email_impl(subject: str, body: str, attachment_path: Path):
     logging.info("Correo enviado a %s", EMAIL_TO)
 
 # ---------------- CLI main ----------------
-def main(argv=None):
+def main(argv=None, pool=None):
+    """CLI del pipeline; `pool` (BrowserPool) reutiliza navegadores ya abiertos (rpa_lab serve)."""
     parser = argparse.ArgumentParser(prog="rpa_lab pipeline", description="Pipeline E2E: scraping -> excel -> email")
     parser.add_argument("--city", "-c", default="Madrid", help="Ciudad a consultar")
+    parser.add_argument("--cities", default=None,
+                        help="Varias ciudades: 'Madrid,Sevilla' o fichero con una por línea (un solo informe y correo)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Ciudades scrapeadas a la vez con --cities")
+    parser.add_argument("--layout", choices=("sheets", "summary"), default="sheets",
+                        help="Con --cities: una hoja por ciudad o una hoja Resumen")
     parser.add_argument("--send", action="store_true", help="Enviar el informe por email")
     parser.add_argument("--dry-run", action="store_true", help="No enviar correo, sólo simular")
     parser.add_argument("--retries", type=int, default=3, help="Intentos para reintentos (scrape/email)")
-    parser.add_argument("--force-scrape", action="store_true", help="Forzar ejecución del scraper (aunque haya CSV)")
+    parser.add_argument("--force-scrape", action="store_true",
+                        help="Scrapear aunque haya una observación reciente en el almacén")
+    parser.add_argument("--ttl", type=float, default=TTL_SECONDS,
+                        help="Segundos durante los que una observación almacenada se da por buena")
+    parser.add_argument("--store", type=Path, default=None,
+                        help="Almacén SQLite de observaciones (por defecto <data-dir>/observaciones.sqlite)")
+    parser.add_argument("--fast-scrape", action="store_true",
+                        help="Scraper headless sin imágenes/CSS/anuncios y con espera explícita")
+    parser.add_argument("--scraper-mode", choices=SCRAPER_MODES, default="inproc",
+                        help="inproc = función importada; subprocess = intérprete aparte (aísla fallos de Chrome)")
+    parser.add_argument("--format", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Formato del informe (openpyxl, xlsx-stream, csv, parquet)")
+    parser.add_argument("--metrics", type=Path, default=None,
+                        help="JSONL de spans por etapa (por defecto logs/metrics.jsonl; ver `rpa_lab stats`)")
+    parser.add_argument("--no-metrics", action="store_true", help="No registrar métricas")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Regenerar el informe aunque los datos no hayan cambiado")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile + tracemalloc + pilas plegadas por etapa en logs/profile_<timestamp>/")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR,
+                        help="Carpeta del informe y del almacén de observaciones (por defecto data/)")
     args = parser.parse_args(argv)
+    args.pool = pool
+
+    setup_logging()
+    data_dir = args.data_dir
+    data_dir.mkdir(parents=True, exist_ok=True)
 
     logging.info("Pipeline iniciado (city=%s, send=%s, dry_run=%s)", args.city, args.send, args.dry_run)
 
@@ -121,72 +321,143 @@ def main(argv=None):
     run_scraper = retry_decorator(_scraper_impl)
     send_email = retry_decorator(_send_email_impl)
 
-    # ---------- 1) Scrape (genera data/webdata.csv) ----------
-    csv_path = DATA_DIR / "webdata.csv"
+    profiler = None
+    if args.profile:
+        from .profiling import Profiler, profile_dir
+        profiler = Profiler(profile_dir(LOGS_DIR))
+
+    metrics_path = None if args.no_metrics else (args.metrics or LOGS_DIR / "metrics.jsonl")
     try:
-        if args.force_scrape or not csv_path.exists():
-            run_scraper(args.city)
-            # esperar un pequeño tiempo para que el script termine de escribir el CSV
-            time.sleep(1)
-        else:
-            logging.info("CSV ya existe en %s (use --force-scrape para regenerar)", csv_path)
-    except RetryError as e:
-        logging.exception("Scraper falló después de reintentos: %s", str(e))
-        return 2
-    except Exception:
-        logging.exception("Error ejecutando scraper")
-        return 3
+        with MetricsWriter(metrics_path, app="pipeline", profiler=profiler) as metrics:
+            with metrics.span("pipeline", profile=False, city=args.cities or args.city) as total:
+                if args.cities:
+                    rc = _run_cities(args, data_dir, run_scraper, send_email, metrics)
+                else:
+                    rc = _run_city(args, data_dir, run_scraper, send_email, metrics)
+                if rc != 0:
+                    total.update(outcome="error", rc=rc)
+    finally:
+        if profiler is not None:
+            profiler.close()
+    return rc
 
-    # ---------- 2) Leer CSV y generar Excel ----------
-    if not csv_path.exists():
-        logging.error("No se encontró %s después de ejecutar el scraper", csv_path)
-        return 4
+def _run_city(args, data_dir: Path, run_scraper, send_email, metrics) -> int:
+    import pandas as pd
+    from tenacity import RetryError
+    from src.day5.observation_store import ObservationStore
 
-    try:
-        df = pd.read_csv(csv_path)
-        logging.info("CSV leído con %d filas", len(df))
-    except Exception:
-        logging.exception("Error leyendo CSV %s", csv_path)
-        return 5
-
-    # Buscar fila por ciudad (si existe columna 'Ciudad'), caso contrario tomar última fila
-    row_df = None
-    if "Ciudad" in df.columns:
-        matches = df[df["Ciudad"].astype(str).str.lower() == args.city.lower()]
-        if not matches.empty:
-            row_df = matches
+    # ---------- 1) Observación: almacén si es reciente (< --ttl), si no scrape ----------
+    with ObservationStore(args.store or data_dir / OBSERVATIONS_DB) as store:
+        registros = None
+        if not args.force_scrape:
+            with metrics.span("store_lookup", city=args.city) as span:
+                registros = store.latest(args.city, args.ttl)
+                span["hit"] = registros is not None
+        if registros is not None:
+            logging.info("Observación de %s servida desde %s (ttl=%ss)", args.city, store.path, args.ttl)
+            registros = [registros]
         else:
-            logging.warning("No se encontró entrada para la ciudad %s en CSV, se usará la última fila", args.city)
-    if row_df is None:
-        row_df = df.tail(1)
+            try:
+                with metrics.span("scrape", city=args.city, mode=args.scraper_mode) as span:
+                    aislado = args.scraper_mode == "subprocess"
+                    registros = run_scraper(args.city, args.fast_scrape, aislado, data_dir,
+                                            None if aislado else args.pool)
+                    span["records"] = len(registros)
+            except RetryError as e:
+                logging.exception("Scraper falló después de reintentos: %s", str(e))
+                return 2
+            except Exception:
+                logging.exception("Error ejecutando scraper")
+                return 3
+            logging.info("Scraper devolvió %d registros", len(registros))
+            store.add(registros)
+    if not registros:
+        logging.error("Sin observaciones para %s", args.city)
+        return 4
 
-    excel_path = DATA_DIR / "informe_web.xlsx"
-    try:
-        # Guardar informe (sobrescribe/crea)
-        row_df.to_excel(excel_path, index=False)
-        logging.info("Informe guardado en Excel: %s", excel_path)
-    except Exception:
-        logging.exception("Error generando Excel %s", excel_path)
+    # ---------- 2) Generar Excel con la fila de la ciudad ----------
+    row = pick_city_record(args.city, registros)
+    if row is None:
+        logging.warning("No se encontró entrada para la ciudad %s, se usará la última fila", args.city)
+        row = registros[-1]
+
+    # Guardar informe (sobrescribe/crea); misma hoja que df.to_excel por defecto
+    report_paths = _write_report(metrics, {"Sheet1": pd.DataFrame([row])}, data_dir / "informe_web.xlsx",
+                                 args.format, _cache_dir(args, data_dir), city=args.city)
+    if report_paths is None:
         return 6
 
     # ---------- 3) Envío de email (si se solicita) ----------
     if args.send:
         subject = f"Informe web - {args.city} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         body = f"Adjunto informe automático para {args.city} generado el {datetime.now().isoformat()}.\n\n(Generado por rpa_lab pipeline)"
-        if args.dry_run:
-            logging.info("[DRY-RUN] Se habría enviado el correo con asunto: %s y adjunto %s", subject, excel_path)
-        else:
-            try:
-                send_email(subject, body, excel_path)
-            except RetryError as e:
-                logging.exception("Envio de email falló después de reintentos: %s", str(e))
-                return 7
-            except Exception:
-                logging.exception("Error enviando email")
-                return 8
+        rc = _send_report(args, send_email, subject, body, report_paths, metrics)
+        if rc:
+            return rc
 
     logging.info("Pipeline completado correctamente")
     return 0
 
+def _cache_dir(args, data_dir: Path):
+    """Caché de artefactos en <data-dir>/.cache (None con --no-cache)."""
+    return None if args.no_cache else data_dir / CACHE_DIR_NAME
+
+def _sheets_fingerprint(sheets: dict) -> str:
+    """Huella del contenido de las hojas (para la clave de caché del informe)."""
+    import hashlib
+
+    h = hashlib.sha256()
+    for name, df in sheets.items():
+        h.update(name.encode("utf-8"))
+        h.update(str(list(df.dtypes.astype(str).items())).encode("utf-8"))
+        h.update(df.to_csv(index=False).encode("utf-8"))
+    return h.hexdigest()
+
+def _write_report(metrics, sheets: dict, path: Path, fmt: str, cache_dir: Path = None, **fields):
+    """Escribe el informe dentro de un span report_write; devuelve sus ficheros (uno por hoja
+    con csv/parquet) o None si falla.
+
+    Con `cache_dir`, si las hojas y el formato no cambiaron se restaura el informe
+    anterior de la caché de artefactos en vez de regenerarlo.
+    """
+    from src.day2.artifact_cache import ArtifactCache, memoize_files
+    from src.day2.report_writers import write_report
+
+    cache = ArtifactCache(cache_dir) if cache_dir is not None else None
+    try:
+        with metrics.span("report_write", sheets=len(sheets), format=fmt, **fields) as span:
+            params = {"format": fmt, "path": str(Path(path).resolve()), "sheets": _sheets_fingerprint(sheets)}
+            paths, span["cache_hit"] = memoize_files(cache, "report_write", [], params,
+                                                     lambda: write_report(sheets, path, fmt), code=[write_report])
+            span["bytes"] = sum(file_size(p) or 0 for p in paths)
+        logging.info("Informe guardado: %s", ", ".join(str(p) for p in paths))
+        return paths
+    except Exception:
+        logging.exception("Error generando Excel %s", path)
+        return None
+    finally:
+        if cache is not None:
+            cache.close()
+
+def _send_report(args, send_email, subject: str, body: str, report_paths: list, metrics) -> int:
+    """Envía (o simula con --dry-run) el correo con todos los ficheros del informe; 0 o el código de error."""
+    from tenacity import RetryError
+
+    if args.dry_run:
+        logging.info("[DRY-RUN] Se habría enviado el correo con asunto: %s y adjuntos %s", subject,
+                     ", ".join(str(p) for p in report_paths))
+        return 0
+    try:
+        with metrics.span("email_send", bytes=sum(file_size(p) or 0 for p in report_paths),
+                          attachments=len(report_paths)):
+            send_email(subject, body, report_paths)
+    except RetryError as e:
+        logging.exception("Envio de email falló después de reintentos: %s", str(e))
+        return 7
+    except Exception:
+        logging.exception("Error enviando email")
+        return 8
+    return 0
+
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,157 @@
+# rpa_lab/profiling.py
+"""Perfilado opcional por etapa (--profile): cProfile + tracemalloc + pilas muestreadas.
+
+Por cada etapa escribe en logs/profile_<timestamp>/:
+  NN_<etapa>.prof       -> pstats (snakeviz, `python -m pstats`, gprof2dot)
+  NN_<etapa>_top.txt    -> funciones con más tiempo acumulado
+  NN_<etapa>_alloc.txt  -> sitios que más memoria reservaron durante la etapa
+  NN_<etapa>.collapsed  -> pilas plegadas ("a;b;c N") para flamegraph.pl / speedscope
+y un summary.txt con el tiempo y el pico de memoria de cada etapa.
+
+Sin --profile no se crea ningún Profiler y las etapas no pagan nada.
+"""
+import cProfile
+import io
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LOGS_DIR = PROJECT_ROOT / "logs"
+SAMPLE_INTERVAL = 0.005  # segundos entre muestras de pila
+TOP_N = 25
+
+
+def profile_dir(base: Path = None) -> Path:
+    return Path(base or LOGS_DIR) / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def _label(stage: str, fields: dict) -> str:
+    extra = "_".join(str(v) for k, v in fields.items() if k in ("city", "client") and v)
+    raw = f"{stage}_{extra}" if extra else stage
+    return re.sub(r"[^\w.-]+", "_", raw)[:80]
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+
+class Profiler:
+    """Perfila etapas (`with profiler.stage("scrape", city=...)`) y guarda los informes en `out_dir`.
+
+    - cProfile sólo puede estar activo en una etapa a la vez: las etapas
+      concurrentes (p.ej. --cities) se quedan con memoria y pilas muestreadas.
+    - Las pilas se muestrean del hilo que abrió cada etapa.
+    """
+
+    def __init__(self, out_dir: Path = None, interval: float = SAMPLE_INTERVAL):
+        self.out_dir = Path(out_dir) if out_dir else profile_dir()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._cprofile_busy = False
+        self._seq = 0
+        self._active = {}  # id de etapa -> (thread id, Counter de pilas)
+        self._summary = []
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- muestreo de pilas ----------
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = list(self._active.values())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stacks in active:
+                frame = frames.get(thread_id)
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                if names:
+                    stacks[";".join(reversed(names))] += 1
+
+    # ---------- etapas ----------
+    @contextmanager
+    def stage(self, stage: str, **fields):
+        with self._lock:
+            self._seq += 1
+            name = f"{self._seq:02d}_{_label(stage, fields)}"
+            use_cprofile = not self._cprofile_busy
+            if not self._active:
+                tracemalloc.reset_peak()  # pico propio de la etapa (si no hay otras en curso)
+            self._cprofile_busy = self._cprofile_busy or use_cprofile
+            stacks = Counter()
+            self._active[name] = (threading.get_ident(), stacks)
+        prof = cProfile.Profile() if use_cprofile else None
+        snap_before = tracemalloc.take_snapshot()
+        mem_before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+            wall = time.perf_counter() - t0
+            mem_after, peak = tracemalloc.get_traced_memory()
+            snap_after = tracemalloc.take_snapshot()
+            with self._lock:
+                del self._active[name]
+                if use_cprofile:
+                    self._cprofile_busy = False
+            self._write(name, prof, snap_before, snap_after, stacks)
+            self._summary.append((name, wall, mem_after - mem_before, peak, prof is not None))
+
+    def _write(self, name: str, prof, snap_before, snap_after, stacks: Counter):
+        if prof is not None:
+            prof.dump_stats(str(self.out_dir / f"{name}.prof"))
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(TOP_N)
+            (self.out_dir / f"{name}_top.txt").write_text(buf.getvalue(), encoding="utf-8")
+
+        filtros = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = snap_after.filter_traces(filtros).compare_to(snap_before.filter_traces(filtros), "lineno")
+        lines = [f"{'KiB':>10s} {'bloques':>8s}  sitio"]
+        for stat in diff[:TOP_N]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:10.1f} {stat.count_diff:8d}  {frame.filename}:{frame.lineno}")
+        (self.out_dir / f"{name}_alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        (self.out_dir / f"{name}.collapsed").write_text(
+            "".join(f"{stack} {n}\n" for stack, n in stacks.most_common()), encoding="utf-8")
+
+    def close(self):
+        self._stop.set()
+        self._sampler.join()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        lines = [f"{'etapa':50s} {'pared s':>9s} {'Δmem KiB':>10s} {'pico KiB':>10s}  cProfile"]
+        for name, wall, delta, peak, profiled in self._summary:
+            lines.append(f"{name:50s} {wall:9.3f} {delta / 1024:10.1f} {peak / 1024:10.1f}  "
+                         f"{'sí' if profiled else 'no (concurrente)'}")
+        (self.out_dir / "summary.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        logging.info("Perfil guardado en %s", self.out_dir)
+
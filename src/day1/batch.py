@@ -0,0 +1,150 @@
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from .processor import contar_palabras, limpiar_texto, procesar_csv_stream, guardar_reporte
+except ImportError:  # ejecutado como script desde src/day1
+    from processor import contar_palabras, limpiar_texto, procesar_csv_stream, guardar_reporte
+
+SHARD_SIZE = 64 << 20  # TXT más grandes se reparten en trozos de ~64 MiB
+MANIFEST_NAME = "manifest.json"
+REPORT_NAME = "reporte_lote.txt"
+
+
+# ---------------- Trabajo por proceso ----------------
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _shard_ranges(path: Path, shard_size: int):
+    """Divide el fichero en rangos [inicio, fin) que terminan justo tras un '\\n'."""
+    size = path.stat().st_size
+    ranges, start = [], 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + shard_size
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()  # avanzar hasta el final de la línea en curso
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges or [(0, 0)]
+
+def _count_txt_range(path: str, start: int, end: int):
+    """(líneas, palabras) de un rango de bytes alineado a fin de línea."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lineas = palabras = 0
+    # TextIOWrapper mantiene los saltos universales ('\r\n', '\r') igual que open() en modo texto
+    for linea in io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"):
+        lineas += 1
+        palabras += contar_palabras(limpiar_texto(linea))
+    return lineas, palabras
+
+def _process_csv(path: str, output_path: str):
+    return procesar_csv_stream(path, output_path)
+
+
+# ---------------- Manifest ----------------
+def load_manifest(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+def save_manifest(manifest: dict, path: Path):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---------------- Lote ----------------
+def procesar_directorio(input_dir: Path, output_dir: Path, workers: int = None,
+                        shard_size: int = SHARD_SIZE) -> dict:
+    """Procesa todos los .txt/.csv de `input_dir` en paralelo y genera un reporte conjunto.
+
+    Los ficheros cuyo tamaño+mtime (o, si cambiaron, su hash) coinciden con el
+    manifest de la ejecución anterior se saltan y reutilizan sus totales.
+    """
+    input_dir, output_dir = Path(input_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    old = load_manifest(manifest_path)
+    files = sorted(p for p in input_dir.iterdir() if p.is_file() and p.suffix.lower() in (".txt", ".csv"))
+
+    new_manifest, pending, skipped = {}, [], 0
+    stats = {str(p): p.stat() for p in files}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1) descartar los que no cambiaron (hash sólo si cambió tamaño o mtime)
+        to_hash = [p for p in files
+                   if not (old.get(p.name, {}).get("size") == stats[str(p)].st_size
+                           and old.get(p.name, {}).get("mtime_ns") == stats[str(p)].st_mtime_ns)]
+        hashes = dict(zip(to_hash, pool.map(_sha256, [str(p) for p in to_hash])))
+        for p in files:
+            st, prev = stats[str(p)], old.get(p.name)
+            digest = hashes.get(p, prev["sha256"] if prev else None)
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+            unchanged = prev is not None and prev.get("sha256") == digest
+            if unchanged and p.suffix.lower() == ".csv":
+                unchanged = (output_dir / prev.get("output", "")).is_file()
+            if unchanged:
+                entry.update({k: v for k, v in prev.items() if k not in entry})
+                new_manifest[p.name] = entry
+                skipped += 1
+            else:
+                new_manifest[p.name] = entry
+                pending.append(p)
+
+        # 2) repartir el trabajo: TXT grandes troceados por rangos de bytes, CSV enteros
+        futures = {}
+        for p in pending:
+            if p.suffix.lower() == ".txt":
+                futures[p] = [pool.submit(_count_txt_range, str(p), a, b)
+                              for a, b in _shard_ranges(p, shard_size)]
+            else:
+                out = f"{p.stem}_resultado.csv"
+                new_manifest[p.name]["output"] = out
+                futures[p] = pool.submit(_process_csv, str(p), str(output_dir / out))
+
+        for p, fut in futures.items():
+            if isinstance(fut, list):
+                parts = [f.result() for f in fut]
+                new_manifest[p.name]["lineas"] = sum(l for l, _ in parts)
+                new_manifest[p.name]["palabras"] = sum(w for _, w in parts)
+            else:
+                new_manifest[p.name]["filas"] = fut.result()
+            logging.info(f"Procesado en lote: {p}")
+
+    save_manifest(new_manifest, manifest_path)
+
+    totales = {
+        "ficheros": len(files),
+        "procesados": len(pending),
+        "sin_cambios": skipped,
+        "lineas": sum(e.get("lineas", 0) for e in new_manifest.values()),
+        "palabras": sum(e.get("palabras", 0) for e in new_manifest.values()),
+        "filas_csv": sum(e.get("filas", 0) for e in new_manifest.values()),
+    }
+    report = [f"Total ficheros: {totales['ficheros']} (procesados: {totales['procesados']}, "
+              f"sin cambios: {totales['sin_cambios']})",
+              f"Total líneas: {totales['lineas']}",
+              f"Total palabras: {totales['palabras']}",
+              f"Total filas CSV: {totales['filas_csv']}", ""]
+    for name, e in new_manifest.items():
+        if "lineas" in e:
+            report.append(f"{name}: {e['lineas']} líneas, {e['palabras']} palabras")
+        else:
+            report.append(f"{name}: {e.get('filas', 0)} filas -> {e.get('output')}")
+    guardar_reporte("\n".join(report), output_dir / REPORT_NAME)
+    return totales
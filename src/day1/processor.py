@@ -1,25 +1,26 @@
 import logging
 import os
 
-# Crear carpeta logs si no existe
-os.makedirs(os.path.join(os.getcwd(), 'logs'), exist_ok=True)
+try:
+    from .text_normalizer import limpiar_texto_rapido
+except ImportError:  # ejecutado como script: python src/day1/processor.py
+    from text_normalizer import limpiar_texto_rapido
 
-logging.basicConfig(
-    filename=os.path.join('logs', 'app.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 
-logging.info("Iniciando procesamiento de ficheros")
+def setup_logging():
+    # Crear carpeta logs si no existe
+    os.makedirs(os.path.join(os.getcwd(), 'logs'), exist_ok=True)
 
+    logging.basicConfig(
+        filename=os.path.join('logs', 'app.log'),
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
 
-import unicodedata
 
 def limpiar_texto(texto):
-    texto = texto.strip()
-    texto = ''.join(c for c in unicodedata.normalize('NFD', texto)
-                    if unicodedata.category(c) != 'Mn')
-    return texto
+    # tabla de traducción precalculada + memo por celda; mismo resultado que NFD sin marcas Mn
+    return limpiar_texto_rapido(texto)
 
 def contar_palabras(texto):
     return len(texto.split())
@@ -45,6 +46,39 @@ def procesar_csv(file_path):
     return filas, len(filas)
 
 
+# ---------------- Modo streaming (memoria acotada) ----------------
+BUFFER_SIZE = 1 << 20  # 1 MiB por lectura/escritura
+
+
+def iter_lineas_limpias(file_path, buffer_size=BUFFER_SIZE):
+    """Genera las líneas limpias de un TXT sin cargar el fichero entero."""
+    with open(file_path, 'r', encoding='utf-8', buffering=buffer_size) as f:
+        for linea in f:
+            yield limpiar_texto(linea)
+
+def procesar_txt_stream(file_path, buffer_size=BUFFER_SIZE):
+    """Como procesar_txt pero devuelve sólo (total_lineas, total_palabras)."""
+    logging.info(f"Procesando TXT (streaming): {file_path}")
+    total_lineas = total_palabras = 0
+    for linea in iter_lineas_limpias(file_path, buffer_size):
+        total_lineas += 1
+        total_palabras += contar_palabras(linea)
+    return total_lineas, total_palabras
+
+def procesar_csv_stream(file_path, output_path, buffer_size=BUFFER_SIZE):
+    """Limpia el CSV fila a fila escribiendo el resultado sobre la marcha; devuelve nº de filas."""
+    logging.info(f"Procesando CSV (streaming): {file_path}")
+    total_filas = 0
+    with open(file_path, 'r', encoding='utf-8', buffering=buffer_size) as fin, \
+            open(output_path, 'w', newline='', encoding='utf-8', buffering=buffer_size) as fout:
+        writer = csv.writer(fout)
+        for row in csv.reader(fin):
+            writer.writerow([limpiar_texto(cell) for cell in row])
+            total_filas += 1
+    logging.info(f"Archivo CSV guardado: {output_path}")
+    return total_filas
+
+
 def guardar_resultados_csv(filas, output_path):
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
@@ -57,18 +91,41 @@ def guardar_reporte(txt, output_path):
     logging.info(f"Reporte guardado: {output_path}")
 
 
-def main():
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Procesador de ficheros (Día 1)")
+    parser.add_argument("--dir", type=str, default=None,
+                        help="Procesar en lote todos los .txt/.csv de esta carpeta")
+    parser.add_argument("--out", type=str, default="data/lote",
+                        help="Carpeta de salida del lote (resultados, manifest y reporte)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto: todos los núcleos)")
+    parser.add_argument("--shard-mb", type=int, default=64, help="Tamaño de trozo para TXT grandes (MiB)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    logging.info("Iniciando procesamiento de ficheros")
+
+    if args.dir:
+        try:
+            from .batch import procesar_directorio
+        except ImportError:
+            from batch import procesar_directorio
+        totales = procesar_directorio(args.dir, args.out, workers=args.workers,
+                                      shard_size=args.shard_mb << 20)
+        logging.info(f"Lote completado: {totales}")
+        return
+
     txt_file = 'data/ejemplo.txt'
     csv_file = 'data/ejemplo.csv'
 
-    # Procesar TXT
-    lineas, total_palabras = procesar_txt(txt_file)
-    reporte_txt = f"Total líneas: {len(lineas)}\nTotal palabras: {total_palabras}"
+    # Procesar TXT (streaming: memoria independiente del tamaño del fichero)
+    total_lineas, total_palabras = procesar_txt_stream(txt_file)
+    reporte_txt = f"Total líneas: {total_lineas}\nTotal palabras: {total_palabras}"
     guardar_reporte(reporte_txt, 'data/reporte.txt')
 
     # Procesar CSV
-    filas, total_filas = procesar_csv(csv_file)
-    guardar_resultados_csv(filas, 'data/resultado.csv')
+    procesar_csv_stream(csv_file, 'data/resultado.csv')
 
     logging.info("Procesamiento completado")
 
@@ -0,0 +1,55 @@
+import unicodedata
+from functools import lru_cache
+
+
+def _strip_marks_nfd(texto: str) -> str:
+    """Algoritmo de referencia: NFD y eliminar marcas diacríticas (categoría Mn)."""
+    return ''.join(c for c in unicodedata.normalize('NFD', texto)
+                   if unicodedata.category(c) != 'Mn')
+
+
+class _Unsafe(Exception):
+    """El carácter no se puede resolver aislado; hay que normalizar la cadena completa."""
+
+
+class _AccentTable(dict):
+    """Tabla para str.translate que se completa bajo demanda.
+
+    Un carácter se resuelve de forma aislada cuando nada de lo que sobrevive
+    a su descomposición tiene clase de combinación != 0; en ese caso NFD de
+    la cadena completa equivale a concatenar los resultados por carácter
+    (el reordenamiento canónico sólo mueve marcas, y las Mn se eliminan).
+    """
+
+    def __missing__(self, codepoint):
+        c = chr(codepoint)
+        out = _strip_marks_nfd(c)
+        if any(unicodedata.combining(o) for o in out):
+            raise _Unsafe(c)
+        self[codepoint] = out
+        return out
+
+
+_TABLE = _AccentTable()
+# rangos latinos habituales precalculados (Latin-1, Latin Extended-A/B y combinantes)
+for _cp in range(0x80, 0x370):
+    try:
+        _TABLE[_cp]
+    except _Unsafe:
+        pass
+
+
+def quitar_acentos(texto: str) -> str:
+    """Equivalente a `_strip_marks_nfd` pero con tabla de traducción."""
+    if texto.isascii():
+        return texto
+    try:
+        return texto.translate(_TABLE)
+    except _Unsafe:
+        return _strip_marks_nfd(texto)
+
+
+@lru_cache(maxsize=16384)
+def limpiar_texto_rapido(texto: str) -> str:
+    """strip + quitar acentos, memoizado (las columnas de un CSV se repiten mucho)."""
+    return quitar_acentos(texto.strip())
@@ -0,0 +1,159 @@
+import hashlib
+import io
+import logging
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+FINGERPRINT_BYTES = 4096  # huellas antiguas (sin prefijo): sólo cubrían estos primeros bytes
+FINGERPRINT_VERSION = "v2:"
+_CHUNK = 1 << 20
+
+
+def _hash_prefix(path: Path, upto: int, h=None, start: int = 0):
+    """Actualiza `h` (sha1 nuevo por defecto) con los bytes [start, upto) del fichero."""
+    h = h or hashlib.sha1()
+    with open(path, "rb") as f:
+        f.seek(start)
+        restante = upto - start
+        while restante > 0:
+            bloque = f.read(min(_CHUNK, restante))
+            if not bloque:
+                break
+            h.update(bloque)
+            restante -= len(bloque)
+    return h
+
+
+def fingerprint(path: Path, upto: int) -> str:
+    """Huella de todo el tramo ya plegado del fichero: si cambia, el histórico no es válido."""
+    return FINGERPRINT_VERSION + _hash_prefix(path, upto).hexdigest()
+
+
+def _legacy_fingerprint(path: Path, upto: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(upto, FINGERPRINT_BYTES))).hexdigest()
+
+
+class AggregateStore:
+    """Agregados parciales por fecha/categoría persistidos en SQLite.
+
+    Para cada fichero de origen guarda hasta qué byte se ha plegado, de modo
+    que cada ejecución sólo lee y agrega las filas añadidas desde la anterior,
+    y la huella de ese tramo. El hash del tramo comprobado en `offset_for` se
+    reutiliza en `fold`, que sólo añade los bytes nuevos.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS resumen (
+                fecha          TEXT NOT NULL,
+                categoria      TEXT NOT NULL,
+                total_ingresos REAL NOT NULL,
+                total_unidades REAL NOT NULL,
+                PRIMARY KEY (fecha, categoria)
+            );
+            CREATE TABLE IF NOT EXISTS origen (
+                path        TEXT PRIMARY KEY,
+                offset      INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self._hashes = {}  # path -> (offset, sha1 del tramo [0, offset))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def reset(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM resumen")
+            self._conn.execute("DELETE FROM origen")
+
+    def offset_for(self, source: Path) -> int:
+        """Byte desde el que hay datos nuevos (0 si el origen es nuevo).
+
+        Lanza ValueError si el fichero se reescribió en vez de crecer por el final.
+        """
+        key = str(Path(source).resolve())
+        row = self._conn.execute("SELECT offset, fingerprint FROM origen WHERE path = ?", (key,)).fetchone()
+        if row is None:
+            self._hashes[key] = (0, hashlib.sha1())
+            return 0
+        offset, fp = row
+        if Path(source).stat().st_size < offset:
+            raise ValueError(f"{source} cambió desde la última ejecución; use --rebuild")
+        if fp.startswith(FINGERPRINT_VERSION):
+            h = _hash_prefix(source, offset)
+            ok = fp == FINGERPRINT_VERSION + h.hexdigest()
+        else:  # estado de una versión anterior: se valida como entonces y se migra en el próximo fold
+            h = None
+            ok = fp == _legacy_fingerprint(source, offset)
+        if not ok:
+            raise ValueError(f"{source} cambió desde la última ejecución; use --rebuild")
+        if h is not None:
+            self._hashes[key] = (offset, h)
+        return offset
+
+    def fold(self, resumen: pd.DataFrame, source: Path, new_offset: int):
+        """Suma un resumen parcial y avanza el offset del origen en una sola transacción."""
+        rows = [(str(r.fecha), str(r.categoria), float(r.total_ingresos), float(r.total_unidades))
+                for r in resumen.itertuples(index=False)]
+        key = str(Path(source).resolve())
+        offset, h = self._hashes.pop(key, (0, None))
+        if h is not None and offset <= new_offset:
+            fp = FINGERPRINT_VERSION + _hash_prefix(source, new_offset, h, offset).hexdigest()
+        else:
+            fp = fingerprint(source, new_offset)
+        with self._conn:
+            self._conn.executemany("""
+                INSERT INTO resumen (fecha, categoria, total_ingresos, total_unidades)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (fecha, categoria) DO UPDATE SET
+                    total_ingresos = total_ingresos + excluded.total_ingresos,
+                    total_unidades = total_unidades + excluded.total_unidades
+            """, rows)
+            self._conn.execute("""
+                INSERT INTO origen (path, offset, fingerprint) VALUES (?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET offset = excluded.offset,
+                                                 fingerprint = excluded.fingerprint
+            """, (key, new_offset, fp))
+
+    def resumen(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT fecha, categoria, total_ingresos, total_unidades FROM resumen "
+            "ORDER BY fecha, categoria", self._conn)
+
+
+def leer_nuevas(source: Path, offset: int):
+    """Lee las filas completas añadidas tras `offset`; devuelve (DataFrame | None, nuevo_offset).
+
+    Una última línea sin salto de línea puede estar escribiéndose todavía: no se
+    pliega ni se avanza el offset sobre ella hasta que llegue su "\\n".
+    """
+    with open(source, "rb") as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        data = f.read()
+    completas = data.rfind(b"\n") + 1
+    if completas < len(data):
+        logging.info(f"{source}: última línea incompleta ({len(data) - completas} bytes), se leerá más adelante")
+        data = data[:completas]
+    if not data.strip():
+        return None, start + len(data)
+    logging.info(f"Leyendo {len(data)} bytes nuevos de {source} desde el byte {start}")
+    if not header.endswith(b"\n"):
+        header += b"\n"
+    df = pd.read_csv(io.BytesIO(header + data), sep=",", encoding="utf-8")
+    return df, start + len(data)
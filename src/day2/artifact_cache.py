@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import types
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / ".cache"
+MAX_BYTES = 256 * 1024 * 1024
+_CHUNK = 1 << 20
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """Caché local direccionada por contenido para los artefactos de cada etapa.
+
+    - La clave de una etapa es el hash de su nombre, sus parámetros, el
+      contenido de sus ficheros de entrada y el de los fuentes de su código
+      (`code`): tras cambiar la lógica de la etapa no se restauran salidas viejas.
+    - Cada artefacto se guarda una vez en blobs/<sha256> y las entradas sólo
+      apuntan a blobs; al superar `max_bytes` se desalojan las entradas menos
+      usadas recientemente (LRU) y los blobs que quedan huérfanos.
+    - Los hashes de las entradas se recuerdan por (tamaño, mtime) para no
+      releer ficheros grandes que no han cambiado.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite"))
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entradas (
+                clave     TEXT PRIMARY KEY,
+                etapa     TEXT NOT NULL,
+                manifest  TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size   INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS hashes (
+                path     TEXT PRIMARY KEY,
+                size     INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest   TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    # ---------- claves ----------
+    def file_digest(self, path: Path) -> str:
+        path = Path(path).resolve()
+        st = path.stat()
+        row = self._conn.execute("SELECT size, mtime_ns, digest FROM hashes WHERE path = ?",
+                                 (str(path),)).fetchone()
+        if row is not None and row[:2] == (st.st_size, st.st_mtime_ns):
+            return row[2]
+        digest = _sha256_file(path)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO hashes (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                               (str(path), st.st_size, st.st_mtime_ns, digest))
+        return digest
+
+    def key(self, stage: str, inputs=(), params: dict = None, code=()) -> str:
+        """`code`: funciones, módulos o rutas de los fuentes que implementan la etapa."""
+        payload = {"stage": stage, "params": params or {},
+                   "inputs": [self.file_digest(p) for p in inputs],
+                   "code": [self.file_digest(_source_path(c)) for c in code]}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    # ---------- lectura / escritura ----------
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def get(self, key: str):
+        """{nombre: ruta del blob} de la entrada, o None si no está (o le falta algún blob)."""
+        row = self._conn.execute("SELECT manifest FROM entradas WHERE clave = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        blobs = {name: self._blob_path(d) for name, d in json.loads(row[0]).items()}
+        if not all(p.exists() for p in blobs.values()):
+            return None
+        with self._conn:
+            self._conn.execute("UPDATE entradas SET last_used = ? WHERE clave = ?", (time.time(), key))
+        return blobs
+
+    def put(self, key: str, stage: str, artifacts: dict):
+        """Guarda {nombre: Path | bytes} bajo `key` y desaloja por LRU si hace falta.
+
+        Los ficheros se hashean y copian por bloques: un CSV de salida grande no
+        se carga entero en memoria.
+        """
+        manifest = {}
+        for name, artifact in artifacts.items():
+            if isinstance(artifact, bytes):
+                digest, size = hashlib.sha256(artifact).hexdigest(), len(artifact)
+            else:
+                digest, size = _sha256_file(artifact), Path(artifact).stat().st_size
+            blob = self._blob_path(digest)
+            if not blob.exists():
+                blob.parent.mkdir(exist_ok=True)
+                tmp = blob.with_suffix(".tmp")
+                if isinstance(artifact, bytes):
+                    tmp.write_bytes(artifact)
+                else:
+                    shutil.copyfile(artifact, tmp)
+                os.replace(tmp, blob)
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO blobs (digest, size) VALUES (?, ?)", (digest, size))
+            manifest[name] = digest
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO entradas (clave, etapa, manifest, last_used) "
+                               "VALUES (?, ?, ?, ?)", (key, stage, json.dumps(manifest), time.time()))
+        self.evict()
+
+    def size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self) -> int:
+        """Desaloja entradas LRU hasta quedar por debajo de `max_bytes` (siempre queda la más reciente)."""
+        desalojadas = 0
+        while self.size() > self.max_bytes:
+            claves = self._conn.execute("SELECT clave FROM entradas ORDER BY last_used ASC").fetchall()
+            if len(claves) <= 1:
+                break
+            with self._conn:
+                self._conn.execute("DELETE FROM entradas WHERE clave = ?", claves[0])
+            desalojadas += 1
+            self._borrar_huerfanos()
+        return desalojadas
+
+    def _borrar_huerfanos(self):
+        vivos = set()
+        for (manifest,) in self._conn.execute("SELECT manifest FROM entradas"):
+            vivos.update(json.loads(manifest).values())
+        for (digest,) in self._conn.execute("SELECT digest FROM blobs").fetchall():
+            if digest not in vivos:
+                self._blob_path(digest).unlink(missing_ok=True)
+                with self._conn:
+                    self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+
+
+def _source_path(obj) -> Path:
+    """Fichero fuente de una función, un módulo o una ruta."""
+    if isinstance(obj, (str, Path)):
+        return Path(obj)
+    module = obj if isinstance(obj, types.ModuleType) else sys.modules[obj.__module__]
+    return Path(module.__file__)
+
+
+# ---------------- Memoización de etapas ----------------
+def memoize_files(cache, stage: str, inputs, params: dict, build, code=()):
+    """Ejecuta `build()` (devuelve las rutas que escribe) salvo que la caché tenga ya
+    esas salidas para las mismas entradas, parámetros y código; en ese caso las restaura.
+
+    Devuelve (rutas, hit). Con cache=None (--no-cache) siempre construye.
+    """
+    if cache is None:
+        return build(), False
+    key = cache.key(stage, inputs, params, code)
+    blobs = cache.get(key)
+    if blobs is not None:
+        logging.info(f"Caché HIT {stage} ({key[:12]}): se omite la etapa")
+        paths = []
+        for dest, blob in blobs.items():
+            dest = Path(dest)
+            if not dest.exists() or cache.file_digest(dest) != blob.name:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(blob, dest)
+            paths.append(dest)
+        return paths, True
+    logging.info(f"Caché MISS {stage} ({key[:12]})")
+    paths = [Path(p) for p in build()]
+    cache.put(key, stage, {str(p.resolve()): p for p in paths})
+    return paths, False
+
+
+def memoize_text(cache, stage: str, inputs, params: dict, compute, code=()) -> str:
+    """Como `memoize_files` para etapas que producen texto en vez de ficheros."""
+    if cache is None:
+        return compute()
+    key = cache.key(stage, inputs, params, code)
+    blobs = cache.get(key)
+    if blobs is not None:
+        logging.info(f"Caché HIT {stage} ({key[:12]}): se omite la etapa")
+        return blobs["texto"].read_text(encoding="utf-8")
+    logging.info(f"Caché MISS {stage} ({key[:12]})")
+    texto = compute()
+    cache.put(key, stage, {"texto": texto.encode("utf-8")})
+    return texto
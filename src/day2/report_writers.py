@@ -0,0 +1,89 @@
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:  # pandas sólo hace falta al escribir; BACKENDS se importa desde CLIs ligeras
+    import pandas as pd
+
+# Backends de escritura de informes. Todos reciben {nombre_hoja: DataFrame}:
+#   openpyxl     -> pd.ExcelWriter clásico (modelo completo del libro en memoria)
+#   xlsx-stream  -> openpyxl en modo write_only: filas volcadas en streaming, memoria constante
+#   csv/parquet  -> un fichero por hoja, siempre <stem>.<Hoja>.<ext> (también con una sola hoja)
+BACKENDS = ("openpyxl", "xlsx-stream", "csv", "parquet")
+DEFAULT_BACKEND = "openpyxl"
+
+
+def _write_openpyxl(sheets: Dict[str, "pd.DataFrame"], path: Path) -> List[Path]:
+    import pandas as pd
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return [path]
+
+
+STREAM_CHUNK_ROWS = 10_000
+
+
+def _iter_rows(df: "pd.DataFrame"):
+    """Filas como listas Python con NaN/NaT -> None (como deja pandas las celdas vacías).
+
+    La conversión se hace vectorizada por bloques para no copiar el DataFrame entero.
+    """
+    for start in range(0, len(df), STREAM_CHUNK_ROWS):
+        block = df.iloc[start:start + STREAM_CHUNK_ROWS]
+        block = block.astype(object).where(block.notna(), None)
+        yield from block.itertuples(index=False, name=None)
+
+
+def _write_xlsx_stream(sheets: Dict[str, "pd.DataFrame"], path: Path) -> List[Path]:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for name, df in sheets.items():
+        ws = wb.create_sheet(title=name)
+        ws.append([str(c) for c in df.columns])
+        for row in _iter_rows(df):
+            ws.append(row)
+    wb.save(path)
+    return [path]
+
+
+def _per_sheet_paths(sheets: Dict[str, "pd.DataFrame"], path: Path, ext: str) -> Dict[str, Path]:
+    base = path.with_suffix("")
+    return {name: base.parent / f"{base.name}.{name}{ext}" for name in sheets}
+
+
+def _write_csv(sheets: Dict[str, "pd.DataFrame"], path: Path) -> List[Path]:
+    out = _per_sheet_paths(sheets, path, ".csv")
+    for name, df in sheets.items():
+        df.to_csv(out[name], index=False, encoding="utf-8")
+    return list(out.values())
+
+
+def _write_parquet(sheets: Dict[str, "pd.DataFrame"], path: Path) -> List[Path]:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("El backend parquet necesita pyarrow (pip install pyarrow)") from e
+    out = _per_sheet_paths(sheets, path, ".parquet")
+    for name, df in sheets.items():
+        df.to_parquet(out[name], index=False)
+    return list(out.values())
+
+
+_WRITERS = {
+    "openpyxl": _write_openpyxl,
+    "xlsx-stream": _write_xlsx_stream,
+    "csv": _write_csv,
+    "parquet": _write_parquet,
+}
+
+
+def write_report(sheets: Dict[str, "pd.DataFrame"], path: Path, backend: str = DEFAULT_BACKEND) -> List[Path]:
+    """Escribe las hojas con el backend elegido; devuelve los ficheros generados."""
+    if backend not in _WRITERS:
+        raise ValueError(f"Backend de informe desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+    path = Path(path)
+    logging.info(f"Escribiendo informe ({backend}): {path}")
+    return _WRITERS[backend](sheets, path)
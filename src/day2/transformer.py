@@ -1,75 +1,298 @@
 import logging
 import sys
+from contextlib import nullcontext
 import pandas as pd
 from pathlib import Path
 
+try:
+    from .agg_store import AggregateStore, leer_nuevas
+    from .artifact_cache import ArtifactCache, memoize_files
+    from .report_writers import BACKENDS, DEFAULT_BACKEND, write_report
+    from .validation import EsquemaCompilado, cargar_esquema, esquema_por_defecto, log_conteos
+except ImportError:  # ejecutado como script: python src/day2/transformer.py
+    from agg_store import AggregateStore, leer_nuevas
+    from artifact_cache import ArtifactCache, memoize_files
+    from report_writers import BACKENDS, DEFAULT_BACKEND, write_report
+    from validation import EsquemaCompilado, cargar_esquema, esquema_por_defecto, log_conteos
+
 # ---------------- Configuración de rutas ----------------
 DATA_DIR = Path("data")
 OUTPUT_EXCEL = DATA_DIR / "informe.xlsx"
 RECHAZADAS = DATA_DIR / "rechazadas.csv"
 INPUT_CSV = DATA_DIR / "ventas.csv"
+DATOS_CSV = DATA_DIR / "datos_validos.csv"  # filas válidas en modo por chunks
+ESTADO_DB = DATA_DIR / "ventas_estado.sqlite"  # agregados parciales del modo incremental
+CACHE_DIR = DATA_DIR / ".cache"  # artefactos ya generados (ver artifact_cache)
 
 LOGS_DIR = Path("logs")
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOGS_DIR / "app.log"
 
+# tipos explícitos para el parser C: precio/cantidad como texto para poder coaccionar valores erróneos
+DTYPES_CHUNK = {'fecha': 'string', 'categoria': 'category', 'producto': 'category',
+                'precio': 'string', 'cantidad': 'string'}
+
 # ---------------- Configuración de logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),           # imprime en consola
-        logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")  # guarda en logs/app.log
-    ]
-)
+def setup_logging():
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout),           # imprime en consola
+            logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")  # guarda en logs/app.log
+        ]
+    )
 
 # ---------------- Lógica principal ----------------
-# Cargar CSV en un DataFrame
-logging.info(f"Leyendo CSV: {INPUT_CSV}")
-df = pd.read_csv(INPUT_CSV, sep=",", encoding="utf-8", engine="python") # forzar separador y encoding
-
-# Validar tipos: precio y cantidad deben ser numéricos
-logging.info("Validando tipos de columnas numéricas")
-df['precio'] = pd.to_numeric(df['precio'], errors='coerce')
-df['cantidad'] = pd.to_numeric(df['cantidad'], errors='coerce')
-
-# Detectar filas inválidas (valores nulos en columnas clave)
-logging.info("Separando filas válidas e inválidas")
-invalid_rows = df[df[['fecha','categoria','producto','precio','cantidad']].isnull().any(axis=1)]
-valid_rows = df.dropna(subset=['fecha','categoria','producto','precio','cantidad'])
-
-# Guardar filas rechazadas
-if not invalid_rows.empty:
-    logging.info(f"Guardando filas rechazadas en: {RECHAZADAS}")
-    invalid_rows.to_csv(RECHAZADAS, index=False)
-else:
-    logging.info("No se encontraron filas inválidas")
-
-# Normalización de textos
-valid_rows['categoria'] = valid_rows['categoria'].str.strip().str.title()
-valid_rows['producto'] = valid_rows['producto'].str.strip().str.title()
-
-# Agregación por fecha/categoría
-logging.info("Generando resumen de ventas")
-resumen = (
-    valid_rows
-    .groupby(['fecha','categoria'])
-    .agg(total_ingresos=('precio', lambda x: (x * valid_rows.loc[x.index,'cantidad']).sum()),
-         total_unidades=('cantidad','sum'))
-    .reset_index()
-)
-
-# Exportar a Excel
-logging.info(f"Exportando informe a Excel: {OUTPUT_EXCEL}")
-with pd.ExcelWriter(OUTPUT_EXCEL, engine="openpyxl") as writer:
-    valid_rows.to_excel(writer, sheet_name="Datos", index=False)
-    resumen.to_excel(writer, sheet_name="Resumen", index=False)
-
-def main():
+def leer_ventas(path: Path = INPUT_CSV) -> pd.DataFrame:
+    logging.info(f"Leyendo CSV: {path}")
+    return pd.read_csv(path, sep=",", encoding="utf-8", engine="python") # forzar separador y encoding
+
+def validar_detallado(df: pd.DataFrame, esquema: EsquemaCompilado = None):
+    """Valida con el esquema -> (válidas, rechazadas con columna 'motivo', máscara de bits, conteos por regla)."""
+    esquema = esquema or esquema_por_defecto()
+    logging.info("Validando filas contra el esquema")
+    df, mask = esquema.evaluar(df)
+
+    logging.info("Separando filas válidas e inválidas")
+    invalid_mask = mask != 0
+    invalid_rows = df[invalid_mask].copy()
+    invalid_rows['motivo'] = esquema.motivos(mask[invalid_mask])
+    conteos = esquema.conteos(mask)
+    log_conteos(conteos)
+    return df[~invalid_mask].copy(), invalid_rows, mask, conteos
+
+def validar(df: pd.DataFrame, esquema: EsquemaCompilado = None):
+    """Convierte las columnas numéricas y separa filas válidas e inválidas."""
+    valid_rows, invalid_rows, _, _ = validar_detallado(df, esquema)
+    return valid_rows, invalid_rows
+
+def _normalizar_texto(col: pd.Series) -> pd.Series:
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # sólo se normalizan las categorías, no cada fila
+        cats = col.cat.categories
+        return col.map(dict(zip(cats, cats.str.strip().str.title())))
+    return col.str.strip().str.title()
+
+def normalizar(valid_rows: pd.DataFrame) -> pd.DataFrame:
+    # Normalización de textos
+    valid_rows['categoria'] = _normalizar_texto(valid_rows['categoria'])
+    valid_rows['producto'] = _normalizar_texto(valid_rows['producto'])
+    return valid_rows
+
+def resumir(valid_rows: pd.DataFrame) -> pd.DataFrame:
+    """Agregación por fecha/categoría: ingresos como una sola columna vectorizada + sumas nativas."""
+    logging.info("Generando resumen de ventas")
+    return (
+        valid_rows[['fecha', 'categoria']]
+        .assign(total_ingresos=valid_rows['precio'] * valid_rows['cantidad'],
+                total_unidades=valid_rows['cantidad'])
+        .groupby(['fecha', 'categoria'], observed=True)
+        .sum()
+        .reset_index()
+    )
+
+def transformar(df: pd.DataFrame, esquema: EsquemaCompilado = None):
+    """DataFrame de ventas -> (válidas normalizadas, rechazadas, resumen)."""
+    valid_rows, invalid_rows = validar(df, esquema)
+    valid_rows = normalizar(valid_rows)
+    return valid_rows, invalid_rows, resumir(valid_rows)
+
+def combinar_resumenes(parciales) -> pd.DataFrame:
+    """Suma varios resúmenes parciales (mismas columnas que `resumir`) por fecha/categoría."""
+    return (pd.concat(parciales, ignore_index=True)
+            .astype({'fecha': object, 'categoria': object})
+            .groupby(['fecha', 'categoria'])
+            .sum()
+            .reset_index())
+
+def transformar_por_chunks(path: Path = INPUT_CSV, chunksize: int = 500_000,
+                           rechazadas: Path = RECHAZADAS, datos_csv: Path = DATOS_CSV,
+                           esquema: EsquemaCompilado = None):
+    """Ingesta fuera de memoria: lee con el parser C por chunks, valida cada uno y
+    combina sus agregados parciales. Las filas rechazadas y las válidas se vuelcan
+    a CSV según se procesan; devuelve (resumen, n_validas, n_rechazadas).
+    """
+    logging.info(f"Leyendo CSV por chunks de {chunksize} filas: {path}")
+    parciales = []
+    n_validas = n_rechazadas = 0
+    rechazadas_abierto = datos_abierto = False
+    reader = pd.read_csv(path, sep=",", encoding="utf-8", engine="c",
+                         dtype=DTYPES_CHUNK, chunksize=chunksize)
+    for chunk in reader:
+        valid_rows, invalid_rows = validar(chunk, esquema)
+        valid_rows = normalizar(valid_rows)
+        parciales.append(resumir(valid_rows))
+        if len(parciales) >= 32:
+            # plegar los parciales para que la memoria no crezca con el nº de chunks
+            parciales = [combinar_resumenes(parciales)]
+        if not invalid_rows.empty:
+            invalid_rows.to_csv(rechazadas, index=False, mode="a" if rechazadas_abierto else "w",
+                                header=not rechazadas_abierto)
+            rechazadas_abierto = True
+        if datos_csv is not None:
+            valid_rows.to_csv(datos_csv, index=False, mode="a" if datos_abierto else "w",
+                              header=not datos_abierto)
+            datos_abierto = True
+        n_validas += len(valid_rows)
+        n_rechazadas += len(invalid_rows)
+
+    if not rechazadas_abierto:
+        logging.info("No se encontraron filas inválidas")
+    if parciales:
+        resumen = combinar_resumenes(parciales)
+    else:
+        resumen = pd.DataFrame(columns=['fecha', 'categoria', 'total_ingresos', 'total_unidades'])
+    logging.info(f"Chunks procesados: {n_validas} filas válidas, {n_rechazadas} rechazadas")
+    return resumen, n_validas, n_rechazadas
+
+def actualizar_incremental(store: AggregateStore, path: Path = INPUT_CSV,
+                           rechazadas: Path = RECHAZADAS, esquema: EsquemaCompilado = None) -> pd.DataFrame:
+    """Pliega en `store` sólo las filas añadidas a `path` desde la última ejecución."""
+    offset = store.offset_for(path)
+    df, new_offset = leer_nuevas(path, offset)
+    if df is None:
+        logging.info(f"Sin datos nuevos en {path}")
+    else:
+        _, invalid_rows, resumen = transformar(df, esquema)
+        if not invalid_rows.empty:
+            logging.info(f"Guardando filas rechazadas en: {rechazadas}")
+            invalid_rows.to_csv(rechazadas, index=False, mode="w" if offset == 0 else "a",
+                                header=offset == 0 or not Path(rechazadas).exists())
+        store.fold(resumen, path, new_offset)
+        logging.info(f"Plegadas {len(df)} filas nuevas en {store.path}")
+    return store.resumen()
+
+def resumenes_iguales(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """Compara dos hojas Resumen (tipos aparte; tolerancia mínima por el orden de las sumas)."""
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True),
+                                      check_dtype=False, rtol=1e-12)
+        return True
+    except AssertionError:
+        logging.exception("Las hojas Resumen no coinciden")
+        return False
+
+def guardar_rechazadas(invalid_rows: pd.DataFrame, path: Path = RECHAZADAS):
+    # Guardar filas rechazadas
+    if not invalid_rows.empty:
+        logging.info(f"Guardando filas rechazadas en: {path}")
+        invalid_rows.to_csv(path, index=False)
+    else:
+        logging.info("No se encontraron filas inválidas")
+
+def exportar_excel(valid_rows: pd.DataFrame, resumen: pd.DataFrame, path: Path = OUTPUT_EXCEL,
+                   backend: str = DEFAULT_BACKEND):
+    # Exportar a Excel (u otro formato columnar, mismas hojas)
+    logging.info(f"Exportando informe: {path}")
+    return write_report({"Datos": valid_rows, "Resumen": resumen}, path, backend)
+
+def exportar_resumen(resumen: pd.DataFrame, path: Path = OUTPUT_EXCEL, backend: str = DEFAULT_BACKEND):
+    """Informe sólo con la hoja Resumen (modos por chunks e incremental)."""
+    logging.info(f"Exportando resumen: {path}")
+    return write_report({"Resumen": resumen}, path, backend)
+
+def _crear_profiler():
+    try:
+        from rpa_lab.profiling import Profiler, profile_dir
+    except ImportError:  # python src/day2/transformer.py: la raíz del repo no está en sys.path
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+        from rpa_lab.profiling import Profiler, profile_dir
+    return Profiler(profile_dir(LOGS_DIR))
+
+def _etapa(profiler, nombre: str):
+    return profiler.stage(nombre) if profiler is not None else nullcontext()
+
+def _generar(args, profiler, esquema) -> list:
+    """Modos completo y por chunks; devuelve los ficheros escritos."""
+    if args.chunksize:
+        with _etapa(profiler, "chunks"):
+            resumen, _, n_rechazadas = transformar_por_chunks(INPUT_CSV, args.chunksize, RECHAZADAS,
+                                                               DATOS_CSV, esquema)
+        # la hoja Datos no cabe en Excel con ficheros grandes: las filas válidas van a DATOS_CSV
+        logging.info(f"Filas válidas volcadas en {DATOS_CSV}")
+        with _etapa(profiler, "exportar"):
+            salidas = exportar_resumen(resumen, OUTPUT_EXCEL, args.formato) + [DATOS_CSV]
+    else:
+        with _etapa(profiler, "leer"):
+            df = leer_ventas(INPUT_CSV)
+        with _etapa(profiler, "transformar"):
+            valid_rows, invalid_rows, resumen = transformar(df, esquema)
+        with _etapa(profiler, "rechazadas"):
+            guardar_rechazadas(invalid_rows, RECHAZADAS)
+        n_rechazadas = len(invalid_rows)
+        with _etapa(profiler, "exportar"):
+            salidas = exportar_excel(valid_rows, resumen, OUTPUT_EXCEL, args.formato)
+    return salidas + ([RECHAZADAS] if n_rechazadas else [])
+
+def _ejecutar(args, profiler) -> int:
+    esquema = EsquemaCompilado(cargar_esquema(args.esquema)) if args.esquema else None
+    if args.incremental or args.rebuild or args.verify:
+        with AggregateStore(Path(args.estado)) as store:
+            if args.rebuild:
+                store.reset()
+            with _etapa(profiler, "incremental"):
+                resumen = actualizar_incremental(store, INPUT_CSV, RECHAZADAS, esquema)
+            if args.verify:
+                with _etapa(profiler, "verificar"):
+                    completo = transformar(leer_ventas(INPUT_CSV), esquema)[2]
+                if not resumenes_iguales(resumen, completo):
+                    return 1
+                logging.info("Verificación OK: incremental == recálculo completo")
+        with _etapa(profiler, "exportar"):
+            exportar_resumen(resumen, OUTPUT_EXCEL, args.formato)
+    else:
+        # informe a partir de un CSV idéntico con los mismos parámetros: se restaura de la caché
+        cache = None if args.no_cache else ArtifactCache(CACHE_DIR)
+        entradas = [INPUT_CSV] + ([Path(args.esquema)] if args.esquema else [])
+        params = {"modo": "chunks" if args.chunksize else "completo", "formato": args.formato,
+                  "salidas": [str(p.resolve()) for p in (OUTPUT_EXCEL, RECHAZADAS, DATOS_CSV)]}
+        try:
+            memoize_files(cache, "transformer", entradas, params,
+                          lambda: _generar(args, profiler, esquema),
+                          code=[transformar, write_report, cargar_esquema])
+        finally:
+            if cache is not None:
+                cache.close()
+    return 0
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Transformador de ventas (Día 2)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Procesar por chunks de N filas (ficheros mayores que la RAM)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Plegar sólo las filas nuevas en el almacén de agregados")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Vaciar el almacén y volver a plegar todo el histórico")
+    parser.add_argument("--verify", action="store_true",
+                        help="Comprobar que el almacén coincide con un recálculo completo")
+    parser.add_argument("--estado", type=str, default=str(ESTADO_DB), help="Almacén SQLite de agregados")
+    parser.add_argument("--esquema", type=str, default=None,
+                        help="JSON con el esquema de validación (por defecto: requeridos + numéricos)")
+    parser.add_argument("--formato", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Backend de escritura del informe (xlsx-stream = memoria constante)")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile + tracemalloc + pilas plegadas por etapa en logs/profile_<timestamp>/")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Regenerar el informe aunque ventas.csv y los parámetros no hayan cambiado")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    profiler = _crear_profiler() if args.profile else None
+    try:
+        rc = _ejecutar(args, profiler)
+    finally:
+        if profiler is not None:
+            profiler.close()
+    if rc:
+        return rc
+
     logging.info("Transformación completada con éxito ✅")
     print("Transformación completada.")
     print(f"Informe generado en: {OUTPUT_EXCEL}")
     print(f"Rechazadas guardadas en: {RECHAZADAS}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
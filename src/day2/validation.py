@@ -0,0 +1,134 @@
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Esquema declarativo: columna -> reglas. Reglas soportadas:
+#   requerido: True            -> valor no nulo
+#   tipo: "numerico"           -> convertible a número (la columna se devuelve ya convertida)
+#   min / max: número          -> rango (exige tipo "numerico" en la misma columna)
+#   valores: [..]              -> categorías permitidas (sin distinguir mayúsculas ni espacios)
+#   formato_fecha: "%Y-%m-%d"  -> fecha con ese formato
+# El esquema por defecto reproduce la validación histórica del transformador.
+ESQUEMA_VENTAS = {
+    "fecha": {"requerido": True},
+    "categoria": {"requerido": True},
+    "producto": {"requerido": True},
+    "precio": {"requerido": True, "tipo": "numerico"},
+    "cantidad": {"requerido": True, "tipo": "numerico"},
+}
+
+_CLAVES = {"requerido", "tipo", "min", "max", "valores", "formato_fecha"}
+
+
+def cargar_esquema(path: Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+class EsquemaCompilado:
+    """Esquema traducido a una lista de reglas con un bit cada una.
+
+    `evaluar` recorre el DataFrame una vez por columna (conversiones) y una vez
+    por regla con operaciones vectorizadas; el resultado es una máscara de bits
+    por fila con las reglas que ha incumplido.
+    """
+
+    def __init__(self, esquema: dict):
+        self.reglas = []  # (nombre, columna, tipo, parámetro)
+        self.numericas = []
+        for columna, spec in esquema.items():
+            desconocidas = set(spec) - _CLAVES
+            if desconocidas:
+                raise ValueError(f"Reglas desconocidas para {columna}: {sorted(desconocidas)}")
+            if spec.get("requerido"):
+                self.reglas.append((f"{columna}:requerido", columna, "requerido", None))
+            if spec.get("tipo") == "numerico":
+                self.numericas.append(columna)
+                self.reglas.append((f"{columna}:numerico", columna, "numerico", None))
+            elif spec.get("tipo") not in (None, "texto"):
+                raise ValueError(f"Tipo no soportado para {columna}: {spec['tipo']}")
+            for limite in ("min", "max"):
+                if limite not in spec:
+                    continue
+                # se comprueba aquí y no al evaluar: comparar texto con un número lanza TypeError a mitad de lote
+                if spec.get("tipo") != "numerico":
+                    raise ValueError(f"'{limite}' requiere tipo 'numerico' en {columna}")
+                param = spec[limite]
+                if isinstance(param, bool) or not isinstance(param, (int, float)):
+                    raise ValueError(f"'{limite}' debe ser un número en {columna}: {param!r}")
+                self.reglas.append((f"{columna}:{limite}", columna, limite, param))
+            if "valores" in spec:
+                permitidos = {str(v).strip().casefold() for v in spec["valores"]}
+                self.reglas.append((f"{columna}:valores", columna, "valores", permitidos))
+            if "formato_fecha" in spec:
+                self.reglas.append((f"{columna}:formato_fecha", columna, "formato_fecha", spec["formato_fecha"]))
+        if len(self.reglas) > 64:
+            raise ValueError("Máximo 64 reglas por esquema")
+        self.nombres = [r[0] for r in self.reglas]
+
+    def evaluar(self, df: pd.DataFrame):
+        """Devuelve (df con columnas numéricas convertidas, máscara uint64 de reglas fallidas)."""
+        df = df.copy()
+        # nulos tras convertir; en columnas numéricas se separa después lo que ya era nulo
+        # (requerido) de lo que no se pudo convertir (numerico) mirando sólo esas filas
+        nulos, nulos_originales = {}, {}
+        for c in self.numericas:
+            original = df[c]
+            df[c] = pd.to_numeric(original, errors='coerce')
+            nulos[c] = df[c].isna().to_numpy()
+            idx = np.flatnonzero(nulos[c])
+            previos = np.zeros(len(df), dtype=bool)
+            previos[idx] = original.iloc[idx].isna().to_numpy()
+            nulos_originales[c] = previos
+
+        mask = np.zeros(len(df), dtype=np.uint64)
+        for bit, (_, columna, tipo, param) in enumerate(self.reglas):
+            col = df[columna]
+            if tipo == "requerido":
+                if columna in nulos_originales:
+                    fallo = nulos_originales[columna]
+                else:
+                    fallo = nulos.setdefault(columna, col.isna().to_numpy())
+            elif tipo == "numerico":
+                fallo = nulos[columna] & ~nulos_originales[columna]
+            elif tipo == "min":
+                fallo = col < param
+            elif tipo == "max":
+                fallo = col > param
+            elif tipo == "valores":
+                texto = col.astype("string").str.strip().str.casefold()
+                fallo = col.notna() & ~texto.isin(param)
+            else:  # formato_fecha
+                fechas = pd.to_datetime(col, format=param, errors='coerce')
+                fallo = fechas.isna() & col.notna()
+            if isinstance(fallo, pd.Series):
+                fallo = fallo.to_numpy(dtype=bool, na_value=False)
+            mask |= fallo.astype(np.uint64) << np.uint64(bit)
+        return df, mask
+
+    def motivos(self, mask: np.ndarray) -> list:
+        """Texto 'regla;regla' por fila (se calcula una vez por combinación distinta)."""
+        unicos, inversa = np.unique(mask, return_inverse=True)
+        textos = [";".join(n for bit, n in enumerate(self.nombres) if int(m) >> bit & 1) for m in unicos]
+        return [textos[i] for i in inversa]
+
+    def conteos(self, mask: np.ndarray) -> dict:
+        return {n: int(((mask >> np.uint64(bit)) & np.uint64(1)).sum()) for bit, n in enumerate(self.nombres)}
+
+
+_DEFAULT = None
+
+
+def esquema_por_defecto() -> EsquemaCompilado:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = EsquemaCompilado(ESQUEMA_VENTAS)
+    return _DEFAULT
+
+
+def log_conteos(conteos: dict):
+    for nombre, n in conteos.items():
+        if n:
+            logging.info(f"Regla {nombre}: {n} filas")
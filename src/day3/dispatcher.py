@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+
+# ---------------- Limitación de ritmo ----------------
+class TokenBucket:
+    """Token bucket thread-safe: `rate` tokens cada `per` segundos, ráfaga máxima `capacity`."""
+
+    def __init__(self, rate: float, per: float = 1.0, capacity: float = None,
+                 clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate debe ser > 0")
+        self.rate = rate
+        self.per = per
+        # con rate < 1 la ráfaga por defecto sería < 1 token y acquire() nunca podría consumir
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        if self.capacity < 1:
+            raise ValueError("capacity debe ser >= 1")
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate / self.per)
+                self._last = now
+                # tolerancia: el relleno en coma flotante puede quedarse en 0.999...
+                if self._tokens >= 1 - 1e-9:
+                    self._tokens = max(self._tokens - 1, 0.0)
+                    return
+                wait = (1 - self._tokens) * self.per / self.rate
+            self._sleep(wait)
+
+
+class RateLimiter:
+    """Límite global de mensajes por segundo y/o por minuto (cuotas del proveedor)."""
+
+    def __init__(self, per_second: float = None, per_minute: float = None, **bucket_kwargs):
+        self.buckets = []
+        if per_second:
+            self.buckets.append(TokenBucket(per_second, per=1.0, **bucket_kwargs))
+        if per_minute:
+            self.buckets.append(TokenBucket(per_minute, per=60.0, **bucket_kwargs))
+
+    def acquire(self):
+        for bucket in self.buckets:
+            bucket.acquire()
+
+
+# ---------------- Planificador ----------------
+def dispatch(jobs: Iterable, send: Callable[[object], bool], concurrency: int = 1,
+             limiter: RateLimiter = None) -> dict:
+    """Ejecuta `send(job)` para cada job con `concurrency` hilos.
+
+    Los jobs se consumen de forma perezosa: nunca hay más de 2 x concurrency
+    pendientes, así que el iterable puede ser un generador sobre un CSV enorme.
+    Devuelve {"sent": n, "failed": m}; una excepción en `send` cuenta como fallo.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency debe ser >= 1")
+    counts = {"sent": 0, "failed": 0}
+    lock = threading.Lock()
+    inflight = threading.BoundedSemaphore(concurrency * 2)
+
+    def _run(job):
+        try:
+            if limiter is not None:
+                limiter.acquire()
+            ok = bool(send(job))
+        except Exception:
+            logging.exception(f"Error no controlado enviando {job!r}")
+            ok = False
+        finally:
+            inflight.release()
+        with lock:
+            counts["sent" if ok else "failed"] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mailer") as executor:
+        for job in jobs:
+            inflight.acquire()
+            executor.submit(_run, job)
+    return counts
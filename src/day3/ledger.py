@@ -0,0 +1,82 @@
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+
+class SentLedger:
+    """Registro persistente (SQLite) de envíos confirmados, por campaña + email.
+
+    - `record()` se llama tras cada envío correcto y hace commit inmediato,
+      así un fallo a mitad de campaña no pierde lo ya enviado.
+    - `mark_seen()` deduplica direcciones en streaming sobre una tabla en
+      disco, de modo que la memoria no crece con el tamaño del CSV.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sent (
+                campaign TEXT NOT NULL,
+                email    TEXT NOT NULL,
+                sent_at  TEXT NOT NULL,
+                PRIMARY KEY (campaign, email)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS seen (
+                campaign TEXT NOT NULL,
+                email    TEXT NOT NULL,
+                PRIMARY KEY (campaign, email)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def key(email: str) -> str:
+        return email.strip().lower()
+
+    def start_run(self, campaign: str):
+        """Vacía la tabla de deduplicación de la campaña al empezar una pasada."""
+        with self._lock:
+            self._conn.execute("DELETE FROM seen WHERE campaign = ?", (campaign,))
+            self._conn.commit()
+
+    def mark_seen(self, campaign: str, email: str) -> bool:
+        """True si es la primera vez que aparece `email` en esta pasada."""
+        with self._lock:
+            cur = self._conn.execute("INSERT OR IGNORE INTO seen (campaign, email) VALUES (?, ?)",
+                                     (campaign, self.key(email)))
+            # sin commit por fila: la tabla seen sólo vale para la pasada actual
+            return cur.rowcount == 1
+
+    def is_sent(self, campaign: str, email: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("SELECT 1 FROM sent WHERE campaign = ? AND email = ?",
+                                     (campaign, self.key(email)))
+            return cur.fetchone() is not None
+
+    def record(self, campaign: str, email: str):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO sent (campaign, email, sent_at) VALUES (?, ?, ?)",
+                               (campaign, self.key(email), datetime.now().isoformat(timespec="seconds")))
+            self._conn.commit()
+
+    def count(self, campaign: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sent WHERE campaign = ?",
+                                      (campaign,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
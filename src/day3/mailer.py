@@ -2,46 +2,59 @@ import logging
 import sys
 import os
 import csv
+import hashlib
 import re
 import mimetypes
-import smtplib
 from email.message import EmailMessage
 from pathlib import Path
 from typing import List
 from dotenv import load_dotenv
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 import argparse
 
+try:
+    from .smtp_pool import SMTPPool
+    from .dispatcher import RateLimiter, dispatch
+    from .message_builder import CampaignMessageBuilder, simple_text_from_html
+    from .ledger import SentLedger
+except ImportError:  # ejecutado como script: python src/day3/mailer.py
+    from smtp_pool import SMTPPool
+    from dispatcher import RateLimiter, dispatch
+    from message_builder import CampaignMessageBuilder, simple_text_from_html
+    from ledger import SentLedger
+
 # ---------------- Rutas ----------------
 BASE_DIR = Path.cwd()
 DATA_DIR = BASE_DIR / "data"
 TEMPLATES_DIR = BASE_DIR / "templates"
 LOGS_DIR = BASE_DIR / "logs"
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOGS_DIR / "app.log"
 
 # ---------------- Configuración de logging garantizado ----------------
-# Limpiar handlers existentes
-for handler in logging.root.handlers[:]:
-    logging.root.removeHandler(handler)
+def setup_logging():
+    """Consola + logs/app.log; se llama desde main() para no tocar logs al importar."""
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    # Limpiar handlers existentes
+    for handler in logging.root.handlers[:]:
+        logging.root.removeHandler(handler)
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
 
-# Consola
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-console_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-console_handler.setFormatter(console_formatter)
-logger.addHandler(console_handler)
+    # Consola
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    console_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    console_handler.setFormatter(console_formatter)
+    logger.addHandler(console_handler)
 
-# Archivo
-file_handler = logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")
-file_handler.setLevel(logging.INFO)
-file_handler.setFormatter(console_formatter)
-logger.addHandler(file_handler)
+    # Archivo
+    file_handler = logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(console_formatter)
+    logger.addHandler(file_handler)
 
-logging.info("Logging inicializado ✅")
+    logging.info("Logging inicializado ✅")
 
 # ---------------- Cargar .env ----------------
 load_dotenv(BASE_DIR / ".env")
@@ -52,19 +65,17 @@ EMAIL_PASS = os.getenv("EMAIL_PASS", "")
 DEFAULT_FROM = os.getenv("EMAIL_FROM", EMAIL_USER)
 
 # ---------------- Jinja2 ----------------
+# plantillas compiladas una vez por proceso; el bytecode se cachea en disco entre ejecuciones
 env = Environment(
     loader=FileSystemLoader(str(TEMPLATES_DIR)),
-    autoescape=select_autoescape(['html', 'xml'])
+    autoescape=select_autoescape(['html', 'xml']),
+    bytecode_cache=FileSystemBytecodeCache(),
 )
 
-def _simple_text_from_html(html: str) -> str:
-    """Genera un fallback de texto plano."""
-    text = re.sub('<[^<]+?>', '', html)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+_simple_text_from_html = simple_text_from_html
 
 def _attach_file_to_msg(msg: EmailMessage, path: Path):
-    """Adjunta un archivo al mensaje de email."""
+    """Adjunta un archivo al mensaje de email (ruta mensaje a mensaje, sin reutilizar la codificación)."""
     if not path.exists():
         logging.warning(f"Adjunto no encontrado: {path}")
         return
@@ -80,45 +91,43 @@ def _attach_file_to_msg(msg: EmailMessage, path: Path):
     logging.debug(f"Adjunto agregado: {path.name}")
 
 # ---------------- Función de envío ----------------
-def send_mail(to: str, subject: str, html_body: str, attachments: List[Path] = None,
-              from_addr: str = None, dry_run: bool = False) -> bool:
-    if attachments is None:
-        attachments = []
+def make_smtp_pool(size: int = 1, max_messages: int = 100) -> SMTPPool:
+    """Crea un pool de conexiones con la configuración SMTP del .env."""
+    return SMTPPool(SMTP_SERVER, SMTP_PORT, EMAIL_USER, EMAIL_PASS,
+                    size=size, max_messages=max_messages, timeout=60)
+
+def _resolve_from(from_addr: str = None) -> str:
     from_addr = from_addr or DEFAULT_FROM
     if not from_addr:
         raise ValueError("No hay dirección remitente configurada")
+    return from_addr
 
-    logging.info(f"{'[DRY-RUN] ' if dry_run else ''}Preparando correo a: {to} | Asunto: {subject}")
-
-    msg = EmailMessage()
-    msg["From"] = from_addr
-    msg["To"] = to
-    msg["Subject"] = subject
+def send_mail(to: str, subject: str, html_body: str, attachments: List[Path] = None,
+              from_addr: str = None, dry_run: bool = False, pool: SMTPPool = None) -> bool:
+    if attachments is None:
+        attachments = []
+    builder = CampaignMessageBuilder(attachments, from_addr=_resolve_from(from_addr))
+    return send_built_mail(builder, to, subject, html_body, dry_run=dry_run, pool=pool)
 
-    plain = _simple_text_from_html(html_body)
-    msg.set_content(plain)
-    msg.add_alternative(html_body, subtype="html")
+def send_built_mail(builder: CampaignMessageBuilder, to: str, subject: str, html_body: str,
+                    dry_run: bool = False, pool: SMTPPool = None) -> bool:
+    """Como send_mail, pero con adjuntos ya codificados por el builder de la campaña."""
+    logging.info(f"{'[DRY-RUN] ' if dry_run else ''}Preparando correo a: {to} | Asunto: {subject}")
 
-    for a in attachments:
-        _attach_file_to_msg(msg, Path(a))
+    msg = builder.build(to, subject, html_body)
 
     if dry_run:
-        logging.info(f"[DRY-RUN] Mensaje preparado (no enviado) a: {to}, adjuntos: {[p.name for p in attachments]}")
+        logging.info(f"[DRY-RUN] Mensaje preparado (no enviado) a: {to}, adjuntos: {builder.attachment_names}")
         logging.debug(f"[DRY-RUN] Contenido HTML:\n{html_body[:400]}...")
         return True
 
     try:
-        logging.info("Conectando al servidor SMTP...")
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=60) as server:
-            server.ehlo()
-            try:
-                server.starttls()
-                server.ehlo()
-            except Exception:
-                logging.debug("starttls() no disponible o no requerido")
-            if EMAIL_USER and EMAIL_PASS:
-                server.login(EMAIL_USER, EMAIL_PASS)
-            server.send_message(msg)
+        if pool is not None:
+            pool.send_message(msg)
+        else:
+            # envío suelto: una conexión de un solo uso
+            with make_smtp_pool(max_messages=1) as one_shot:
+                one_shot.send_message(msg)
         logging.info(f"Correo enviado a {to}")
         return True
     except Exception:
@@ -129,47 +138,109 @@ def send_mail(to: str, subject: str, html_body: str, attachments: List[Path] = N
 def is_valid_email(addr: str) -> bool:
     return bool(re.match(r"[^@]+@[^@]+\.[^@]+", (addr or "").strip()))
 
+def default_campaign_id(clientes_csv: Path, template_name: str, subject_template: str) -> str:
+    """Id de campaña estable para el mismo fichero + plantilla + asunto."""
+    digest = hashlib.sha1(f"{template_name}|{subject_template}".encode("utf-8")).hexdigest()[:8]
+    return f"{Path(clientes_csv).stem}-{digest}"
+
 def send_bulk_from_csv(clientes_csv: Path, template_name: str, subject_template: str,
                        attachment_paths: List[Path] = None, dry_run: bool = False,
-                       limit: int = None, test_email: str = None):
+                       limit: int = None, test_email: str = None,
+                       max_per_conn: int = 100, pool: SMTPPool = None,
+                       concurrency: int = 1, rate_per_second: float = None,
+                       rate_per_minute: float = None, ledger: SentLedger = None,
+                       campaign: str = None, resume: bool = False):
+    """Envía la plantilla a cada cliente del CSV; devuelve un dict con el resumen.
+
+    Los envíos (también en dry-run) pasan por el planificador de `dispatcher`,
+    con `concurrency` hilos y los límites de ritmo indicados.
+
+    El CSV se lee en streaming y las direcciones repetidas se descartan. Con
+    `ledger`, cada envío correcto queda registrado bajo `campaign` y con
+    `resume=True` se saltan (sin renderizar) los ya registrados. Sin ledger la
+    deduplicación usa un set en memoria.
+    """
     if attachment_paths is None:
         attachment_paths = []
 
     if not clientes_csv.exists():
         logging.error(f"No existe fichero de clientes: {clientes_csv}")
-        return
+        return None
 
     tmpl = env.get_template(template_name)
-    sent = failed = processed = 0
-
-    with open(clientes_csv, newline='', encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if limit is not None and processed >= limit:
-                break
-            nombre = (row.get("nombre") or "").strip()
-            email = (row.get("email") or "").strip()
-            processed += 1
-
-            if not nombre or not email or not is_valid_email(email):
-                logging.warning(f"Registro inválido: {row}")
-                failed += 1
-                continue
-
-            target = test_email if test_email else email
-            html_body = tmpl.render(nombre=nombre)
-            subject = subject_template.format(nombre=nombre)
-
-            ok = send_mail(target, subject, html_body, attachments=attachment_paths, dry_run=dry_run)
-            if ok:
-                sent += 1
-            else:
-                failed += 1
-
-    logging.info(f"Envío completo. Procesados: {processed}, enviados: {sent}, fallidos: {failed}")
+    # adjuntos leídos y codificados una sola vez para toda la campaña
+    builder = CampaignMessageBuilder(attachment_paths, from_addr=_resolve_from())
+    campaign = campaign or default_campaign_id(clientes_csv, template_name, subject_template)
+    processed = invalid = skipped = duplicates = 0
+    seen = set()
+    if ledger is not None:
+        ledger.start_run(campaign)
+
+    def is_first_seen(addr):
+        if ledger is not None:
+            return ledger.mark_seen(campaign, addr)
+        key = SentLedger.key(addr)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def _jobs():
+        nonlocal processed, invalid, skipped, duplicates
+        with open(clientes_csv, newline='', encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if limit is not None and processed >= limit:
+                    break
+                nombre = (row.get("nombre") or "").strip()
+                email = (row.get("email") or "").strip()
+                processed += 1
+
+                if not nombre or not email or not is_valid_email(email):
+                    logging.warning(f"Registro inválido: {row}")
+                    invalid += 1
+                    continue
+
+                if not is_first_seen(email):
+                    logging.info(f"Dirección duplicada, se omite: {email}")
+                    duplicates += 1
+                    continue
+                if resume and ledger is not None and ledger.is_sent(campaign, email):
+                    skipped += 1
+                    continue
+
+                target = test_email if test_email else email
+                yield email, target, subject_template.format(nombre=nombre), tmpl.render(nombre=nombre)
+
+    def _send(job):
+        email, target, subject, html_body = job
+        ok = send_built_mail(builder, target, subject, html_body, dry_run=dry_run, pool=pool)
+        if ok and ledger is not None and not dry_run:
+            ledger.record(campaign, email)
+        return ok
+
+    # sesiones SMTP reutilizadas entre destinatarios (si no nos pasan un pool propio)
+    own_pool = pool is None and not dry_run
+    if own_pool:
+        pool = make_smtp_pool(size=concurrency, max_messages=max_per_conn)
+    limiter = RateLimiter(per_second=rate_per_second, per_minute=rate_per_minute)
+
+    try:
+        result = dispatch(_jobs(), _send, concurrency=concurrency, limiter=limiter)
+    finally:
+        if own_pool:
+            pool.close()
+
+    sent, failed = result["sent"], result["failed"] + invalid
+    connections = pool.connections_opened if pool is not None else 0
+    logging.info(f"Envío completo ({campaign}). Procesados: {processed}, enviados: {sent}, fallidos: {failed}, "
+                 f"ya enviados: {skipped}, duplicados: {duplicates}, conexiones SMTP abiertas: {connections}")
+    return {"processed": processed, "sent": sent, "failed": failed, "skipped": skipped,
+            "duplicates": duplicates, "connections": connections}
 
 # ---------------- CLI ----------------
-def main():
+def main(argv=None):
+    setup_logging()
     parser = argparse.ArgumentParser(description="Mailer parametrizable (Día 3)")
     parser.add_argument("--dry-run", action="store_true", help="No envía correos, solo muestra")
     parser.add_argument("--clientes", type=str, default=str(DATA_DIR / "clientes.csv"))
@@ -178,16 +249,34 @@ def main():
     parser.add_argument("--attach", type=str, nargs="*", default=[str(DATA_DIR / "informe.xlsx")])
     parser.add_argument("--limit", type=int, default=None)
     parser.add_argument("--test-email", type=str, default=None)
-    args = parser.parse_args()
+    parser.add_argument("--max-per-conn", type=int, default=100,
+                        help="Mensajes por conexión SMTP antes de reciclarla")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Envíos simultáneos (una sesión SMTP por hilo)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Máximo de mensajes por segundo")
+    parser.add_argument("--rate-per-minute", type=float, default=None,
+                        help="Máximo de mensajes por minuto")
+    parser.add_argument("--campaign", type=str, default=None,
+                        help="Id de campaña para el ledger (por defecto: fichero + plantilla + asunto)")
+    parser.add_argument("--ledger", type=str, default=str(DATA_DIR / "envios.sqlite"),
+                        help="Ledger SQLite de envíos confirmados")
+    parser.add_argument("--resume", action="store_true",
+                        help="Salta los destinatarios ya registrados en el ledger para la campaña")
+    args = parser.parse_args(argv)
 
     logging.info(f"Modo dry-run: {args.dry_run}")
     logging.info(f"Servidor SMTP: {SMTP_SERVER}:{SMTP_PORT} | Usuario: {EMAIL_USER or '(no configurado)'}")
     logging.info(f"Clientes: {args.clientes} | Template: {args.template} | Adjuntos: {args.attach}")
 
-    send_bulk_from_csv(Path(args.clientes), args.template, args.subject,
-                       [Path(p) for p in args.attach],
-                       dry_run=args.dry_run, limit=args.limit,
-                       test_email=args.test_email)
+    with SentLedger(Path(args.ledger)) as ledger:
+        send_bulk_from_csv(Path(args.clientes), args.template, args.subject,
+                           [Path(p) for p in args.attach],
+                           dry_run=args.dry_run, limit=args.limit,
+                           test_email=args.test_email, max_per_conn=args.max_per_conn,
+                           concurrency=args.concurrency, rate_per_second=args.rate,
+                           rate_per_minute=args.rate_per_minute, ledger=ledger,
+                           campaign=args.campaign, resume=args.resume)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,66 @@
+import logging
+import mimetypes
+import re
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Iterable, List
+
+_TAG_RE = re.compile('<[^<]+?>')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def simple_text_from_html(html: str) -> str:
+    """Genera un fallback de texto plano."""
+    text = _TAG_RE.sub('', html)
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+def encode_attachment(path: Path) -> EmailMessage:
+    """Lee, tipa y codifica (base64) un adjunto; devuelve la parte MIME lista para adjuntar."""
+    ctype, _ = mimetypes.guess_type(str(path))
+    if ctype is None:
+        maintype, subtype = "application", "octet-stream"
+    else:
+        maintype, subtype = ctype.split("/", 1)
+    with open(path, "rb") as f:
+        data = f.read()
+    part = EmailMessage()
+    part.set_content(data, maintype=maintype, subtype=subtype, filename=path.name)
+    return part
+
+
+class CampaignMessageBuilder:
+    """Ensambla los mensajes de una campaña reutilizando las partes comunes.
+
+    Los adjuntos se leen y codifican una sola vez al crear el builder; cada
+    mensaje comparte esas partes MIME (no se modifican al serializar) y sólo
+    cambia cabeceras, texto plano y HTML.
+    """
+
+    def __init__(self, attachments: Iterable[Path] = (), from_addr: str = None):
+        self.from_addr = from_addr
+        self.attachment_names: List[str] = []
+        self._parts: List[EmailMessage] = []
+        for a in attachments:
+            path = Path(a)
+            if not path.exists():
+                logging.warning(f"Adjunto no encontrado: {path}")
+                continue
+            self._parts.append(encode_attachment(path))
+            self.attachment_names.append(path.name)
+            logging.debug(f"Adjunto codificado: {path.name}")
+
+    def build(self, to: str, subject: str, html_body: str) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = self.from_addr
+        msg["To"] = to
+        msg["Subject"] = subject
+
+        msg.set_content(simple_text_from_html(html_body))
+        msg.add_alternative(html_body, subtype="html")
+
+        if self._parts:
+            msg.make_mixed()
+            for part in self._parts:
+                msg.attach(part)
+        return msg
@@ -0,0 +1,157 @@
+import logging
+import queue
+import smtplib
+import threading
+
+
+# ---------------- Conexión del pool ----------------
+class _PooledConnection:
+    """Sesión SMTP autenticada + número de mensajes enviados por ella."""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+
+    @property
+    def connected(self) -> bool:
+        return getattr(self.server, "sock", None) is not None
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            # el servidor pudo cerrar la conexión antes; basta con soltar el socket
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+# ---------------- Pool ----------------
+class SMTPPool:
+    """Mantiene sesiones SMTP abiertas entre destinatarios.
+
+    - Abre conexiones bajo demanda, hasta `size` simultáneas.
+    - Reconecta de forma transparente ante `SMTPServerDisconnected` o una respuesta 421.
+    - Recicla cada conexión tras `max_messages` mensajes.
+    """
+
+    def __init__(self, host: str, port: int = 587, user: str = "", password: str = "",
+                 size: int = 1, max_messages: int = 100, timeout: float = 60,
+                 smtp_factory=smtplib.SMTP):
+        if size < 1:
+            raise ValueError("size debe ser >= 1")
+        if max_messages < 1:
+            raise ValueError("max_messages debe ser >= 1")
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._factory = smtp_factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.connections_opened = 0
+        self.reconnects = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- ciclo de vida de conexiones ----------
+    def _open(self) -> _PooledConnection:
+        logging.info("Conectando al servidor SMTP...")
+        server = self._factory(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            try:
+                server.starttls()
+                server.ehlo()
+            except Exception:
+                logging.debug("starttls() no disponible o no requerido")
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            _PooledConnection(server).close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return _PooledConnection(server)
+
+    def _checkout(self) -> _PooledConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def _checkin(self, conn: _PooledConnection):
+        if not conn.connected:
+            # smtplib cierra el socket ante un 421; no devolvemos sesiones muertas
+            conn.close()
+        elif conn.sent >= self.max_messages:
+            logging.debug(f"Reciclando conexión SMTP tras {conn.sent} mensajes")
+            conn.close()
+        else:
+            with self._lock:
+                # tras close() (envío aún en curso en otro hilo) la sesión se cierra en vez de quedar ociosa
+                if not self._closed:
+                    self._idle.put(conn)
+                    return
+            conn.close()
+
+    @staticmethod
+    def _is_disconnect(conn: _PooledConnection, exc: Exception) -> bool:
+        """True si el error indica que la sesión se perdió (desconexión o 421)."""
+        if isinstance(exc, smtplib.SMTPServerDisconnected):
+            return True
+        if isinstance(exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+            return getattr(exc, "smtp_code", None) == 421 or not conn.connected
+        return False
+
+    # ---------- envío ----------
+    def send_message(self, msg):
+        """Envía `msg` por una conexión del pool (bloquea si todas están ocupadas)."""
+        with self._slots:
+            conn = self._checkout()
+            try:
+                try:
+                    conn.server.send_message(msg)
+                except Exception as e:
+                    if not self._is_disconnect(conn, e):
+                        raise
+                    logging.warning("Conexión SMTP cerrada por el servidor, reconectando...")
+                    conn.close()
+                    conn = None
+                    with self._lock:
+                        self.reconnects += 1
+                    conn = self._open()
+                    conn.server.send_message(msg)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                # el servidor rechazó el mensaje; la sesión se reutiliza si sigue viva
+                if conn is not None:
+                    conn.sent += 1
+                    self._checkin(conn)
+                raise
+            except Exception:
+                if conn is not None:
+                    conn.close()
+                raise
+            conn.sent += 1
+            self._checkin(conn)
+
+    def close(self):
+        """Cierra las conexiones ociosas; las que estén enviando se cierran al devolverse."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
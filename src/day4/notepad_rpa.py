@@ -1,82 +1,225 @@
-import pyautogui
 import time
 import pandas as pd
 from pathlib import Path
 import logging
 from datetime import datetime
 import subprocess
+import sys
 
 # ---------------- Carpetas ----------------
 CAPTURES_DIR = Path("captures")
-CAPTURES_DIR.mkdir(exist_ok=True)
 LOG_FILE = Path("logs/app.log")
 PROJECT_ROOT = Path(__file__).resolve().parents[2]  # sube 2 niveles hasta la raíz
 DATA_DIR = PROJECT_ROOT / "data"
-DATA_DIR.mkdir(exist_ok=True)
+INFORME = Path("data/informe.xlsx")
+
+# Backends de salida del resumen:
+#   clipboard -> Bloc de notas + un solo pegado (pyperclip + Ctrl+V)
+#   typewrite -> Bloc de notas + tecleo carácter a carácter (comportamiento original, lento)
+#   archivo   -> sin GUI: escribe Resumen_<timestamp>.txt directamente
+BACKENDS = ("clipboard", "typewrite", "archivo")
+DEFAULT_BACKEND = "clipboard"
 
 # ---------------- Logging ----------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+def setup_logging():
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8"),
+            logging.StreamHandler()
+        ]
+    )
+
+# ---------------- Drivers de GUI ----------------
+class PyAutoGuiDriver:
+    """Bloc de notas real manejado con pyautogui (Windows con escritorio)."""
+
+    def __init__(self):
+        import pyautogui  # falla sin pantalla: sólo se importa si se usa la GUI
+        pyautogui.FAILSAFE = True  # mover ratón a esquina para detener
+        self._gui = pyautogui
+
+    def abrir(self):
+        subprocess.Popen("notepad.exe")
+        time.sleep(2)  # esperar a que se abra
+
+    def escribir(self, texto: str):
+        self._gui.typewrite(texto, interval=0.01)
+
+    def pegar(self, texto: str):
+        import pyperclip
+        pyperclip.copy(texto)
+        self._gui.hotkey("ctrl", "v")
+
+    def guardar_como(self, path: Path):
+        self._gui.hotkey("ctrl", "g")  # abre diálogo “Guardar como” (según configuración)
+        time.sleep(1.5)  # espera a que aparezca la ventana
+        self._gui.typewrite(str(path))
+        self._gui.press("enter")  # confirma guardar
+
+    def cerrar(self):
+        self._gui.hotkey("alt", "f4")
+
+    def captura(self, path: Path):
+        self._gui.screenshot(path)
+
+
+class FakeDriver:
+    """Editor simulado en memoria: permite probar el flujo GUI en Linux sin pantalla.
+
+    Registra las acciones en `acciones` y, al guardar, escribe el contenido del
+    editor en la ruta indicada como lo haría el Bloc de notas.
+    """
+
+    def __init__(self):
+        self.acciones = []
+        self.contenido = ""
+        self.abierto = False
+
+    def abrir(self):
+        self.acciones.append("abrir")
+        self.abierto = True
+
+    def escribir(self, texto: str):
+        self.acciones.append("escribir")
+        self.contenido += texto
+
+    def pegar(self, texto: str):
+        self.acciones.append("pegar")
+        self.contenido += texto
+
+    def guardar_como(self, path: Path):
+        self.acciones.append("guardar_como")
+        Path(path).write_text(self.contenido, encoding="utf-8")
+
+    def cerrar(self):
+        self.acciones.append("cerrar")
+        self.abierto = False
 
-logging.info("RPA Bloc de notas iniciado ✅")
+    def captura(self, path: Path):
+        self.acciones.append("captura")
+
+
+DRIVERS = {"pyautogui": PyAutoGuiDriver, "fake": FakeDriver}
 
 # ---------------- Archivo Excel ----------------
-INFORME = Path("data/informe.xlsx")
-if not INFORME.exists():
-    logging.error(f"No se encontró {INFORME}")
-    exit(1)
-
-df = pd.read_excel(INFORME, sheet_name="Resumen")
-texto = df.to_string(index=False)
-logging.info("Informe leído y convertido a texto")
-
-# ---------------- Abrir Bloc de notas ----------------
-try:
-    subprocess.Popen("notepad.exe")
-    time.sleep(2)  # esperar a que se abra
-except Exception:
-    logging.exception("Error abriendo Bloc de notas")
-    exit(1)
-
-# ---------------- Pegar texto ----------------
-try:
-    pyautogui.FAILSAFE = True  # mover ratón a esquina para detener
-    pyautogui.typewrite(texto, interval=0.01)
-    logging.info("Texto pegado en Bloc de notas")
-except Exception:
-    screenshot_file = CAPTURES_DIR / f"error_typewrite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-    pyautogui.screenshot(screenshot_file)
-    logging.exception(f"Error pegando texto, screenshot guardado: {screenshot_file}")
-
-# ---------------- Guardar archivo (ruta fija + timestamp) ----------------
-try:
+def leer_resumen(informe: Path = INFORME) -> str:
+    df = pd.read_excel(informe, sheet_name="Resumen")
+    texto = df.to_string(index=False)
+    logging.info("Informe leído y convertido a texto")
+    return texto
+
+def leer_resumen_cacheado(informe: Path = INFORME, cache_dir: Path = DATA_DIR / ".cache") -> str:
+    """`leer_resumen` memoizado por el contenido del informe: si no cambió, no se abre el Excel."""
+    try:
+        from src.day2.artifact_cache import ArtifactCache, memoize_text
+    except ImportError:  # python src/day4/notepad_rpa.py: la raíz del repo no está en sys.path
+        sys.path.insert(0, str(PROJECT_ROOT))
+        from src.day2.artifact_cache import ArtifactCache, memoize_text
+    with ArtifactCache(cache_dir) as cache:
+        return memoize_text(cache, "leer_resumen", [informe], {"hoja": "Resumen"},
+                            lambda: leer_resumen(informe), code=[__file__])
+
+def ruta_resumen(data_dir: Path = DATA_DIR) -> Path:
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"Resumen_{timestamp}.txt"
-    full_path = DATA_DIR / filename
-
-    pyautogui.hotkey("ctrl", "g")  # abre diálogo “Guardar como” (según configuración)
-    time.sleep(1.5)  # espera a que aparezca la ventana
-
-    pyautogui.typewrite(str(full_path))
-    pyautogui.press("enter")  # confirma guardar
-
-    logging.info(f"Archivo guardado en: {full_path}")
-except Exception:
-    screenshot_file = CAPTURES_DIR / f"error_save_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-    pyautogui.screenshot(screenshot_file)
-    logging.exception(f"Error guardando archivo, screenshot guardado: {screenshot_file}")
-
-# ---------------- Cerrar Bloc de notas ----------------
-try:
-    pyautogui.hotkey("alt", "f4")
-    logging.info("Bloc de notas cerrado ✅")
-except Exception:
-    screenshot_file = CAPTURES_DIR / f"error_close_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-    pyautogui.screenshot(screenshot_file)
-    logging.exception(f"Error cerrando Bloc de notas, screenshot guardado: {screenshot_file}")
\ No newline at end of file
+    return Path(data_dir) / f"Resumen_{timestamp}.txt"
+
+# ---------------- Salida ----------------
+def _captura_error(driver, etapa: str) -> Path:
+    CAPTURES_DIR.mkdir(exist_ok=True)
+    screenshot_file = CAPTURES_DIR / f"error_{etapa}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+    try:
+        driver.captura(screenshot_file)
+    except Exception:
+        logging.exception("No se pudo guardar el screenshot")
+    return screenshot_file
+
+def escribir_directo(texto: str, destino: Path) -> Path:
+    """Backend sin GUI: mismo fichero que guardaría el Bloc de notas."""
+    destino.write_text(texto, encoding="utf-8")
+    logging.info(f"Archivo guardado en: {destino}")
+    return destino
+
+def volcar_en_bloc(texto: str, destino: Path, driver, backend: str = DEFAULT_BACKEND) -> Path:
+    """Abre el Bloc de notas, vuelca el texto (pegado o tecleado), guarda y cierra.
+
+    Devuelve la ruta guardada, o None si no se pudo abrir el editor.
+    """
+    try:
+        driver.abrir()
+    except Exception:
+        logging.exception("Error abriendo Bloc de notas")
+        return None
+
+    # ---------------- Pegar texto ----------------
+    try:
+        if backend == "typewrite":
+            driver.escribir(texto)
+        else:
+            driver.pegar(texto)
+        logging.info("Texto pegado en Bloc de notas")
+    except Exception:
+        screenshot_file = _captura_error(driver, backend)
+        logging.exception(f"Error pegando texto, screenshot guardado: {screenshot_file}")
+
+    # ---------------- Guardar archivo (ruta fija + timestamp) ----------------
+    try:
+        driver.guardar_como(destino)
+        logging.info(f"Archivo guardado en: {destino}")
+    except Exception:
+        screenshot_file = _captura_error(driver, "save")
+        logging.exception(f"Error guardando archivo, screenshot guardado: {screenshot_file}")
+
+    # ---------------- Cerrar Bloc de notas ----------------
+    try:
+        driver.cerrar()
+        logging.info("Bloc de notas cerrado ✅")
+    except Exception:
+        screenshot_file = _captura_error(driver, "close")
+        logging.exception(f"Error cerrando Bloc de notas, screenshot guardado: {screenshot_file}")
+    return destino
+
+def exportar_resumen_txt(texto: str, backend: str = DEFAULT_BACKEND, data_dir: Path = DATA_DIR,
+                         driver=None) -> Path:
+    """Guarda el resumen como Resumen_<timestamp>.txt con el backend elegido."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+    Path(data_dir).mkdir(parents=True, exist_ok=True)
+    destino = ruta_resumen(data_dir)
+    if backend == "archivo":
+        return escribir_directo(texto, destino)
+    return volcar_en_bloc(texto, destino, driver or PyAutoGuiDriver(), backend)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RPA Bloc de notas (Día 4)")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="clipboard = un solo pegado; typewrite = tecleo original; archivo = sin GUI")
+    parser.add_argument("--driver", choices=sorted(DRIVERS), default="pyautogui",
+                        help="Driver de GUI (fake = editor simulado, sin pantalla)")
+    parser.add_argument("--informe", type=str, default=str(INFORME))
+    parser.add_argument("--out-dir", type=str, default=str(DATA_DIR))
+    parser.add_argument("--no-cache", action="store_true", help="Releer el informe aunque no haya cambiado")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    logging.info("RPA Bloc de notas iniciado ✅")
+
+    informe = Path(args.informe)
+    if not informe.exists():
+        logging.error(f"No se encontró {informe}")
+        return 1
+    if args.no_cache:
+        texto = leer_resumen(informe)
+    else:
+        texto = leer_resumen_cacheado(informe, Path(args.out_dir) / ".cache")
+
+    driver = None if args.backend == "archivo" else DRIVERS[args.driver]()
+    destino = exportar_resumen_txt(texto, args.backend, Path(args.out_dir), driver)
+    return 0 if destino else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import json
+import logging
+import queue
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    from .scraper import crear_driver, extraer_clima, setup_logging
+except ImportError:  # ejecutado como script: python src/day5/browser_pool.py
+    from scraper import crear_driver, extraer_clima, setup_logging
+
+
+# ---------------- Sesión del pool ----------------
+class _BrowserSession:
+    """WebDriver arrancado + número de páginas servidas por él."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            logging.debug("El navegador ya estaba cerrado")
+
+
+# ---------------- Pool ----------------
+class BrowserPool:
+    """Mantiene navegadores arrancados entre peticiones.
+
+    - Arranca sesiones bajo demanda, hasta `size` simultáneas.
+    - Recicla cada sesión tras `max_pages` páginas o si falla una extracción.
+    """
+
+    def __init__(self, size: int = 1, max_pages: int = 50, driver_factory=None, headless: bool = True,
+                 rapido: bool = False):
+        if size < 1:
+            raise ValueError("size debe ser >= 1")
+        if max_pages < 1:
+            raise ValueError("max_pages debe ser >= 1")
+        self.size = size
+        self.max_pages = max_pages
+        self._factory = driver_factory or (lambda: crear_driver(headless=headless, rapido=rapido))
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.sessions_started = 0
+        self.recycled = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- ciclo de vida de sesiones ----------
+    def _start(self) -> _BrowserSession:
+        logging.info("Arrancando navegador para el pool...")
+        session = _BrowserSession(self._factory())
+        with self._lock:
+            self.sessions_started += 1
+        return session
+
+    def _checkout(self) -> _BrowserSession:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._start()
+
+    def _retire(self, session: _BrowserSession):
+        session.close()
+        with self._lock:
+            self.recycled += 1
+
+    def warm(self, n: int = None) -> int:
+        """Arranca por adelantado hasta `n` navegadores (por defecto `size`) y los deja ociosos."""
+        n = min(self.size if n is None else n, self.size) - self._idle.qsize()
+        for _ in range(max(n, 0)):
+            self._idle.put(self._start())
+        return self._idle.qsize()
+
+    @contextmanager
+    def session(self):
+        """Presta un driver; si el bloque falla, la sesión se descarta en vez de reutilizarse."""
+        with self._slots:
+            session = self._checkout()
+            try:
+                yield session.driver
+            except BaseException:
+                logging.warning("Error con el navegador del pool, se recicla la sesión")
+                self._retire(session)
+                raise
+            session.pages += 1
+            if session.pages >= self.max_pages:
+                logging.debug(f"Reciclando navegador tras {session.pages} páginas")
+                self._retire(session)
+            else:
+                self._idle.put(session)
+
+    def close(self):
+        """Cierra todos los navegadores ociosos."""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            session.close()
+
+
+# ---------------- Servicio ----------------
+class ScraperService:
+    """Atiende peticiones de ciudades con los navegadores del pool (cola en proceso)."""
+
+    def __init__(self, pool: BrowserPool, extractor=extraer_clima):
+        self.pool = pool
+        self._extractor = extractor
+        self._executor = ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="scraper")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _scrape(self, ciudad: str, url: str = None) -> dict:
+        with self.pool.session() as driver:
+            return self._extractor(driver, ciudad, url)
+
+    def submit(self, ciudad: str, url: str = None):
+        """Encola una ciudad; devuelve un Future con el registro."""
+        return self._executor.submit(self._scrape, ciudad, url)
+
+    def scrape(self, ciudad: str, url: str = None) -> dict:
+        return self.submit(ciudad, url).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+
+# ---------------- Socket local (JSON por líneas) ----------------
+class _ServiceHandler(socketserver.StreamRequestHandler):
+    """Una petición por línea: {"ciudad": ..., "url": opcional} -> {"ok": ..., "registro"/"error": ...}."""
+
+    def handle(self):
+        for raw in self.rfile:
+            try:
+                req = json.loads(raw)
+                registro = self.server.service.scrape(req["ciudad"], req.get("url"))
+                resp = {"ok": True, "registro": registro}
+            except Exception as e:
+                logging.exception("Error atendiendo petición de scraping")
+                resp = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(resp, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class ScraperServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service: ScraperService, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _ServiceHandler)
+        self.service = service
+
+
+def pedir_ciudad(ciudad: str, host: str = "127.0.0.1", port: int = 8765, url: str = None,
+                 timeout: float = 120) -> dict:
+    """Cliente del servicio por socket: devuelve el registro o lanza RuntimeError."""
+    import socket
+
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps({"ciudad": ciudad, "url": url}) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as f:
+            resp = json.loads(f.readline())
+    if not resp.get("ok"):
+        raise RuntimeError(f"Scraper service: {resp.get('error')}")
+    return resp["registro"]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servicio de scraping con navegadores precalentados")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size", type=int, default=2, help="Navegadores simultáneos")
+    parser.add_argument("--max-pages", type=int, default=50, help="Reciclar cada navegador tras N páginas")
+    parser.add_argument("--headed", action="store_true", help="Mostrar la ventana del navegador")
+    parser.add_argument("--fast", action="store_true", help="Bloquear imágenes, CSS y scripts de anuncios")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    pool = BrowserPool(args.size, args.max_pages, headless=not args.headed, rapido=args.fast)
+    with ScraperService(pool) as service, ScraperServer(service, args.host, args.port) as server:
+        logging.info(f"Servicio de scraping escuchando en {args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Servicio de scraping detenido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
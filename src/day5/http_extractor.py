@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from html.parser import HTMLParser
+
+try:
+    from .scraper import (XPATH_ESTADO, cargar_ciudades, emitir_resultado, extraer_clima,
+                          guardar_registros, setup_logging, url_para)
+except ImportError:  # ejecutado como script: python src/day5/http_extractor.py
+    from scraper import (XPATH_ESTADO, cargar_ciudades, emitir_resultado, extraer_clima,
+                         guardar_registros, setup_logging, url_para)
+
+MAX_CONEXIONES = 8
+TIMEOUT_HTTP = 15
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+# etiquetas sin cierre: cuentan como hermanas pero no abren nivel
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+         "param", "source", "track", "wbr"}
+
+
+class SelectoresNoEncontrados(Exception):
+    """El HTML servido no trae temperatura/estado (la página se pinta con JavaScript)."""
+
+
+# ---------------- Parser ----------------
+def _pasos_xpath(xpath: str) -> tuple:
+    """'/html/body/div[7]' -> (('html', 1), ('body', 1), ('div', 7))."""
+    pasos = []
+    for paso in xpath.strip("/").split("/"):
+        tag, _, resto = paso.partition("[")
+        pasos.append((tag, int(resto.rstrip("]")) if resto else 1))
+    return tuple(pasos)
+
+
+class _ClimaParser(HTMLParser):
+    """Busca en una sola pasada los mismos nodos que los XPath del scraper Selenium:
+    div[@class='temp'] en cualquier nivel y la ruta absoluta del estado."""
+
+    def __init__(self, ruta_estado: tuple):
+        super().__init__(convert_charrefs=True)
+        self._ruta_estado = ruta_estado
+        self._pila = []      # [(tag, posición entre hermanos del mismo tag)]
+        self._hijos = [{}]   # contadores de hijos por tag de cada nivel abierto
+        self._capturas = []  # [(campo, profundidad, trozos de texto)]
+        self.temperatura = None
+        self.estado = None
+
+    def handle_starttag(self, tag, attrs):
+        n = self._hijos[-1].get(tag, 0) + 1
+        self._hijos[-1][tag] = n
+        if tag in _VOID:
+            return
+        self._pila.append((tag, n))
+        self._hijos.append({})
+        if self.temperatura is None and tag == "div" and dict(attrs).get("class") == "temp":
+            self._capturas.append(("temperatura", len(self._pila), []))
+        if self.estado is None and tuple(self._pila) == self._ruta_estado:
+            self._capturas.append(("estado", len(self._pila), []))
+
+    def handle_startendtag(self, tag, attrs):
+        n = self._hijos[-1].get(tag, 0) + 1
+        self._hijos[-1][tag] = n
+
+    def handle_endtag(self, tag):
+        # cerrar hasta la etiqueta correspondiente (tolera HTML mal cerrado)
+        for i in range(len(self._pila) - 1, -1, -1):
+            if self._pila[i][0] == tag:
+                break
+        else:
+            return
+        del self._pila[i:]
+        del self._hijos[i + 1:]
+        abiertas = []
+        for campo, profundidad, trozos in self._capturas:
+            if profundidad > len(self._pila):
+                setattr(self, campo, "".join(trozos).strip())
+            else:
+                abiertas.append((campo, profundidad, trozos))
+        self._capturas = abiertas
+
+    def handle_data(self, data):
+        for _, _, trozos in self._capturas:
+            trozos.append(data)
+
+
+def parsear_clima(html: str) -> tuple:
+    """(temperatura, estado) del HTML; SelectoresNoEncontrados si falta alguno."""
+    parser = _ClimaParser(_pasos_xpath(XPATH_ESTADO))
+    parser.feed(html)
+    parser.close()
+    if not parser.temperatura or not parser.estado:
+        raise SelectoresNoEncontrados("temperatura/estado no presentes en el HTML")
+    return parser.temperatura, parser.estado
+
+
+# ---------------- Respaldo Selenium ----------------
+class FallbackSelenium:
+    """Extrae con navegador sólo las ciudades que lo necesitan; arranca el pool al primer uso."""
+
+    def __init__(self, size: int = 1, rapido: bool = True):
+        self._size = size
+        self._rapido = rapido
+        self._pool = None
+
+    def __call__(self, ciudad: str, url: str) -> dict:
+        if self._pool is None:
+            try:
+                from .browser_pool import BrowserPool
+            except ImportError:
+                from browser_pool import BrowserPool
+            self._pool = BrowserPool(self._size, rapido=self._rapido)
+        with self._pool.session() as driver:
+            return extraer_clima(driver, ciudad, url)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+
+
+# ---------------- Extracción concurrente ----------------
+def _nueva_sesion(max_conexiones: int):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_conexiones, pool_maxsize=max_conexiones, pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _descargar(session, url: str, timeout: float) -> str:
+    resp = session.get(url, timeout=timeout)
+    resp.raise_for_status()
+    if "charset" not in resp.headers.get("Content-Type", "").lower():
+        resp.encoding = "utf-8"
+    return resp.text
+
+
+async def _extraer_una(ciudad: str, url: str, session, limite: asyncio.Semaphore, fallback,
+                       timeout: float) -> dict:
+    async with limite:
+        html = await asyncio.to_thread(_descargar, session, url, timeout)
+    try:
+        temperatura, estado = parsear_clima(html)
+    except SelectoresNoEncontrados:
+        if fallback is None:
+            raise
+        logging.info(f"{ciudad}: HTML sin selectores, se usa Selenium")
+        return await asyncio.to_thread(fallback, ciudad, url)
+    logging.info(f"{ciudad}: {temperatura}, {estado} (HTTP)")
+    return {
+        "Ciudad": ciudad,
+        "Temperatura": temperatura,
+        "Estado": estado,
+        "Fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+async def extraer_ciudades_async(ciudades, ciudades_url: dict = None, max_conexiones: int = MAX_CONEXIONES,
+                                 fallback=None, timeout: float = TIMEOUT_HTTP):
+    """Descarga y parsea todas las ciudades a la vez (como mucho `max_conexiones` en vuelo).
+
+    Devuelve (registros en el orden pedido, {ciudad: error} de las que fallaron).
+    """
+    ciudades_url = cargar_ciudades() if ciudades_url is None else ciudades_url
+    limite = asyncio.Semaphore(max_conexiones)
+    session = _nueva_sesion(max_conexiones)
+    try:
+        tareas = []
+        for ciudad in ciudades:
+            try:
+                url = url_para(ciudad, ciudades_url)
+            except KeyError as e:
+                tareas.append(asyncio.sleep(0, result=e))
+                continue
+            tareas.append(_extraer_una(ciudad, url, session, limite, fallback, timeout))
+        resultados = await asyncio.gather(*tareas, return_exceptions=True)
+    finally:
+        session.close()
+
+    registros, errores = [], {}
+    for ciudad, res in zip(ciudades, resultados):
+        if isinstance(res, BaseException):
+            logging.error(f"{ciudad}: {res!r}")
+            errores[ciudad] = str(res) or type(res).__name__
+        else:
+            registros.append(res)
+    return registros, errores
+
+
+def extraer_ciudades(ciudades, ciudades_url: dict = None, max_conexiones: int = MAX_CONEXIONES,
+                     fallback=None, timeout: float = TIMEOUT_HTTP):
+    return asyncio.run(extraer_ciudades_async(ciudades, ciudades_url, max_conexiones, fallback, timeout))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extractor HTTP del clima para varias ciudades")
+    parser.add_argument("--cities", default="Madrid", help="Ciudades separadas por comas")
+    parser.add_argument("--ciudades", default=None, help="JSON ciudad -> URL (por defecto data/ciudades.json)")
+    parser.add_argument("--max-conexiones", type=int, default=MAX_CONEXIONES)
+    parser.add_argument("--sin-fallback", action="store_true", help="No recurrir a Selenium")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    ciudades = [c.strip() for c in args.cities.split(",") if c.strip()]
+    fallback = None if args.sin_fallback else FallbackSelenium()
+    try:
+        registros, errores = extraer_ciudades(ciudades, cargar_ciudades(args.ciudades),
+                                              args.max_conexiones, fallback)
+    finally:
+        if fallback is not None:
+            fallback.close()
+    if registros:
+        emitir_resultado(guardar_registros(registros), registros)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+try:
+    from .scraper import DATA_DIR, setup_logging
+except ImportError:  # ejecutado como script: python src/day5/observation_store.py
+    from scraper import DATA_DIR, setup_logging
+
+OBSERVACIONES_DB = DATA_DIR / "observaciones.sqlite"
+TTL_SEGUNDOS = 30 * 60  # una observación del clima sirve durante media hora
+DIAS_HISTORIAL = 30  # lo que conserva `compactar` por defecto
+
+
+class ObservationStore:
+    """Histórico de observaciones del scraper por ciudad, persistido en SQLite.
+
+    Cada registro se guarda tal cual (JSON) junto con la ciudad normalizada y el
+    instante de la observación; el índice (ciudad, ts) resuelve la última
+    observación de una ciudad sin recorrer el histórico. Se puede compartir
+    entre hilos: un lock serializa el uso de la conexión.
+    """
+
+    def __init__(self, path: Path = OBSERVACIONES_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS observaciones (
+                id       INTEGER PRIMARY KEY,
+                ciudad   TEXT NOT NULL,
+                ts       REAL NOT NULL,
+                registro TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_observaciones_ciudad_ts ON observaciones (ciudad, ts);
+        """)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def add(self, registros, ts: float = None):
+        """Añade los registros del scraper (lista de dicts con 'Ciudad') en una transacción."""
+        ts = time.time() if ts is None else ts
+        rows = [(str(r["Ciudad"]).lower(), ts, json.dumps(r, ensure_ascii=False)) for r in registros]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO observaciones (ciudad, ts, registro) VALUES (?, ?, ?)", rows)
+
+    def latest(self, ciudad: str, ttl: float = None, ahora: float = None):
+        """Última observación de `ciudad`, o None si no hay o es más antigua que `ttl` segundos."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ts, registro FROM observaciones WHERE ciudad = ? ORDER BY ts DESC, id DESC LIMIT 1",
+                (ciudad.lower(),)).fetchone()
+        if row is None:
+            return None
+        ts, registro = row
+        if ttl is not None and ts < (time.time() if ahora is None else ahora) - ttl:
+            return None
+        return json.loads(registro)
+
+    def historial(self, ciudad: str, limit: int = None) -> list:
+        """Observaciones de `ciudad`, de la más reciente a la más antigua."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT registro FROM observaciones WHERE ciudad = ? ORDER BY ts DESC, id DESC LIMIT ?",
+                (ciudad.lower(), -1 if limit is None else limit)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def compactar(self, dias: float = DIAS_HISTORIAL, ahora: float = None) -> int:
+        """Borra las observaciones de hace más de `dias` salvo la última de cada ciudad.
+
+        Devuelve el número de filas borradas.
+        """
+        limite = (time.time() if ahora is None else ahora) - dias * 86400
+        with self._conn:
+            borradas = self._conn.execute("""
+                DELETE FROM observaciones
+                WHERE ts < ?
+                  AND id NOT IN (SELECT id FROM observaciones o
+                                 WHERE o.ciudad = observaciones.ciudad
+                                 ORDER BY o.ts DESC, o.id DESC LIMIT 1)
+            """, (limite,)).rowcount
+        self._conn.execute("VACUUM")
+        return borradas
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compacta el histórico de observaciones del clima")
+    parser.add_argument("--store", type=Path, default=OBSERVACIONES_DB, help="Almacén SQLite de observaciones")
+    parser.add_argument("--keep-days", type=float, default=DIAS_HISTORIAL,
+                        help="Días de historial a conservar (siempre queda la última de cada ciudad)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    if not args.store.exists():
+        logging.error(f"No existe el almacén {args.store}")
+        return 1
+    with ObservationStore(args.store) as store:
+        borradas = store.compactar(args.keep_days)
+    logging.info(f"Compactado {args.store}: {borradas} observaciones borradas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,73 +1,228 @@
+import json
+import os
+import subprocess
+import sys
 import time
 import logging
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from functools import lru_cache
 from pathlib import Path
 
+# selenium/webdriver_manager se importan dentro de las funciones: importar este
+# módulo (p.ej. desde el pool de navegadores) no arranca nada
+
 # ---------------- Carpetas y Logging ----------------
 DATA_DIR = Path(__file__).resolve().parents[2] / "data"
-DATA_DIR.mkdir(exist_ok=True)
 LOG_FILE = Path("logs/app.log")
-LOG_FILE.parent.mkdir(exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE, mode="a"), logging.StreamHandler()]
-)
+# ---------------- Páginas y selectores ----------------
+CIUDADES_JSON = DATA_DIR / "ciudades.json"  # {"Ciudad": "url"}; añadir ciudades sin tocar código
+XPATH_TEMP = "//div[@class='temp']"
+XPATH_ESTADO = "/html/body/div/div[7]/div[1]/div[1]/a[1]/div[2]/div[1]/div[2]/span[1]"
+ESPERA_CARGA = 3  # espera fija del modo clásico tras driver.get
+TIMEOUT_ESPERA = 15  # máximo de la espera explícita del elemento temp
 
-logging.info("Scraper web iniciado")
+# Recursos que el modo rápido no descarga (CDP Network.setBlockedURLs): imágenes,
+# CSS, fuentes y scripts de publicidad/analítica de terceros
+BLOQUEOS_RAPIDO = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*amazon-adsystem.com*", "*adnxs.com*", "*/ads/*",
+]
 
-# ---------------- Configurar WebDriver ----------------
-options = Options()
-# options.add_argument("--headless")  # opcional, para que no abra ventana
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
 
-try:
-    ciudad = "Madrid"
-    url = f"https://www.accuweather.com/es/es/madrid/308526/weather-forecast/308526"
+def setup_logging():
+    LOG_FILE.parent.mkdir(exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.FileHandler(LOG_FILE, mode="a"), logging.StreamHandler()]
+    )
+
 
-    driver.get(url)
+# ---------------- Configurar WebDriver ----------------
+@lru_cache(maxsize=1)
+def resolver_driver_path() -> str:
+    """Ruta del chromedriver, resuelta una sola vez por proceso.
+
+    `ChromeDriverManager().install()` consulta versiones (y a veces la red) en
+    cada llamada; CHROMEDRIVER_PATH permite fijarla y saltarse el gestor.
+    """
+    path = os.getenv("CHROMEDRIVER_PATH")
+    if path:
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    logging.info(f"Chromedriver resuelto en {path}")
+    return path
+
+
+def crear_driver(headless: bool = False, rapido: bool = False):
+    """Chrome normal o, con `rapido`, headless sin imágenes/CSS/anuncios y sin esperar subrecursos."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    options = Options()
+    if headless or rapido:
+        options.add_argument("--headless=new")  # opcional, para que no abra ventana
+    if rapido:
+        options.page_load_strategy = "eager"  # get() vuelve con el DOM listo, sin esperar imágenes
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    driver = webdriver.Chrome(service=Service(resolver_driver_path()), options=options)
+    if rapido:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOQUEOS_RAPIDO})
+    return driver
+
+
+# ---------------- Extracción ----------------
+def cargar_ciudades(path: Path = None) -> dict:
+    path = Path(path or os.getenv("CIUDADES_JSON") or CIUDADES_JSON)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def url_para(ciudad: str, ciudades: dict = None) -> str:
+    ciudades = cargar_ciudades() if ciudades is None else ciudades
+    for nombre, url in ciudades.items():
+        if nombre.lower() == ciudad.lower():
+            return url
+    raise KeyError(f"Ciudad sin URL configurada: {ciudad}")
+
+
+def extraer_clima(driver, ciudad: str, url: str = None, espera: float = 0,
+                  timeout: float = TIMEOUT_ESPERA) -> dict:
+    """Abre la página del clima de `ciudad` en `driver` y devuelve el registro extraído.
+
+    Espera explícitamente al elemento temp (hasta `timeout` s); `espera` añade
+    antes la pausa fija del modo clásico.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(url or url_para(ciudad))
     logging.info(f"Abriendo página del clima para {ciudad}")
 
     # ---------------- Espera y extracción ----------------
-    time.sleep(3)  # espera para que cargue la página
+    if espera:
+        time.sleep(espera)  # espera para que cargue la página
+    temp_elem = WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+        EC.presence_of_element_located((By.XPATH, XPATH_TEMP)))
 
     # Ejemplo: extraer temperatura actual y estado
-    temp_elem = driver.find_element(By.XPATH, "//div[@class='temp']")
-    estado_elem = driver.find_element(By.XPATH, "/html/body/div/div[7]/div[1]/div[1]/a[1]/div[2]/div[1]/div[2]/span[1]")
-
     temperatura = temp_elem.text
-    estado = estado_elem.text
-
+    estado = driver.find_element(By.XPATH, XPATH_ESTADO).text
     logging.info(f"{ciudad}: {temperatura}, {estado}")
-
-    # ---------------- Guardar en CSV ----------------
-    import pandas as pd
-
-    df = pd.DataFrame([{
+    return {
         "Ciudad": ciudad,
         "Temperatura": temperatura,
         "Estado": estado,
         "Fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }])
+    }
+
+
+def guardar_registros(registros, data_dir: Path = DATA_DIR) -> Path:
+    """Guarda los registros en webdata.csv e informe_web.xlsx; devuelve la ruta del CSV."""
+    import pandas as pd
 
-    csv_path = DATA_DIR / "webdata.csv"
+    data_dir.mkdir(exist_ok=True)
+    df = pd.DataFrame(registros)
+
+    # ---------------- Guardar en CSV ----------------
+    csv_path = data_dir / "webdata.csv"
     df.to_csv(csv_path, index=False, encoding="utf-8-sig")
     logging.info(f"Datos guardados en CSV: {csv_path}")
 
     # ---------------- Guardar resumen en Excel ----------------
-    excel_path = DATA_DIR / "informe_web.xlsx"
+    excel_path = data_dir / "informe_web.xlsx"
     df.to_excel(excel_path, sheet_name="Resumen", index=False)
     logging.info(f"Informe web generado en Excel: {excel_path}")
-
-except Exception as e:
-    logging.exception(f"Error durante el scraping: {e}")
-
-finally:
-    driver.quit()
-    logging.info("WebDriver cerrado")
\ No newline at end of file
+    return csv_path
+
+
+# ---------------- API para otros módulos ----------------
+def resolver_ciudad(ciudad: str) -> str:
+    """Ciudad a consultar: sin URL configurada se consulta Madrid (comportamiento histórico)."""
+    try:
+        url_para(ciudad)
+        return ciudad
+    except KeyError:
+        logging.warning(f"Ciudad sin URL configurada: {ciudad}; se consulta Madrid")
+        return "Madrid"
+
+
+def scrape(ciudad: str, rapido: bool = False, driver=None) -> list:
+    """Scrapea `ciudad` en este proceso y devuelve los registros (sin CSV intermedio).
+
+    Con `driver` se reutiliza un navegador ya abierto (p.ej. de un BrowserPool).
+    """
+    ciudad = resolver_ciudad(ciudad)
+    propio = driver is None
+    if propio:
+        driver = crear_driver(rapido=rapido)
+    try:
+        return [extraer_clima(driver, ciudad, espera=0 if rapido else ESPERA_CARGA)]
+    finally:
+        if propio:
+            driver.quit()
+            logging.info("WebDriver cerrado")
+
+
+def scrape_en_subproceso(ciudad: str, rapido: bool = False, data_dir: Path = DATA_DIR,
+                         timeout: float = None, env: dict = None) -> list:
+    """Como `scrape`, pero con el navegador en otro intérprete: si Chrome se cuelga o
+    revienta, el llamante sólo ve un RuntimeError (o TimeoutExpired con `timeout`)."""
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--city", ciudad, "--out-dir", str(data_dir)]
+    if rapido:
+        cmd.append("--fast")
+    env = dict(os.environ if env is None else env, CITY=ciudad)
+    res = subprocess.run(cmd, env=env, cwd=str(Path(__file__).resolve().parents[2]),
+                         capture_output=True, text=True, timeout=timeout)
+    if res.returncode != 0:
+        logging.error("Scraper stderr: %s", res.stderr)
+        raise RuntimeError(f"Scraper failed (code {res.returncode})")
+    return leer_resultado(res.stdout)["registros"]
+
+
+# ---------------- Señal de fin para quien lanza el script ----------------
+def emitir_resultado(csv_path: Path, registros, stream=None):
+    """Última línea de stdout: JSON con el CSV escrito y los registros (el log va a stderr)."""
+    stream = stream or sys.stdout
+    stream.write(json.dumps({"csv": str(csv_path), "registros": registros}, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def leer_resultado(stdout: str) -> dict:
+    """Inversa de `emitir_resultado`: el proceso ya terminó, no hace falta sondear el disco."""
+    for linea in reversed(stdout.splitlines()):
+        if linea.startswith("{"):
+            return json.loads(linea)
+    raise RuntimeError("El scraper terminó sin emitir resultado")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scraper del clima (Día 5)")
+    parser.add_argument("--city", default=os.getenv("CITY", "Madrid"))
+    parser.add_argument("--fast", action="store_true",
+                        help="Headless, sin imágenes/CSS/anuncios y sin esperas fijas")
+    parser.add_argument("--out-dir", default=str(DATA_DIR), help="Carpeta de webdata.csv / informe_web.xlsx")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    logging.info("Scraper web iniciado")
+    try:
+        registros = scrape(args.city, rapido=args.fast)
+        csv_path = guardar_registros(registros, Path(args.out_dir))
+    except Exception as e:
+        logging.exception(f"Error durante el scraping: {e}")
+        return 1
+    emitir_resultado(csv_path, registros)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
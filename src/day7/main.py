@@ -1,50 +1,175 @@
 # src/day7/main.py
 import argparse
+import logging
+import multiprocessing
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
-from .utils import setup_logger, DATA_DIR
-from .processor import run_scraper_for_city, read_client_row, create_personal_excel, send_email_with_attachment, capture_error
+from rpa_lab.metrics import METRICS_FILE, MetricsWriter, file_size
+from .utils import setup_logger, DATA_DIR, LOGS_DIR
+from ..day5.browser_pool import BrowserPool
+from ..day5.observation_store import OBSERVACIONES_DB, TTL_SEGUNDOS, ObservationStore
+from .processor import city_records, pick_city_row, create_personal_excel, send_email_with_attachment, capture_error
+from .stages import Stage, run_staged
 
-logger = setup_logger("day7.main")
+logger = logging.getLogger("day7.main")  # handlers: setup_logger("day7") en main()
 
 
-def process_client_row(row: dict, dry_run: bool):
-    start = time.time()
-    client_name = row.get("name") or row.get("Nombre")
-    city = row.get("city") or row.get("Ciudad")
-    result = {"name": client_name, "city": city, "status": "ok", "notes": "", "time_s": 0.0}
-    try:
-        csv_path = run_scraper_for_city(city)
-        client_data = read_client_row(city, csv_path)
-        client_data["name"] = client_name
-        client_data["email"] = row.get("email")
-        out = create_personal_excel(client_data, DATA_DIR)
-        if not dry_run:
-            subject = f"Informe para {client_name} - {city}"
-            body = f"<p>Hola {client_name},</p><p>Adjunto informe con datos para {city}.</p>"
+def _timed_excel(client: dict, out_dir: Path, tag):
+    """create_personal_excel + sus segundos (se ejecuta en el pool de procesos)."""
+    t = time.perf_counter()
+    out = create_personal_excel(client, out_dir, tag)
+    return out, time.perf_counter() - t
+
+
+def process_clients(rows, dry_run: bool, fast: bool = False, isolated: bool = False, pool=None, store=None,
+                    ttl: float = TTL_SEGUNDOS, metrics: MetricsWriter = None, scrapers: int = 4,
+                    excel_procs: int = 2, smtp_workers: int = 2, queue_size: int = None) -> list:
+    """Procesa los clientes por etapas: scrape -> excel -> email.
+
+    - `scrapers` hilos comparten `pool`; dos clientes de la misma ciudad no
+      scrapean a la vez (el segundo espera y lo sirve el almacén).
+    - El Excel se genera en `excel_procs` procesos (0 = en hilo, sin procesos).
+    - `smtp_workers` hilos envían los correos (etapa omitida con dry_run).
+    Devuelve un resultado por fila, en el orden de `rows`; su `time_s` suma el
+    trabajo de cada etapa del cliente (sin esperas en colas, por la ciudad o por
+    un proceso libre), comparable con el de la ejecución en serie.
+    """
+    metrics = metrics or MetricsWriter(None)
+    city_locks, locks_lock = {}, threading.Lock()
+
+    def scrape_step(item):
+        res = item["result"]
+        item["t0"] = time.time()
+        with locks_lock:
+            lock = city_locks.setdefault(str(res["city"]).lower(), threading.Lock())
+        with lock:
+            t = time.perf_counter()  # la espera por otro cliente de la misma ciudad no cuenta
+            records = city_records(res["city"], fast, isolated, pool, store, ttl, metrics, res["name"])
+            client_data = pick_city_row(res["city"], records)
+            segundos = time.perf_counter() - t
+        client_data["name"] = res["name"]
+        client_data["email"] = item["email"]
+        item["client_data"] = client_data
+        return segundos
+
+    def excel_step(item):
+        res = item["result"]
+        with metrics.span("excel_write", city=res["city"], client=res["name"]) as span:
+            # la fila va en el nombre: "Ana Pérez" y "Ana-Pérez" en el mismo segundo no se pisan el fichero
+            if excel_pool is None:
+                item["out"], segundos = _timed_excel(item["client_data"], DATA_DIR, item["row"])
+            else:  # medido en el proceso hijo: sin la espera por un proceso libre
+                item["out"], segundos = excel_pool.submit(_timed_excel, item["client_data"], DATA_DIR,
+                                                          item["row"]).result()
+            span["bytes"] = file_size(item["out"])
+        return segundos
+
+    def email_step(item):
+        res, out = item["result"], item["out"]
+        subject = f"Informe para {res['name']} - {res['city']}"
+        body = f"<p>Hola {res['name']},</p><p>Adjunto informe con datos para {res['city']}.</p>"
+        with metrics.span("email_send", city=res["city"], client=res["name"], bytes=file_size(out)):
             send_email_with_attachment(subject, body, out)
-        result["time_s"] = time.time() - start
-    except Exception as e:
-        result["status"] = "error"
-        result["notes"] = str(e)
-        cap = capture_error(client_name or "error")
-        if cap:
-            result["screenshot"] = str(cap)
-    return result
+
+    def timed(fn):
+        """Suma a `busy_s` el trabajo propio de la etapa (lo que devuelva `fn`, o su duración);
+        las esperas en las colas entre etapas no cuentan."""
+        def step(item):
+            t = time.perf_counter()
+            segundos = None
+            try:
+                segundos = fn(item)
+            except Exception:
+                item["screenshot"] = capture_error(item["result"]["name"] or "error")  # pantalla del momento del fallo
+                raise
+            finally:
+                item["busy_s"] = item.get("busy_s", 0.0) + (time.perf_counter() - t if segundos is None else segundos)
+        return step
+
+    def items():
+        for n, row in enumerate(rows):
+            client_name = row.get("name") or row.get("Nombre")
+            city = row.get("city") or row.get("Ciudad")
+            yield {"row": n, "email": row.get("email"),
+                   "result": {"name": client_name, "city": city, "status": "ok", "notes": "", "time_s": 0.0}}
+
+    stages = [Stage("scrape", timed(scrape_step), scrapers), Stage("excel", timed(excel_step), max(excel_procs, 1))]
+    if not dry_run:
+        stages.append(Stage("email", timed(email_step), smtp_workers))
+    # spawn: hacer fork con hilos de scraping/SMTP en marcha puede heredar locks tomados
+    excel_pool = ProcessPoolExecutor(max_workers=excel_procs, mp_context=multiprocessing.get_context("spawn")) \
+        if excel_procs > 0 else None
+    try:
+        done = run_staged(items(), stages, queue_size)
+    finally:
+        if excel_pool is not None:
+            excel_pool.shutdown()
+
+    results = []
+    for item in done:
+        res = item["result"]
+        if "t0" in item:
+            metrics.record("client", item["t0"], item["busy_s"], item.get("error"), city=res["city"],
+                           client=res["name"], wall_s=round(time.time() - item["t0"], 6))
+        if "error" in item:
+            res["status"] = "error"
+            res["notes"] = str(item["error"])
+            if item.get("screenshot"):
+                res["screenshot"] = str(item["screenshot"])
+        else:
+            res["time_s"] = item["busy_s"]
+        results.append(res)
+    return results
 
 
 def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--clients", required=True, help="Ruta al CSV de clientes")
     parser.add_argument("--dry-run", action="store_true", help="No envía emails, solo simula")
+    parser.add_argument("--fast-scrape", action="store_true", help="Scraper headless sin imágenes/CSS/anuncios")
+    parser.add_argument("--scraper-mode", choices=("inproc", "subprocess"), default="inproc",
+                        help="inproc = un navegador reutilizado para todo el lote; subprocess = un proceso por cliente")
+    parser.add_argument("--ttl", type=float, default=TTL_SEGUNDOS,
+                        help="Segundos durante los que se reutiliza la observación almacenada de una ciudad")
+    parser.add_argument("--store", type=Path, default=OBSERVACIONES_DB, help="Almacén SQLite de observaciones")
+    parser.add_argument("--metrics", type=Path, default=METRICS_FILE,
+                        help="JSONL de spans por etapa (ver `python -m rpa_lab stats --app day7`)")
+    parser.add_argument("--no-metrics", action="store_true", help="No registrar métricas")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile + tracemalloc + pilas plegadas por etapa en logs/profile_<timestamp>/")
+    parser.add_argument("--scrapers", type=int, default=4, help="Clientes scrapeándose a la vez (navegadores del pool)")
+    parser.add_argument("--excel-procs", type=int, default=2,
+                        help="Procesos que generan los Excel (0 = en un hilo del propio proceso)")
+    parser.add_argument("--smtp-workers", type=int, default=2, help="Correos enviándose a la vez")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Clientes en espera entre etapas (por defecto 2 por hilo de la etapa siguiente)")
     args = parser.parse_args(argv)
 
+    setup_logger("day7")
     df = pd.read_csv(args.clients)
-    results = []
-    for _, row in df.iterrows():
-        res = process_client_row(row.to_dict(), args.dry_run)
-        results.append(res)
+    isolated = args.scraper_mode == "subprocess"
+    pool = None if isolated else BrowserPool(size=args.scrapers, headless=args.fast_scrape, rapido=args.fast_scrape)
+    store = ObservationStore(args.store)
+    profiler = None
+    if args.profile:
+        from rpa_lab.profiling import Profiler, profile_dir
+        profiler = Profiler(profile_dir(LOGS_DIR))
+    metrics = MetricsWriter(None if args.no_metrics else args.metrics, app="day7", profiler=profiler)
+    try:
+        with metrics.span("batch", profile=False, clients=len(df)):
+            rows = (row.to_dict() for _, row in df.iterrows())
+            results = process_clients(rows, args.dry_run, args.fast_scrape, isolated, pool, store, args.ttl,
+                                      metrics, args.scrapers, args.excel_procs, args.smtp_workers, args.queue_size)
+    finally:
+        metrics.close()
+        if profiler is not None:
+            profiler.close()
+        store.close()
+        if pool is not None:
+            pool.close()
 
     # crear report.md
     report_lines = [
@@ -1,50 +1,74 @@
 # src/day7/processor.py
 from pathlib import Path
-import subprocess
 import os
-import time
 import pandas as pd
+import logging
 from tenacity import retry, wait_exponential, stop_after_attempt
-from dotenv import load_dotenv
-from .utils import setup_logger, DATA_DIR, filename_for_client, capture_error
+from rpa_lab.metrics import MetricsWriter, note_retry
+from .utils import DATA_DIR, filename_for_client, capture_error
+from ..day5 import scraper
+from ..day5.observation_store import TTL_SEGUNDOS
 
-logger = setup_logger("day7.processor")
+logger = logging.getLogger("day7.processor")  # handlers: setup_logger("day7") en main()
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 SCRAPER_SCRIPT = PROJECT_ROOT / "src" / "day5" / "scraper.py"
 
 # retry decorator
-retry_decorator = retry(wait=wait_exponential(multiplier=1, min=2, max=20), stop=stop_after_attempt(3), reraise=True)
+retry_decorator = retry(wait=wait_exponential(multiplier=1, min=2, max=20), stop=stop_after_attempt(3),
+                        before_sleep=note_retry, reraise=True)
 
 @retry_decorator
-def run_scraper_for_city(city: str):
-    """Llama al scraper (script) para que escriba data/webdata.csv"""
-    if not SCRAPER_SCRIPT.exists():
-        raise FileNotFoundError(f"Scraper missing: {SCRAPER_SCRIPT}")
-    env = os.environ.copy()
-    env["CITY"] = city
-    logger.info("Running scraper for city=%s", city)
-    res = subprocess.run([os.sys.executable, str(SCRAPER_SCRIPT)], env=env, cwd=str(PROJECT_ROOT),
-                         capture_output=True, text=True)
-    if res.returncode != 0:
-        logger.error("Scraper failed: %s", res.stderr)
-        raise RuntimeError("Scraper failed")
-    # small wait to ensure file written
-    time.sleep(1)
-    return DATA_DIR / "webdata.csv"
+def run_scraper_for_city(city: str, fast: bool = False, isolated: bool = False, pool=None):
+    """Devuelve los registros del scraper para `city`.
 
-def read_client_row(city: str, csv_path: Path):
-    df = pd.read_csv(csv_path)
-    if "Ciudad" in df.columns:
-        matches = df[df["Ciudad"].astype(str).str.lower() == city.lower()]
-        if not matches.empty:
-            return matches.iloc[-1].to_dict()
-    # fallback to last row
-    return df.iloc[-1].to_dict()
+    En proceso reutiliza el navegador de `pool` (BrowserPool) si se da; con
+    `isolated` lanza el script en otro intérprete (aísla caídas de Chrome).
+    """
+    logger.info("Running scraper for city=%s fast=%s isolated=%s", city, fast, isolated)
+    if isolated:
+        if not SCRAPER_SCRIPT.exists():
+            raise FileNotFoundError(f"Scraper missing: {SCRAPER_SCRIPT}")
+        return scraper.scrape_en_subproceso(city, rapido=fast, data_dir=DATA_DIR)
+    if pool is None:
+        return scraper.scrape(city, rapido=fast)
+    with pool.session() as driver:
+        return scraper.scrape(city, rapido=fast, driver=driver)
 
-def create_personal_excel(client: dict, out_dir: Path):
-    """Crea un Excel personalizado para un cliente; devuelve path."""
+def city_records(city: str, fast: bool = False, isolated: bool = False, pool=None, store=None,
+                 ttl: float = TTL_SEGUNDOS, metrics: MetricsWriter = None, client: str = None):
+    """Registros de `city`: la última observación de `store` si tiene menos de `ttl`
+    segundos; si no, se scrapea y se guarda en el almacén."""
+    metrics = metrics or MetricsWriter(None)
+    if store is not None:
+        with metrics.span("store_lookup", city=city, client=client) as span:
+            cached = store.latest(city, ttl)
+            span["hit"] = cached is not None
+        if cached is not None:
+            logger.info("Observation for %s served from %s", city, store.path)
+            return [cached]
+    with metrics.span("scrape", city=city, client=client, mode="subprocess" if isolated else "inproc") as span:
+        records = run_scraper_for_city(city, fast, isolated, pool)
+        span["records"] = len(records)
+    if store is not None:
+        store.add(records)
+    return records
+
+def read_client_row(city: str, store, ttl: float = None):
+    """Última observación almacenada de `city` (None si no hay o ha caducado)."""
+    return store.latest(city, ttl)
+
+def pick_city_row(city: str, records: list):
+    """Registro de `city` entre los devueltos por el scraper (o el último si no aparece)."""
+    for record in reversed(records):
+        if str(record.get("Ciudad", "")).lower() == city.lower():
+            return dict(record)
+    return dict(records[-1])
+
+def create_personal_excel(client: dict, out_dir: Path, tag=None):
+    """Crea un Excel personalizado para un cliente; devuelve path (`tag`: ver filename_for_client)."""
     name = client.get("name") or client.get("Nombre") or "client"
-    fname = filename_for_client(name)
+    fname = filename_for_client(name, tag)
+    out_dir.mkdir(parents=True, exist_ok=True)
     path = out_dir / fname
     # construir un DataFrame simple con la info
     df = pd.DataFrame([client])
@@ -55,6 +79,7 @@ def create_personal_excel(client: dict, out_dir: Path):
 @retry_decorator
 def send_email_with_attachment(subject: str, body: str, attachment_path: Path):
     """Implementa envío reintentable; carga .env para credenciales."""
+    from dotenv import load_dotenv
     load_dotenv(PROJECT_ROOT / ".env")
     import smtplib
     from email.message import EmailMessage
@@ -0,0 +1,86 @@
+# src/day7/stages.py
+"""Ejecutor por etapas (productor/consumidor) para el lote de clientes.
+
+Cada etapa tiene sus propios hilos y entre etapas hay colas acotadas: si una
+etapa lenta (p.ej. SMTP) se llena, las anteriores se bloquean al encolar en vez
+de acumular trabajo en memoria (backpressure). Cada elemento es un dict propio
+de su cliente que viaja por todas las etapas, así los resultados no se cruzan;
+`run_staged` los devuelve en el orden de entrada.
+"""
+import logging
+import queue
+import threading
+
+logger = logging.getLogger("day7.stages")
+
+_FIN = object()  # centinela de fin de etapa
+
+
+class Stage:
+    """`fn(item)` completa el dict del cliente; `workers` hilos la ejecutan a la vez."""
+
+    def __init__(self, name: str, fn, workers: int = 1):
+        if workers < 1:
+            raise ValueError("workers debe ser >= 1")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+
+def run_staged(items, stages, queue_size: int = None) -> list:
+    """Pasa cada dict de `items` (iterable, se consume bajo demanda) por `stages`.
+
+    - Si una etapa lanza, el elemento guarda `error` y `failed_stage` y las
+      etapas siguientes lo dejan pasar sin tocarlo.
+    - `queue_size` acota cada cola; por defecto el doble de hilos de la etapa
+      que la consume.
+    """
+    if not stages:
+        return list(items)
+    colas = [queue.Queue(maxsize=queue_size or 2 * s.workers) for s in stages] + [queue.Queue()]
+    vivos = [s.workers for s in stages]
+    lock = threading.Lock()
+
+    def worker(i: int, stage: Stage):
+        entrada, salida = colas[i], colas[i + 1]
+        while True:
+            item = entrada.get()
+            if item is _FIN:
+                break
+            if "error" not in item:
+                try:
+                    stage.fn(item)
+                except Exception as e:
+                    logger.error("Etapa %s falló para el elemento %s: %s", stage.name, item["_idx"], e)
+                    item["error"], item["failed_stage"] = e, stage.name
+            salida.put(item)
+        with lock:
+            vivos[i] -= 1
+            ultimo = vivos[i] == 0
+        if ultimo:  # la etapa terminó: se cierra la siguiente
+            for _ in range(stages[i + 1].workers if i + 1 < len(stages) else 1):
+                salida.put(_FIN)
+
+    def feeder():
+        try:
+            for idx, item in enumerate(items):
+                item["_idx"] = idx
+                colas[0].put(item)  # bloquea si la primera etapa va llena
+        finally:
+            for _ in range(stages[0].workers):
+                colas[0].put(_FIN)
+
+    hilos = [threading.Thread(target=feeder, name="stage-feeder", daemon=True)]
+    for i, stage in enumerate(stages):
+        hilos += [threading.Thread(target=worker, args=(i, stage), name=f"stage-{stage.name}-{n}", daemon=True)
+                  for n in range(stage.workers)]
+    for h in hilos:
+        h.start()
+
+    resultados = []
+    while (item := colas[-1].get()) is not _FIN:
+        resultados.append(item)
+    for h in hilos:
+        h.join()
+    resultados.sort(key=lambda it: it.pop("_idx"))
+    return resultados
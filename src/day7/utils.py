@@ -3,15 +3,12 @@ from pathlib import Path
 import logging
 import sys
 from datetime import datetime
-import pyautogui
 
+# pyautogui se importa sólo al hacer una captura: en hosts sin pantalla falla al importarse
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_ROOT / "data"
 CAPTURES_DIR = PROJECT_ROOT / "captures"
 LOGS_DIR = PROJECT_ROOT / "logs"
-DATA_DIR.mkdir(exist_ok=True)
-CAPTURES_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
 
 LOG_FILE = LOGS_DIR / "day7.log"
 
@@ -20,6 +17,7 @@ def setup_logger(name: str = None):
     if logger.handlers:
         return logger
     logger.setLevel(logging.INFO)
+    LOGS_DIR.mkdir(exist_ok=True)
     fmt = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     fh = logging.FileHandler(LOG_FILE, encoding="utf-8")
     fh.setFormatter(fmt)
@@ -29,16 +27,20 @@ def setup_logger(name: str = None):
     logger.addHandler(ch)
     return logger
 
-def filename_for_client(name: str) -> str:
+def filename_for_client(name: str, tag=None) -> str:
+    """<nombre>_<timestamp>[_<tag>].xlsx; `tag` (p.ej. la fila del lote) distingue clientes
+    con el mismo nombre saneado generados en el mismo segundo."""
     safe = "".join(c if c.isalnum() else "_" for c in name).strip("_")
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"{safe}_{ts}.xlsx"
+    return f"{safe}_{ts}.xlsx" if tag is None else f"{safe}_{ts}_{tag}.xlsx"
 
 def capture_error(tag: str):
     """Toma screenshot y devuelve path (requiere entorno gráfico)."""
     p = CAPTURES_DIR / f"{tag}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
     try:
-        img = pyautogui.screenshot(str(p))
+        import pyautogui
+        CAPTURES_DIR.mkdir(exist_ok=True)
+        pyautogui.screenshot(str(p))
         return p
     except Exception:
         # si no hay entorno gráfico, no fallamos la ejecución
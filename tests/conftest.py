@@ -0,0 +1,279 @@
+# tests/conftest.py
+import http.server
+import json
+import logging
+import socketserver
+import threading
+import time
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: acepta todo y guarda los mensajes en memoria."""
+
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        self._reply("220 sink ESMTP")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            cmd = raw.decode(errors="replace").strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 sink")
+            elif verb == "DATA":
+                self._reply("354 end with .")
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line)
+                with sink.lock:
+                    sink.messages.append(b"".join(lines))
+                    drop = sink.drop_after is not None and len(sink.messages) % sink.drop_after == 0
+                self._reply("250 queued")
+                if drop:
+                    # simula un servidor que corta la sesión
+                    return
+            elif verb == "MAIL" and sink.take_421():
+                # simula un servidor que cierra la sesión con "421 service closing"
+                self._reply("421 closing")
+                return
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                # MAIL, RCPT, RSET, NOOP... (STARTTLS no está soportado)
+                self._reply("250 ok" if verb != "STARTTLS" else "502 not implemented")
+
+
+class _SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    def __init__(self, drop_after=None, replies_421=0):
+        self.messages = []
+        self.connections = 0
+        self.drop_after = drop_after
+        self.replies_421 = replies_421
+        self.lock = threading.Lock()
+        self._server = _SMTPSink(("127.0.0.1", 0), _SMTPSinkHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def take_421(self) -> bool:
+        with self.lock:
+            if self.replies_421 > 0:
+                self.replies_421 -= 1
+                return True
+        return False
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def smtp_sink_factory():
+    """Crea sinks SMTP locales (p.ej. `smtp_sink_factory(drop_after=3)`) y los cierra al final."""
+    sinks = []
+
+    def _make(**kwargs):
+        sink = SMTPSink(**kwargs)
+        sinks.append(sink)
+        return sink
+
+    yield _make
+    for sink in sinks:
+        sink.close()
+
+
+@pytest.fixture
+def smtp_sink(smtp_sink_factory):
+    return smtp_sink_factory()
+
+
+# ---------------- Páginas del clima (servidor HTTP local) ----------------
+CLIMA = {
+    "madrid": ("21°", "Soleado"),
+    "sevilla": ("30°", "Despejado"),
+    "bilbao": ("14°", "Lluvia"),
+}
+
+
+class _ClimaHandler(http.server.BaseHTTPRequestHandler):
+    """/clima/<ciudad> -> página grabada con temperatura y estado; /roto/<ciudad> -> sin selectores."""
+
+    def do_GET(self):
+        site = self.server.site
+        partes = urllib.parse.unquote(self.path).strip("/").split("/")
+        with site.lock:
+            site.requests.append(self.path)
+            site.inflight += 1
+            site.max_inflight = max(site.max_inflight, site.inflight)
+        try:
+            if site.delay:
+                time.sleep(site.delay)
+            self._respond(site, partes)
+        finally:
+            with site.lock:
+                site.inflight -= 1
+
+    def _respond(self, site, partes):
+        if len(partes) == 2 and partes[0] == "clima" and partes[1].lower() in CLIMA:
+            temperatura, estado = CLIMA[partes[1].lower()]
+            body = site.template.format(ciudad=partes[1].title(), slug=partes[1].lower(),
+                                        temperatura=temperatura, estado=estado)
+        elif len(partes) == 2 and partes[0] == "roto":
+            body = "<!DOCTYPE html>\n<html><head><title>x</title></head><body><div>cargando...</div></body></html>"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ClimaHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class ClimaSite:
+    def __init__(self):
+        self.template = (FIXTURES_DIR / "clima.html").read_text(encoding="utf-8")
+        self.requests = []
+        self.delay = 0.0  # retardo por petición, para medir concurrencia
+        self.inflight = self.max_inflight = 0
+        self.lock = threading.Lock()
+        self._server = _ClimaHTTPServer(("127.0.0.1", 0), _ClimaHandler)
+        self._server.site = self
+        host, port = self._server.server_address
+        self.base_url = f"http://{host}:{port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def url(self, ciudad: str) -> str:
+        return f"{self.base_url}/clima/{ciudad.lower()}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def clima_site():
+    site = ClimaSite()
+    yield site
+    site.close()
+
+
+# ---------------- WebDriver falso (sin navegador) ----------------
+class _Elemento:
+    def __init__(self, node):
+        self.text = "".join(node.itertext()).strip()
+
+
+class HtmlDriver:
+    """Subconjunto de la API de WebDriver (get/find_element/quit) sobre urllib + ElementTree.
+
+    Sólo entiende XPath de ElementTree (`//tag[@attr='x']` y rutas absolutas con
+    índices), suficiente para los selectores del scraper.
+    """
+
+    def __init__(self, registry):
+        self._registry = registry
+        self._root = None
+        self.pages = 0
+        self.quit_called = False
+
+    def get(self, url):
+        if self.quit_called:
+            raise RuntimeError("driver cerrado")
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            html = resp.read().decode("utf-8")
+        self._root = ET.fromstring(html.split("\n", 1)[1] if html.startswith("<!DOCTYPE") else html)
+        self.pages += 1
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+
+        if by != "xpath":
+            raise NotImplementedError(by)
+        path = "." + value if value.startswith("//") else value.replace("/html/", "", 1)
+        node = self._root.find(path) if self._root is not None else None
+        if node is None:
+            raise NoSuchElementException(value)
+        return _Elemento(node)
+
+    def quit(self):
+        self.quit_called = True
+        self._registry.quits += 1
+
+
+class _DriverRegistry:
+    def __init__(self):
+        self.drivers = []
+        self.quits = 0
+
+    def __call__(self):
+        driver = HtmlDriver(self)
+        self.drivers.append(driver)
+        return driver
+
+
+@pytest.fixture
+def fake_webdriver_factory():
+    """Fábrica de HtmlDriver; `.drivers` y `.quits` permiten comprobar arranques y reciclados."""
+    return _DriverRegistry()
+
+
+# ---------------- Entorno del pipeline ----------------
+@pytest.fixture
+def pipeline_env(tmp_path, monkeypatch, clima_site, fake_webdriver_factory):
+    """rpa_lab.pipeline con log en tmp, mapa de ciudades del servidor local y navegadores falsos."""
+    from rpa_lab import pipeline
+    from src.day5.browser_pool import BrowserPool
+
+    mapa = tmp_path / "ciudades.json"
+    mapa.write_text(json.dumps({
+        "Madrid": clima_site.url("madrid"),
+        "Sevilla": clima_site.url("sevilla"),
+        "Bilbao": clima_site.url("bilbao"),
+        "Roto": f"{clima_site.base_url}/no-existe",
+    }), encoding="utf-8")
+    monkeypatch.setenv("CIUDADES_JSON", str(mapa))
+    monkeypatch.setattr(pipeline, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(pipeline, "LOG_FILE", tmp_path / "logs" / "pipeline.log")
+    monkeypatch.setattr(pipeline, "_make_pool",
+                        lambda size, fast: BrowserPool(size, driver_factory=fake_webdriver_factory))
+    monkeypatch.setattr("src.day5.scraper.crear_driver", lambda **kw: fake_webdriver_factory())
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    yield tmp_path / "out"
+    for h in root.handlers[len(handlers):]:
+        h.close()
+    root.handlers[:] = handlers
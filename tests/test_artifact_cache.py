@@ -0,0 +1,113 @@
+import logging
+
+from src.day2 import transformer
+from src.day2.artifact_cache import ArtifactCache, memoize_files, memoize_text
+from src.day4 import notepad_rpa
+
+
+def test_key_depends_on_content_and_params(tmp_path):
+    entrada = tmp_path / "ventas.csv"
+    entrada.write_text("a,b\n1,2\n", encoding="utf-8")
+    with ArtifactCache(tmp_path / "cache") as cache:
+        k1 = cache.key("etapa", [entrada], {"formato": "csv"})
+        assert cache.key("etapa", [entrada], {"formato": "csv"}) == k1
+        assert cache.key("etapa", [entrada], {"formato": "openpyxl"}) != k1
+        entrada.write_text("a,b\n1,3\n", encoding="utf-8")
+        assert cache.key("etapa", [entrada], {"formato": "csv"}) != k1
+
+
+def test_key_depends_on_stage_code(tmp_path):
+    fuente = tmp_path / "etapa.py"
+    fuente.write_text("def f(): return 1\n", encoding="utf-8")
+    with ArtifactCache(tmp_path / "cache") as cache:
+        k1 = cache.key("etapa", [], {}, code=[fuente])
+        assert cache.key("etapa", [], {}, code=[fuente]) == k1
+        fuente.write_text("def f(): return 2\n", encoding="utf-8")  # cambia la lógica: otra clave
+        assert cache.key("etapa", [], {}, code=[fuente]) != k1
+        assert cache.key("etapa", [], {}, code=[transformer.transformar]) == \
+            cache.key("etapa", [], {}, code=[transformer.__file__])
+
+
+def test_put_streams_files_into_blobs(tmp_path, monkeypatch):
+    grande = tmp_path / "datos.csv"
+    grande.write_bytes(b"fila\n" * 300_000)
+    monkeypatch.setattr("pathlib.Path.read_bytes", lambda self: (_ for _ in ()).throw(AssertionError("read_bytes")))
+    with ArtifactCache(tmp_path / "cache") as cache:
+        cache.put("k", "e", {"datos": grande})
+        blob = cache.get("k")["datos"]
+        assert cache.size() == grande.stat().st_size
+    monkeypatch.undo()
+    assert blob.read_bytes() == grande.read_bytes()
+
+
+def test_memoize_files_skips_build_and_restores(tmp_path):
+    salida = tmp_path / "out" / "informe.txt"
+    llamadas = []
+
+    def build():
+        llamadas.append(1)
+        salida.parent.mkdir(exist_ok=True)
+        salida.write_text("informe", encoding="utf-8")
+        return [salida]
+
+    with ArtifactCache(tmp_path / "cache") as cache:
+        assert memoize_files(cache, "informe", [], {"v": 1}, build) == ([salida], False)
+        salida.unlink()
+        assert memoize_files(cache, "informe", [], {"v": 1}, build) == ([salida], True)
+        assert salida.read_text(encoding="utf-8") == "informe" and len(llamadas) == 1
+        memoize_files(cache, "informe", [], {"v": 2}, build)
+        assert len(llamadas) == 2
+    assert memoize_files(None, "informe", [], {"v": 1}, build) == ([salida], False)  # --no-cache
+    assert len(llamadas) == 3
+
+
+def test_lru_eviction_by_size(tmp_path):
+    with ArtifactCache(tmp_path / "cache", max_bytes=250) as cache:
+        claves = [cache.key("e", [], {"i": i}) for i in range(3)]
+        cache.put(claves[0], "e", {"a": b"x" * 100})
+        cache.put(claves[1], "e", {"a": b"y" * 100})
+        assert cache.get(claves[0]) is not None  # 0 pasa a ser el más reciente
+        cache.put(claves[2], "e", {"a": b"z" * 100})
+        assert cache.get(claves[1]) is None
+        assert cache.get(claves[0]) is not None and cache.get(claves[2]) is not None
+        assert cache.size() == 200
+        assert len([p for p in (tmp_path / "cache" / "blobs").rglob("*") if p.is_file()]) == 2
+
+
+def test_identical_artifacts_stored_once(tmp_path):
+    with ArtifactCache(tmp_path / "cache") as cache:
+        cache.put("k1", "e", {"a": b"mismo"})
+        cache.put("k2", "e", {"b": b"mismo"})
+        assert cache.size() == len(b"mismo")
+
+
+def test_transformer_second_run_is_cache_hit(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(transformer, "setup_logging", lambda: None)
+    monkeypatch.setattr(transformer, "CACHE_DIR", tmp_path / "cache")
+    for nombre in ("OUTPUT_EXCEL", "RECHAZADAS"):
+        monkeypatch.setattr(transformer, nombre, tmp_path / getattr(transformer, nombre).name)
+    caplog.set_level(logging.INFO)
+    transformer.main(["--formato", "csv"])
+    informe = (tmp_path / "informe.Datos.csv").read_text(encoding="utf-8")
+    (tmp_path / "informe.Datos.csv").unlink()
+    caplog.clear()
+    transformer.main(["--formato", "csv"])
+    assert any("Caché HIT transformer" in r.message for r in caplog.records)
+    assert not any("Leyendo CSV" in r.message for r in caplog.records)
+    assert (tmp_path / "informe.Datos.csv").read_text(encoding="utf-8") == informe
+    caplog.clear()
+    transformer.main(["--formato", "csv", "--no-cache"])
+    assert any("Leyendo CSV" in r.message for r in caplog.records)
+
+
+def test_notepad_summary_read_once(tmp_path, monkeypatch):
+    informe = tmp_path / "informe.xlsx"
+    transformer.write_report({"Resumen": transformer.pd.DataFrame({"x": [1, 2]})}, informe)
+    lecturas = []
+    original = notepad_rpa.leer_resumen
+    monkeypatch.setattr(notepad_rpa, "leer_resumen", lambda p: lecturas.append(p) or original(p))
+    textos = [notepad_rpa.leer_resumen_cacheado(informe, tmp_path / "cache") for _ in range(2)]
+    assert textos[0] == textos[1] and len(lecturas) == 1
+    with ArtifactCache(tmp_path / "cache") as cache:
+        assert memoize_text(cache, "leer_resumen", [informe], {"hoja": "Resumen"}, lambda: "otro",
+                            code=[notepad_rpa.__file__]) == textos[0]
@@ -0,0 +1,101 @@
+# tests/test_browser_pool.py
+import functools
+import io
+import json
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from src.day5 import scraper
+from src.day5.browser_pool import BrowserPool, ScraperServer, ScraperService, pedir_ciudad
+
+extraer = functools.partial(scraper.extraer_clima, timeout=0.5)
+
+
+def test_pool_reuses_and_recycles_sessions(clima_site, fake_webdriver_factory):
+    pool = BrowserPool(size=1, max_pages=3, driver_factory=fake_webdriver_factory)
+    with ScraperService(pool, extraer) as service:
+        registros = [service.scrape("Madrid", clima_site.url("madrid")) for _ in range(7)]
+    assert {(r["Temperatura"], r["Estado"]) for r in registros} == {("21°", "Soleado")}
+    assert pool.sessions_started == 3  # 3 + 3 + 1
+    assert [d.pages for d in fake_webdriver_factory.drivers] == [3, 3, 1]
+    assert fake_webdriver_factory.quits == 3  # dos reciclados + cierre del pool
+
+
+def test_session_recycled_on_error(clima_site, fake_webdriver_factory):
+    pool = BrowserPool(size=1, max_pages=50, driver_factory=fake_webdriver_factory)
+    with ScraperService(pool, extraer) as service:
+        service.scrape("Madrid", clima_site.url("madrid"))
+        with pytest.raises(TimeoutException):
+            service.scrape("Madrid", f"{clima_site.base_url}/roto/madrid")
+        assert service.scrape("Bilbao", clima_site.url("bilbao"))["Estado"] == "Lluvia"
+    assert pool.sessions_started == 2
+    assert pool.recycled == 1
+
+
+def test_concurrent_requests_bounded_by_pool_size(clima_site, fake_webdriver_factory):
+    pool = BrowserPool(size=2, max_pages=50, driver_factory=fake_webdriver_factory)
+    ciudades = ["Madrid", "Sevilla", "Bilbao"] * 4
+    with ScraperService(pool, extraer) as service:
+        futures = [service.submit(c, clima_site.url(c)) for c in ciudades]
+        registros = [f.result() for f in futures]
+    assert [r["Ciudad"] for r in registros] == ciudades
+    assert pool.sessions_started <= 2
+    assert len(clima_site.requests) == len(ciudades)
+
+
+def test_socket_server(clima_site, fake_webdriver_factory):
+    pool = BrowserPool(size=1, driver_factory=fake_webdriver_factory)
+    with ScraperService(pool, extraer) as service, ScraperServer(service) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        registro = pedir_ciudad("Sevilla", host, port, url=clima_site.url("sevilla"))
+        with pytest.raises(RuntimeError):
+            pedir_ciudad("Sevilla", host, port, url=f"{clima_site.base_url}/roto/sevilla")
+        server.shutdown()
+    assert registro["Temperatura"] == "30°"
+
+
+def test_driver_path_resolved_once(monkeypatch):
+    scraper.resolver_driver_path.cache_clear()
+    monkeypatch.setenv("CHROMEDRIVER_PATH", "/opt/chromedriver")
+    assert scraper.resolver_driver_path() == "/opt/chromedriver"
+    monkeypatch.setenv("CHROMEDRIVER_PATH", "/otro")
+    assert scraper.resolver_driver_path() == "/opt/chromedriver"
+    scraper.resolver_driver_path.cache_clear()
+
+
+def test_explicit_wait_without_fixed_sleep(clima_site, fake_webdriver_factory):
+    driver = fake_webdriver_factory()
+    t0 = time.perf_counter()
+    registro = scraper.extraer_clima(driver, "Sevilla", clima_site.url("sevilla"))
+    assert registro["Temperatura"] == "30°"
+    with pytest.raises(TimeoutException):
+        scraper.extraer_clima(driver, "Sevilla", f"{clima_site.base_url}/roto/sevilla", timeout=0.3)
+    assert time.perf_counter() - t0 < scraper.ESPERA_CARGA
+
+
+def test_result_signal_roundtrip(tmp_path):
+    buf = io.StringIO()
+    registros = [{"Ciudad": "Madrid", "Temperatura": "21°"}]
+    buf.write("log que se coló en stdout\n")
+    scraper.emitir_resultado(tmp_path / "webdata.csv", registros, buf)
+    resultado = scraper.leer_resultado(buf.getvalue())
+    assert resultado == {"csv": str(tmp_path / "webdata.csv"), "registros": registros}
+    with pytest.raises(RuntimeError):
+        scraper.leer_resultado("")
+
+
+def test_scrape_returns_records_in_process(clima_site, fake_webdriver_factory, tmp_path, monkeypatch):
+    mapa = tmp_path / "ciudades.json"
+    mapa.write_text(json.dumps({"Madrid": clima_site.url("madrid"), "Bilbao": clima_site.url("bilbao")}),
+                    encoding="utf-8")
+    monkeypatch.setenv("CIUDADES_JSON", str(mapa))
+    driver = fake_webdriver_factory()
+    registros = scraper.scrape("bilbao", rapido=True, driver=driver)
+    assert [(r["Ciudad"], r["Temperatura"]) for r in registros] == [("bilbao", "14°")]
+    # ciudad sin URL: se consulta Madrid, como hacía el script
+    assert scraper.scrape("Lugo", rapido=True, driver=driver)[0]["Estado"] == "Soleado"
+    assert not driver.quit_called  # el driver prestado no se cierra
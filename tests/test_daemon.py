@@ -0,0 +1,120 @@
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from rpa_lab import daemon, pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_queue_claims_in_order_once(tmp_path):
+    queue = daemon.JobQueue(tmp_path / "jobs.sqlite")
+    ids = [queue.submit(["--city", c]) for c in ("Madrid", "Bilbao")]
+    assert queue.claim("w0") == (ids[0], ["--city", "Madrid"])
+    assert queue.claim("w1") == (ids[1], ["--city", "Bilbao"])
+    assert queue.claim("w0") is None
+    queue.finish(ids[0], 0)
+    queue.finish(ids[1], 3, "sin datos")
+    assert queue.get(ids[1])["status"] == "failed" and queue.get(ids[1])["error"] == "sin datos"
+    assert queue.counts() == {"done": 1, "failed": 1}
+
+
+def test_queue_requeues_only_expired_leases(tmp_path):
+    queue = daemon.JobQueue(tmp_path / "jobs.sqlite")
+    job_id = queue.submit(["--city", "Madrid"])
+    queue.claim("d1/w0", lease=60)
+    otro = daemon.JobQueue(tmp_path / "jobs.sqlite")  # segundo daemon arrancando
+    assert otro.requeue_expired() == 0  # el primero sigue vivo: su trabajo no se toca
+    assert otro.claim("d2/w0") is None
+    assert queue.heartbeat([job_id], "d1/", lease=60) == 1
+    assert otro.requeue_expired(now=time.time() + 120) == 1  # d1 dejó de latir
+    assert otro.claim("d2/w0") == (job_id, ["--city", "Madrid"])
+    assert not queue.finish(job_id, 0, worker="d1/w0")  # d1 ya no es el dueño
+    assert otro.finish(job_id, 0, worker="d2/w0")
+
+
+def test_second_daemon_does_not_rerun_live_jobs(tmp_path):
+    queue = daemon.JobQueue(tmp_path / "jobs.sqlite")
+    job_id = queue.submit(["--city", "Madrid"])
+    queue.claim("vivo/w0", lease=60)
+    daemon.Daemon(daemon.JobQueue(tmp_path / "jobs.sqlite"), workers=1).serve(until_empty=True)
+    assert queue.get(job_id)["status"] == "running" and queue.get(job_id)["worker"] == "vivo/w0"
+
+
+def test_concurrent_claims_never_share_a_job(tmp_path):
+    queue = daemon.JobQueue(tmp_path / "jobs.sqlite")
+    for i in range(40):
+        queue.submit([str(i)])
+    claimed = []
+
+    def worker(name):
+        while (job := queue.claim(name)) is not None:
+            claimed.append(job[0])
+        queue.close()
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == list(range(1, 41))
+
+
+def test_daemon_runs_jobs_with_shared_pool(pipeline_env, fake_webdriver_factory, clima_site):
+    queue = daemon.JobQueue(pipeline_env.parent / "jobs.sqlite")
+    args = ["--retries", "1", "--fast-scrape", "--data-dir", str(pipeline_env)]
+    ok = queue.submit(["--cities", "Madrid,Sevilla", *args])
+    fallo = queue.submit(["--city", "Roto", *args])
+    malo = queue.submit(["--no-such-flag"])
+    pool = pipeline._make_pool(2, True)
+    try:
+        daemon.Daemon(queue, pool, workers=2).serve(until_empty=True)
+    finally:
+        pool.close()
+    assert [queue.get(j)["rc"] for j in (ok, fallo, malo)] == [0, 3, 2]
+    assert queue.get(malo)["error"] == "argumentos inválidos"
+    hojas = pd.read_excel(pipeline_env / pipeline.CITIES_REPORT, sheet_name=None)
+    assert list(hojas) == ["Madrid", "Sevilla"]
+    # los trabajos reutilizan los navegadores del daemon; sólo el fallo de Roto recicla uno
+    assert len(fake_webdriver_factory.drivers) - pool.recycled <= 2
+
+
+def test_submit_and_status_cli(tmp_path, capsys):
+    cola = str(tmp_path / "jobs.sqlite")
+    assert daemon.status_main(["--queue", cola]) == 1
+    assert daemon.submit_main(["--queue", cola, "--", "--city", "Madrid", "--dry-run"]) == 0
+    job_id = int(capsys.readouterr().out)
+    assert daemon.submit_main(["--queue", cola, "--wait", "--timeout", "0", "--", "--city", "Bilbao"]) == 124
+    capsys.readouterr()
+
+    assert daemon.status_main(["--queue", cola, str(job_id), "--json"]) == 0
+    job, = json.loads(capsys.readouterr().out)
+    assert job["status"] == "queued" and json.loads(job["argv"]) == ["--city", "Madrid", "--dry-run"]
+    assert daemon.status_main(["--queue", cola]) == 0
+    assert "queued=2" in capsys.readouterr().out
+
+
+def test_serve_until_empty_warms_pool(pipeline_env, fake_webdriver_factory):
+    cola = pipeline_env.parent / "jobs.sqlite"
+    daemon.JobQueue(cola).submit(["--city", "Bilbao", "--retries", "1", "--data-dir", str(pipeline_env)])
+    assert daemon.serve_main(["--queue", str(cola), "--workers", "2", "--until-empty"]) == 0
+    assert len(fake_webdriver_factory.drivers) == 2  # arrancados antes del primer trabajo
+    assert fake_webdriver_factory.quits == 2
+    assert daemon.JobQueue(cola).counts() == {"done": 1}
+
+
+
+def test_warm_up_preloads_what_the_first_job_needs():
+    # intérprete limpio: en la sesión de pytest pandas ya está importado
+    heavy = ("pandas", "tenacity", "openpyxl", "src.day5.scraper", "src.day2.report_writers")
+    code = ("import sys; from rpa_lab import daemon, pipeline; "
+            "pipeline._make_pool = lambda size, fast: type('P', (), {'warm': lambda self: 0})(); "
+            f"daemon.warm_up(); print([m for m in {heavy!r} if m not in sys.modules])")
+    res = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    assert res.stdout.strip() == "[]"
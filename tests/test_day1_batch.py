@@ -0,0 +1,39 @@
+# tests/test_day1_batch.py
+import json
+
+from src.day1 import processor
+from src.day1.batch import procesar_directorio
+
+
+def test_batch_totals_sharding_and_incremental_skip(tmp_path):
+    entrada, salida = tmp_path / "in", tmp_path / "out"
+    entrada.mkdir()
+    (entrada / "a.txt").write_text("Hola mundo\nPingüino en Ávila\r\nRPA con Git", encoding="utf-8")
+    (entrada / "b.txt").write_text("".join(f"línea {i} tres\n" for i in range(500)), encoding="utf-8")
+    (entrada / "c.csv").write_text('Nombre,Ciudad\n Ana ,Málaga\n"López, José",Cádiz\n', encoding="utf-8")
+
+    esperado_lineas = esperado_palabras = 0
+    for name in ("a.txt", "b.txt"):
+        lineas, palabras = processor.procesar_txt(entrada / name)
+        esperado_lineas += len(lineas)
+        esperado_palabras += palabras
+
+    totales = procesar_directorio(entrada, salida, workers=2, shard_size=256)
+    assert totales["procesados"] == 3
+    assert totales["lineas"] == esperado_lineas
+    assert totales["palabras"] == esperado_palabras
+    assert totales["filas_csv"] == 3
+    assert (salida / "c_resultado.csv").exists()
+    assert "Total líneas" in (salida / "reporte_lote.txt").read_text(encoding="utf-8")
+
+    # segunda pasada: nada cambió
+    again = procesar_directorio(entrada, salida, workers=2, shard_size=256)
+    assert again["procesados"] == 0 and again["sin_cambios"] == 3
+    assert again["lineas"] == esperado_lineas
+
+    # sólo se reprocesa el fichero modificado
+    (entrada / "a.txt").write_text("una dos\n", encoding="utf-8")
+    third = procesar_directorio(entrada, salida, workers=2, shard_size=256)
+    assert third["procesados"] == 1
+    manifest = json.loads((salida / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["a.txt"]["lineas"] == 1 and manifest["a.txt"]["palabras"] == 2
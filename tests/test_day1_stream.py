@@ -0,0 +1,38 @@
+# tests/test_day1_stream.py
+import tracemalloc
+
+from src.day1 import processor
+
+
+def test_stream_matches_in_memory(tmp_path):
+    txt = tmp_path / "in.txt"
+    txt.write_text("Hola  mundo\n  Pingüino en Ávila \n\nRPA con Git", encoding="utf-8")
+    csv_in = tmp_path / "in.csv"
+    csv_in.write_text('Nombre,Ciudad\n Ana ,Málaga\n"López, José",Cádiz\n', encoding="utf-8")
+
+    lineas, palabras = processor.procesar_txt(txt)
+    assert processor.procesar_txt_stream(txt) == (len(lineas), palabras)
+
+    filas, total = processor.procesar_csv(csv_in)
+    processor.guardar_resultados_csv(filas, tmp_path / "esperado.csv")
+    assert processor.procesar_csv_stream(csv_in, tmp_path / "stream.csv") == total
+    assert (tmp_path / "stream.csv").read_bytes() == (tmp_path / "esperado.csv").read_bytes()
+
+
+def _peak_for(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(f"línea número {i} con acentos: canción, camión\n")
+    tracemalloc.start()
+    total_lineas, _ = processor.procesar_txt_stream(path, buffer_size=1 << 16)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert total_lineas == lines
+    return peak
+
+
+def test_stream_memory_is_independent_of_file_size(tmp_path):
+    small = _peak_for(tmp_path / "pequeno.txt", 100_000)
+    big = _peak_for(tmp_path / "grande.txt", 400_000)
+    # el memo de celdas está acotado; el resto no crece con el fichero
+    assert big < small * 1.5
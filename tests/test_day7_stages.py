@@ -0,0 +1,137 @@
+import json
+import logging
+import random
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.day5.browser_pool import BrowserPool
+from src.day7 import main as day7_main
+from src.day7 import utils as day7_utils
+from src.day7.stages import Stage, run_staged
+
+
+def test_run_staged_keeps_order_and_isolates_errors():
+    def doble(item):
+        time.sleep(random.random() / 200)
+        if item["n"] == 3:
+            raise ValueError("tres")
+        item["doble"] = item["n"] * 2
+
+    def mas_uno(item):
+        time.sleep(random.random() / 200)
+        item["final"] = item["doble"] + 1
+
+    items = [{"n": n} for n in range(20)]
+    out = run_staged(iter(items), [Stage("doble", doble, 4), Stage("mas_uno", mas_uno, 2)])
+    assert [it["n"] for it in out] == list(range(20))
+    assert all(it["final"] == it["n"] * 2 + 1 for it in out if it["n"] != 3)
+    assert out[3]["failed_stage"] == "doble" and "final" not in out[3]
+
+
+def test_run_staged_backpressure_bounds_items_in_flight():
+    lock = threading.Lock()
+    stats = {"fed": 0, "done": 0, "max_inflight": 0}
+
+    def items():
+        for n in range(60):
+            with lock:
+                stats["fed"] += 1
+                stats["max_inflight"] = max(stats["max_inflight"], stats["fed"] - stats["done"])
+            yield {"n": n}
+
+    def lento(item):
+        time.sleep(0.002)
+        with lock:
+            stats["done"] += 1
+
+    run_staged(items(), [Stage("rapido", lambda it: None, 2), Stage("lento", lento, 1)], queue_size=1)
+    # colas (1 + 1) + hilos (2 + 1) + el que el alimentador tiene en la mano
+    assert stats["max_inflight"] <= 6
+
+
+@pytest.fixture
+def day7_env(tmp_path, monkeypatch, clima_site, fake_webdriver_factory):
+    """day7 con datos, log y report.md en tmp, ciudades del servidor local y navegadores falsos."""
+    mapa = tmp_path / "ciudades.json"
+    mapa.write_text(json.dumps({c: clima_site.url(c) for c in ("Madrid", "Sevilla", "Bilbao")}), encoding="utf-8")
+    monkeypatch.setenv("CIUDADES_JSON", str(mapa))
+    monkeypatch.setattr(day7_utils, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(day7_utils, "LOG_FILE", tmp_path / "logs" / "day7.log")
+    monkeypatch.setattr(day7_main, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(day7_main, "BrowserPool",
+                        lambda size, **kw: BrowserPool(size, driver_factory=fake_webdriver_factory))
+    monkeypatch.chdir(tmp_path)
+    logger = logging.getLogger("day7")
+    yield tmp_path
+    for h in logger.handlers:
+        h.close()
+    logger.handlers.clear()
+
+
+def test_day7_batch_staged_results_stay_with_their_client(day7_env, clima_site, monkeypatch):
+    clientes = day7_env / "clientes.csv"
+    emails = {n: f"{n.lower()}@example.com" for n in ("Ana", "Bea", "Carlos", "Dani", "Eva", "Fran")}
+    pd.DataFrame({
+        "name": list(emails),
+        "email": list(emails.values()),
+        "city": ["Madrid", "Sevilla", "Bilbao", "Sevilla", "Madrid", "Bilbao"],
+    }).to_csv(clientes, index=False)
+    enviados = {}
+
+    def enviar(subject, body, attachment_path):
+        if "Eva" in subject:
+            raise RuntimeError("SMTP caído")
+        enviados[subject] = pd.read_excel(attachment_path).iloc[0].to_dict()
+
+    monkeypatch.setattr(day7_main, "send_email_with_attachment", enviar)
+    metrics = day7_env / "metrics.jsonl"
+    day7_main.main(["--clients", str(clientes), "--store", str(day7_env / "obs.sqlite"), "--metrics", str(metrics),
+                    "--scrapers", "3", "--excel-procs", "1", "--smtp-workers", "2", "--queue-size", "1"])
+
+    filas = (day7_env / "report.md").read_text(encoding="utf-8").splitlines()[4:]
+    celdas = [[c.strip() for c in f.strip("|").split("|")] for f in filas]
+    assert [c[:3] for c in celdas] == [["Ana", "Madrid", "ok"], ["Bea", "Sevilla", "ok"], ["Carlos", "Bilbao", "ok"],
+                                       ["Dani", "Sevilla", "ok"], ["Eva", "Madrid", "error"],
+                                       ["Fran", "Bilbao", "ok"]]
+    assert celdas[4][4] == "SMTP caído"
+    assert len(enviados) == 5
+    for subject, fila in enviados.items():
+        assert subject == f"Informe para {fila['name']} - {fila['Ciudad']}"
+        assert fila["email"] == emails[fila["name"]]
+    assert enviados["Informe para Bea - Sevilla"]["Temperatura"] == "30°"
+    assert sorted(clima_site.requests) == ["/clima/bilbao", "/clima/madrid", "/clima/sevilla"]  # una por ciudad
+
+    spans = [json.loads(l) for l in metrics.read_text(encoding="utf-8").splitlines()]
+    clientes_ok = {s["client"]: s["outcome"] for s in spans if s["stage"] == "client"}
+    assert clientes_ok == {"Ana": "ok", "Bea": "ok", "Carlos": "ok", "Dani": "ok", "Eva": "error", "Fran": "ok"}
+
+
+def test_day7_same_sanitized_names_keep_their_own_excel(day7_env, monkeypatch):
+    clientes = day7_env / "clientes.csv"
+    pd.DataFrame({
+        "name": ["Ana Pérez", "Ana-Pérez", "Ana Pérez", "Ana_Pérez"],
+        "email": ["a@example.com", "b@example.com", "c@example.com", "d@example.com"],
+        "city": ["Madrid", "Sevilla", "Bilbao", "Sevilla"],
+    }).to_csv(clientes, index=False)
+    enviados = []
+
+    def enviar(subject, body, attachment_path):
+        time.sleep(0.3)  # SMTP lento: los Excel esperan en la cola mientras se generan los siguientes
+        enviados.append((subject, pd.read_excel(attachment_path).iloc[0].to_dict()))
+
+    monkeypatch.setattr(day7_main, "send_email_with_attachment", enviar)
+    day7_main.main(["--clients", str(clientes), "--store", str(day7_env / "obs.sqlite"), "--no-metrics",
+                    "--fast-scrape", "--scrapers", "4", "--excel-procs", "0", "--smtp-workers", "1"])
+
+    assert len(list((day7_env / "data").glob("*.xlsx"))) == 4
+    assert sorted(f["email"] for _, f in enviados) == ["a@example.com", "b@example.com", "c@example.com",
+                                                        "d@example.com"]
+    for subject, fila in enviados:
+        assert subject == f"Informe para {fila['name']} - {fila['Ciudad']}"
+    # time_s es trabajo propio: no incluye la espera detrás de los correos de los demás (~0.3 s cada uno)
+    filas = (day7_env / "report.md").read_text(encoding="utf-8").splitlines()[4:]
+    tiempos = [float(f.strip("|").split("|")[3]) for f in filas]
+    assert all(0.3 <= t < 0.6 for t in tiempos), tiempos
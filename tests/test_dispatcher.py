@@ -0,0 +1,140 @@
+# tests/test_dispatcher.py
+import threading
+
+import pytest
+
+from src.day3.dispatcher import RateLimiter, TokenBucket, dispatch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(5, per=1.0, clock=clock, sleep=clock.sleep)
+    for _ in range(15):
+        bucket.acquire()
+    # 5 de ráfaga inicial + 10 a 5/s
+    assert abs(clock.now - 2.0) < 1e-9
+
+
+def test_token_bucket_rate_below_one():
+    clock = FakeClock()
+    bucket = TokenBucket(0.5, per=1.0, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    # 1 de ráfaga + 2 a 0.5/s
+    assert abs(clock.now - 4.0) < 1e-9
+    limiter = RateLimiter(per_minute=0.5, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.acquire()
+    assert abs(clock.now - 124.0) < 1e-6
+
+
+def test_token_bucket_rejects_capacity_below_one():
+    with pytest.raises(ValueError):
+        TokenBucket(5, capacity=0.5)
+
+
+def test_rate_limiter_per_minute():
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=30, clock=clock, sleep=clock.sleep)
+    for _ in range(45):
+        limiter.acquire()
+    # 30 de ráfaga + 15 a 0.5/s
+    assert abs(clock.now - 30.0) < 1e-6
+
+
+def test_rate_limiter_combines_both_limits():
+    clock = FakeClock()
+    limiter = RateLimiter(per_second=10, per_minute=20, clock=clock, sleep=clock.sleep)
+    for _ in range(10):
+        limiter.acquire()
+    assert abs(clock.now - 0.0) < 1e-6  # ráfaga permitida por ambos
+    for _ in range(20):
+        limiter.acquire()
+    # el límite por minuto manda: 10 más de ráfaga y 10 a 1/3 por segundo
+    assert abs(clock.now - 30.0) < 1e-6
+
+
+def test_dispatch_counts_are_exact_under_concurrency():
+    seen = []
+    lock = threading.Lock()
+
+    def send(i):
+        with lock:
+            seen.append(i)
+        if i % 7 == 0:
+            raise RuntimeError("fallo simulado")
+        return i % 5 != 0
+
+    result = dispatch(iter(range(1000)), send, concurrency=8)
+    expected_failed = sum(1 for i in range(1000) if i % 7 == 0 or i % 5 == 0)
+    assert result == {"sent": 1000 - expected_failed, "failed": expected_failed}
+    assert sorted(seen) == list(range(1000))
+
+
+def _write_clientes(path, n, invalid=0):
+    rows = ["nombre,email"] + [f"Cliente {i},c{i}@example.com" for i in range(n)]
+    rows += [f"Roto {i},no-es-email" for i in range(invalid)]
+    path.write_text("\n".join(rows), encoding="utf-8")
+    return path
+
+
+def test_bulk_concurrent_send_counts_are_exact(smtp_sink, tmp_path, monkeypatch):
+    from src.day3 import mailer
+    from src.day3.smtp_pool import SMTPPool
+
+    monkeypatch.setattr(mailer, "DEFAULT_FROM", "rpa@example.com")
+    clientes = _write_clientes(tmp_path / "clientes.csv", 40, invalid=3)
+    with SMTPPool(smtp_sink.host, smtp_sink.port, size=4, max_messages=100) as pool:
+        summary = mailer.send_bulk_from_csv(clientes, "email.html", "Informe - {nombre}",
+                                            pool=pool, concurrency=4)
+    assert summary["processed"] == 43
+    assert summary["sent"] == 40
+    assert summary["failed"] == 3
+    assert 1 <= summary["connections"] <= 4
+    assert len(smtp_sink.messages) == 40
+
+
+def test_bulk_dry_run_uses_scheduler(tmp_path, monkeypatch):
+    from src.day3 import mailer
+
+    monkeypatch.setattr(mailer, "DEFAULT_FROM", "rpa@example.com")
+    calls = []
+    real_dispatch = mailer.dispatch
+
+    def spy(jobs, send, concurrency=1, limiter=None):
+        calls.append(concurrency)
+        return real_dispatch(jobs, send, concurrency=concurrency, limiter=limiter)
+
+    monkeypatch.setattr(mailer, "dispatch", spy)
+    clientes = _write_clientes(tmp_path / "clientes.csv", 12, invalid=1)
+    summary = mailer.send_bulk_from_csv(clientes, "email.html", "Informe - {nombre}",
+                                        dry_run=True, concurrency=3)
+    assert calls == [3]
+    assert summary == {"processed": 13, "sent": 12, "failed": 1, "skipped": 0,
+                       "duplicates": 0, "connections": 0}
+
+
+def test_main_passes_concurrency_and_rate_options(monkeypatch, tmp_path):
+    from src.day3 import mailer
+
+    captured = {}
+    monkeypatch.setattr(mailer, "setup_logging", lambda: None)
+    monkeypatch.setattr(mailer, "send_bulk_from_csv",
+                        lambda *args, **kwargs: captured.update(kwargs))
+    mailer.main(["--dry-run", "--concurrency", "8", "--rate", "5", "--rate-per-minute", "200",
+                 "--ledger", str(tmp_path / "envios.sqlite")])
+    assert captured["concurrency"] == 8
+    assert captured["rate_per_second"] == 5.0
+    assert captured["rate_per_minute"] == 200.0
+    assert captured["dry_run"] is True
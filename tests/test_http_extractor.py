@@ -0,0 +1,62 @@
+# tests/test_http_extractor.py
+import json
+from pathlib import Path
+
+import pytest
+
+from src.day5 import scraper
+from src.day5.http_extractor import SelectoresNoEncontrados, extraer_ciudades, parsear_clima
+
+PLANTILLA = (Path(__file__).parent / "fixtures" / "clima.html").read_text(encoding="utf-8")
+
+
+def test_parser_matches_selenium_selectors():
+    html = PLANTILLA.format(ciudad="Madrid", slug="madrid", temperatura="21°", estado="Soleado &amp; calor")
+    assert parsear_clima(html) == ("21°", "Soleado & calor")
+    with pytest.raises(SelectoresNoEncontrados):
+        parsear_clima("<html><body><div>cargando...</div></body></html>")
+
+
+def test_parser_ignores_same_text_at_other_positions():
+    html = PLANTILLA.format(ciudad="M", slug="m", temperatura="21°", estado="Soleado")
+    # un <br/> y un <img> extra delante no cambian la posición de los div, uno más sí
+    html_void = html.replace('<div class="page-content">', '<br/><img src="x.png"><div class="page-content">')
+    assert parsear_clima(html_void) == ("21°", "Soleado")
+    html_desplazado = html.replace('<div class="page-content">', '<div></div><div class="page-content">')
+    with pytest.raises(SelectoresNoEncontrados):
+        parsear_clima(html_desplazado)
+
+
+def test_many_cities_concurrently_with_cap(clima_site):
+    clima_site.delay = 0.1
+    ciudades = ["Madrid", "Sevilla", "Bilbao"] * 4
+    mapa = {c: clima_site.url(c) for c in ciudades}
+    registros, errores = extraer_ciudades(ciudades, mapa, max_conexiones=3)
+    assert errores == {}
+    assert [r["Ciudad"] for r in registros] == ciudades
+    assert registros[1]["Temperatura"] == "30°" and registros[2]["Estado"] == "Lluvia"
+    assert 1 < clima_site.max_inflight <= 3
+
+
+def test_fallback_only_when_selectors_missing(clima_site):
+    llamadas = []
+
+    def fallback(ciudad, url):
+        llamadas.append((ciudad, url))
+        return {"Ciudad": ciudad, "Temperatura": "19°", "Estado": "Nublado", "Fecha": "x"}
+
+    mapa = {"Madrid": clima_site.url("madrid"), "Toledo": f"{clima_site.base_url}/roto/toledo"}
+    registros, errores = extraer_ciudades(["Madrid", "Toledo", "Lugo"], mapa, fallback=fallback)
+    assert llamadas == [("Toledo", mapa["Toledo"])]
+    assert [r["Temperatura"] for r in registros] == ["21°", "19°"]
+    assert list(errores) == ["Lugo"]  # sin URL configurada
+
+
+def test_city_mapping_is_data_driven(tmp_path, monkeypatch):
+    path = tmp_path / "ciudades.json"
+    path.write_text(json.dumps({"Sevilla": "http://ejemplo/sevilla"}), encoding="utf-8")
+    monkeypatch.setenv("CIUDADES_JSON", str(path))
+    assert scraper.url_para("sevilla") == "http://ejemplo/sevilla"
+    with pytest.raises(KeyError):
+        scraper.url_para("Madrid")
+    assert "Madrid" in scraper.cargar_ciudades(scraper.CIUDADES_JSON)
@@ -0,0 +1,41 @@
+# tests/test_ledger.py
+from src.day3.ledger import SentLedger
+from src.day3.smtp_pool import SMTPPool
+
+
+def test_ledger_records_and_dedups(tmp_path):
+    with SentLedger(tmp_path / "envios.sqlite") as ledger:
+        ledger.start_run("c1")
+        assert ledger.mark_seen("c1", "Ana@Example.com")
+        assert not ledger.mark_seen("c1", " ana@example.com ")
+        ledger.record("c1", "ana@example.com")
+        assert ledger.is_sent("c1", "ANA@example.com")
+        assert not ledger.is_sent("c2", "ana@example.com")
+    # persistente entre aperturas
+    with SentLedger(tmp_path / "envios.sqlite") as ledger:
+        assert ledger.count("c1") == 1
+
+
+def test_resume_skips_ledgered_recipients(smtp_sink, tmp_path, monkeypatch):
+    from src.day3 import mailer
+
+    monkeypatch.setattr(mailer, "DEFAULT_FROM", "rpa@example.com")
+    clientes = tmp_path / "clientes.csv"
+    rows = ["nombre,email"] + [f"Cliente {i},c{i}@example.com" for i in range(10)]
+    rows.append("Cliente 3 bis,C3@example.com")  # duplicado
+    clientes.write_text("\n".join(rows), encoding="utf-8")
+
+    with SentLedger(tmp_path / "envios.sqlite") as ledger, \
+            SMTPPool(smtp_sink.host, smtp_sink.port) as pool:
+        # primera pasada interrumpida tras 4 filas
+        first = mailer.send_bulk_from_csv(clientes, "email.html", "Hola {nombre}", pool=pool,
+                                          ledger=ledger, campaign="demo", limit=4)
+        assert first["sent"] == 4
+        resumed = mailer.send_bulk_from_csv(clientes, "email.html", "Hola {nombre}", pool=pool,
+                                            ledger=ledger, campaign="demo", resume=True)
+        assert ledger.count("demo") == 10
+
+    assert resumed["skipped"] == 4
+    assert resumed["duplicates"] == 1
+    assert resumed["sent"] == 6
+    assert len(smtp_sink.messages) == 10
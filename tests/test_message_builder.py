@@ -0,0 +1,36 @@
+# tests/test_message_builder.py
+import re
+from email.message import EmailMessage
+
+from src.day3.message_builder import CampaignMessageBuilder, simple_text_from_html
+
+
+def _legacy_message(to, subject, html, attachment):
+    msg = EmailMessage()
+    msg["From"] = "rpa@example.com"
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content(simple_text_from_html(html))
+    msg.add_alternative(html, subtype="html")
+    msg.add_attachment(attachment.read_bytes(), maintype="application",
+                       subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                       filename=attachment.name)
+    return msg
+
+
+def _without_boundaries(msg):
+    return re.sub(rb"=+\d+==", b"BOUNDARY", msg.as_bytes())
+
+
+def test_builder_matches_per_message_assembly(tmp_path):
+    attachment = tmp_path / "informe.xlsx"
+    attachment.write_bytes(bytes(range(256)) * 40)
+    builder = CampaignMessageBuilder([attachment, tmp_path / "no_existe.pdf"],
+                                     from_addr="rpa@example.com")
+    assert builder.attachment_names == ["informe.xlsx"]
+
+    for i in range(3):
+        html = f"<p>Hola Cliente {i},</p>\n<p>Adjunto   informe.</p>"
+        built = builder.build(f"c{i}@example.com", f"Informe {i}", html)
+        expected = _legacy_message(f"c{i}@example.com", f"Informe {i}", html, attachment)
+        assert _without_boundaries(built) == _without_boundaries(expected)
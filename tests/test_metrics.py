@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from tenacity import retry, stop_after_attempt, wait_none
+
+from rpa_lab.metrics import MetricsWriter, load, note_retry, percentile, stats_main, summarize
+
+
+def test_span_records_duration_fields_and_errors(tmp_path):
+    path = tmp_path / "m.jsonl"
+    with MetricsWriter(path, app="test") as metrics:
+        with metrics.span("scrape", city="Madrid", client=None) as span:
+            span["bytes"] = 10
+        with pytest.raises(ValueError):
+            with metrics.span("email_send"):
+                raise ValueError("smtp")
+    ok, err = load(path)
+    assert ok["stage"] == "scrape" and ok["city"] == "Madrid" and ok["outcome"] == "ok"
+    assert ok["bytes"] == 10 and ok["duration_s"] >= 0 and "client" not in ok
+    assert err["outcome"] == "error" and err["error"] == "ValueError"
+    assert ok["run"] == err["run"] and ok["app"] == "test"
+
+
+def test_retries_counted_on_open_span(tmp_path):
+    calls = []
+
+    @retry(wait=wait_none(), stop=stop_after_attempt(3), before_sleep=note_retry, reraise=True)
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("otra vez")
+        return "ok"
+
+    with MetricsWriter(tmp_path / "m.jsonl") as metrics:
+        with metrics.span("scrape") as span:
+            flaky()
+    assert span["retries"] == 2
+    note_retry()  # sin span abierto no hace nada
+
+
+def test_disabled_writer_writes_nothing(tmp_path):
+    with MetricsWriter(None) as metrics, metrics.span("scrape") as span:
+        pass
+    assert span["outcome"] == "ok"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_summarize_percentiles_and_throughput():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile(list(range(1, 101)), 99) == 99
+    spans = [{"run": "a", "app": "pipeline", "stage": "scrape", "ts": i, "duration_s": 0.5 + i / 10,
+              "outcome": "ok" if i else "error", "retries": 1, "bytes": 1024} for i in range(10)]
+    spans.append({"run": "b", "app": "day7", "stage": "client", "ts": 0, "duration_s": 1.0, "outcome": "ok"})
+    fila, = summarize(spans, app="pipeline")
+    assert (fila["n"], fila["errors"], fila["retries"]) == (10, 1, 10)
+    assert fila["p50_s"] == pytest.approx(0.9) and fila["p99_s"] == pytest.approx(1.4)
+    assert fila["per_s"] == pytest.approx(10 / 10.4)
+    assert [f["stage"] for f in summarize(spans, last_runs=1)] == ["client"]
+
+
+def test_stats_cli(tmp_path, capsys):
+    path = tmp_path / "m.jsonl"
+    path.write_text(json.dumps({"run": "a", "app": "day7", "stage": "client", "ts": 0,
+                                "duration_s": 0.25, "outcome": "ok"}) + "\n{roto\n", encoding="utf-8")
+    assert stats_main(["--metrics", str(path)]) == 0
+    assert "client" in capsys.readouterr().out
+    assert stats_main(["--metrics", str(path), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)[0]["p50_s"] == 0.25
+    assert stats_main(["--metrics", str(tmp_path / "no.jsonl")]) == 1
@@ -0,0 +1,42 @@
+# tests/test_notepad_rpa.py
+import pandas as pd
+import pytest
+
+from src.day4 import notepad_rpa
+
+
+@pytest.fixture
+def informe(tmp_path):
+    path = tmp_path / "informe.xlsx"
+    resumen = pd.DataFrame({"fecha": ["2024-01-01", "2024-01-02"], "categoria": ["Hogar", "Jardín"],
+                            "total_ingresos": [10.0, 25.5], "total_unidades": [1, 3]})
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        resumen.to_excel(writer, sheet_name="Resumen", index=False)
+    return path
+
+
+@pytest.mark.parametrize("backend, accion", [("clipboard", "pegar"), ("typewrite", "escribir")])
+def test_flujo_gui_con_driver_falso(informe, tmp_path, backend, accion):
+    texto = notepad_rpa.leer_resumen(informe)
+    driver = notepad_rpa.FakeDriver()
+    destino = notepad_rpa.exportar_resumen_txt(texto, backend, tmp_path / "out", driver)
+    assert driver.acciones == ["abrir", accion, "guardar_como", "cerrar"]
+    assert destino.name.startswith("Resumen_") and destino.suffix == ".txt"
+    assert destino.read_text(encoding="utf-8") == texto
+
+
+def test_backend_archivo_igual_que_gui(informe, tmp_path):
+    texto = notepad_rpa.leer_resumen(informe)
+    gui = notepad_rpa.exportar_resumen_txt(texto, "clipboard", tmp_path / "gui", notepad_rpa.FakeDriver())
+    directo = notepad_rpa.exportar_resumen_txt(texto, "archivo", tmp_path / "directo")
+    assert directo.read_bytes() == gui.read_bytes()
+
+
+def test_main_cli(informe, tmp_path, monkeypatch):
+    monkeypatch.setattr(notepad_rpa, "LOG_FILE", tmp_path / "app.log")
+    out = tmp_path / "out"
+    assert notepad_rpa.main(["--backend", "clipboard", "--driver", "fake",
+                             "--informe", str(informe), "--out-dir", str(out)]) == 0
+    assert notepad_rpa.main(["--backend", "archivo", "--informe", str(informe), "--out-dir", str(out)]) == 0
+    assert len(list(out.glob("Resumen_*.txt"))) >= 1
+    assert notepad_rpa.main(["--backend", "archivo", "--informe", str(tmp_path / "no.xlsx")]) == 1
@@ -0,0 +1,39 @@
+from src.day5.observation_store import ObservationStore, main
+
+
+def _obs(ciudad, temperatura):
+    return {"Ciudad": ciudad, "Temperatura": temperatura, "Estado": "Soleado", "Fecha": "2025-01-01 12:00:00"}
+
+
+def test_latest_respects_ttl_and_keeps_history(tmp_path):
+    with ObservationStore(tmp_path / "obs.sqlite") as store:
+        store.add([_obs("Madrid", "18°")], ts=1000)
+        store.add([_obs("Madrid", "21°"), _obs("Bilbao", "14°")], ts=2000)
+        assert store.latest("MADRID")["Temperatura"] == "21°"
+        assert store.latest("madrid", ttl=600, ahora=2500)["Temperatura"] == "21°"
+        assert store.latest("madrid", ttl=600, ahora=2700) is None
+        assert store.latest("Sevilla") is None
+        assert [o["Temperatura"] for o in store.historial("Madrid")] == ["21°", "18°"]
+
+
+def test_compact_keeps_latest_per_city(tmp_path):
+    path = tmp_path / "obs.sqlite"
+    dia = 86400
+    with ObservationStore(path) as store:
+        for i in range(5):
+            store.add([_obs("Madrid", f"{i}°")], ts=i * dia)
+        store.add([_obs("Bilbao", "14°")], ts=0)
+        assert store.compactar(dias=2, ahora=5 * dia) == 3  # Madrid 0°-2°; Bilbao conserva su única fila
+        assert [o["Temperatura"] for o in store.historial("Madrid")] == ["4°", "3°"]
+        assert store.latest("Bilbao")["Temperatura"] == "14°"
+
+
+def test_compact_cli(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.day5.observation_store.setup_logging", lambda: None)
+    assert main(["--store", str(tmp_path / "no.sqlite")]) == 1
+    with ObservationStore(tmp_path / "obs.sqlite") as store:
+        store.add([_obs("Madrid", "18°")], ts=0)
+        store.add([_obs("Madrid", "21°")], ts=1)
+    assert main(["--store", str(tmp_path / "obs.sqlite"), "--keep-days", "1"]) == 0
+    with ObservationStore(tmp_path / "obs.sqlite") as store:
+        assert len(store.historial("Madrid")) == 1
@@ -0,0 +1,126 @@
+import json
+
+import pandas as pd
+
+from rpa_lab import pipeline
+
+
+def test_parse_cities_list_and_file(tmp_path):
+    assert pipeline.parse_cities("Madrid, sevilla,,madrid") == ["Madrid", "sevilla"]
+    fichero = tmp_path / "ciudades.txt"
+    fichero.write_text("# lote\nMadrid\n\nBilbao  # norte\n", encoding="utf-8")
+    assert pipeline.parse_cities(str(fichero)) == ["Madrid", "Bilbao"]
+
+
+def test_sheet_names_are_excel_safe():
+    used = set()
+    assert pipeline._sheet_name("a/b:c", used) == "a_b_c"
+    assert pipeline._sheet_name("A/B:C", used) == "A_B_C (2)"
+    assert len(pipeline._sheet_name("x" * 40, used)) == 31
+
+
+def test_cities_one_workbook_failures_isolated(pipeline_env, clima_site):
+    rc = pipeline.main(["--cities", "Madrid,Roto,Sevilla,Lugo,Bilbao", "--concurrency", "2",
+                        "--retries", "1", "--fast-scrape", "--data-dir", str(pipeline_env)])
+    assert rc == 0
+    hojas = pd.read_excel(pipeline_env / pipeline.CITIES_REPORT, sheet_name=None)
+    assert list(hojas) == ["Madrid", "Sevilla", "Bilbao", "Errores"]
+    assert hojas["Sevilla"].loc[0, "Estado"] == "Despejado"
+    assert list(hojas["Errores"]["Ciudad"]) == ["Roto", "Lugo"]  # Lugo no tiene URL: no se cae a Madrid
+    assert clima_site.max_inflight <= 2
+
+
+def test_cities_summary_layout(pipeline_env):
+    rc = pipeline.main(["--cities", "Bilbao,Madrid", "--layout", "summary", "--retries", "1",
+                        "--fast-scrape", "--data-dir", str(pipeline_env)])
+    assert rc == 0
+    hojas = pd.read_excel(pipeline_env / pipeline.CITIES_REPORT, sheet_name=None)
+    assert list(hojas) == ["Resumen"]
+    assert list(hojas["Resumen"]["Ciudad"]) == ["Bilbao", "Madrid"]
+
+
+def test_cities_all_failed(pipeline_env):
+    rc = pipeline.main(["--cities", "Roto,Lugo", "--retries", "1", "--data-dir", str(pipeline_env)])
+    assert rc == 2
+    assert not (pipeline_env / pipeline.CITIES_REPORT).exists()
+
+
+def test_store_serves_fresh_observations(pipeline_env, clima_site):
+    args = ["--retries", "1", "--fast-scrape", "--data-dir", str(pipeline_env)]
+    assert pipeline.main(["--city", "Sevilla", *args]) == 0
+    assert pipeline.main(["--city", "sevilla", *args]) == 0
+    assert len(clima_site.requests) == 1  # segunda ejecución: observación del almacén
+    assert pd.read_excel(pipeline_env / "informe_web.xlsx").loc[0, "Estado"] == "Despejado"
+
+    assert pipeline.main(["--cities", "Sevilla,Bilbao", *args]) == 0
+    assert len(clima_site.requests) == 2  # sólo Bilbao se scrapea
+    assert pipeline.main(["--city", "Sevilla", "--ttl", "0", *args]) == 0
+    assert len(clima_site.requests) == 3
+
+
+def test_pipeline_emits_stage_metrics(pipeline_env):
+    metrics = pipeline_env.parent / "metrics.jsonl"
+    args = ["--retries", "1", "--fast-scrape", "--data-dir", str(pipeline_env), "--metrics", str(metrics)]
+    assert pipeline.main(["--city", "Bilbao", *args]) == 0
+    assert pipeline.main(["--cities", "Bilbao,Roto", *args]) == 0
+    spans = [json.loads(line) for line in metrics.read_text(encoding="utf-8").splitlines()]
+    etapas = [(s["stage"], s["outcome"]) for s in spans]
+    assert etapas[:4] == [("store_lookup", "ok"), ("scrape", "ok"), ("report_write", "ok"), ("pipeline", "ok")]
+    assert ("scrape", "error") in etapas[4:]  # Roto: 404
+    assert spans[2]["bytes"] > 0 and spans[1]["city"] == "Bilbao"
+
+
+def test_pipeline_profile_flag(pipeline_env):
+    assert pipeline.main(["--cities", "Madrid,Sevilla", "--retries", "1", "--fast-scrape", "--profile",
+                          "--data-dir", str(pipeline_env)]) == 0
+    perfil, = (pipeline_env.parent / "logs").glob("profile_*")
+    nombres = {p.name for p in perfil.iterdir()}
+    assert "summary.txt" in nombres and any(n.endswith("_report_write.prof") for n in nombres)
+    assert any(n.endswith("_scrape_Sevilla.collapsed") for n in nombres)
+
+
+def test_report_restored_from_cache_when_unchanged(pipeline_env):
+    metrics = pipeline_env.parent / "metrics.jsonl"
+    args = ["--city", "Bilbao", "--retries", "1", "--fast-scrape", "--data-dir", str(pipeline_env),
+            "--metrics", str(metrics)]
+    for extra in ([], [], ["--no-cache"]):
+        assert pipeline.main([*args, *extra]) == 0
+    hits = [json.loads(l).get("cache_hit") for l in metrics.read_text(encoding="utf-8").splitlines()
+            if json.loads(l)["stage"] == "report_write"]
+    assert hits == [False, True, False]
+
+
+def test_cities_csv_report_sends_every_sheet(pipeline_env, monkeypatch):
+    enviados = []
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+        def starttls(self):
+            pass
+
+        def login(self, user, password):
+            pass
+
+        def send_message(self, msg):
+            enviados.append(msg)
+
+    monkeypatch.setattr("smtplib.SMTP", FakeSMTP)
+    monkeypatch.setattr("dotenv.load_dotenv", lambda *a, **kw: False)
+    for var, valor in {"SMTP_HOST": "smtp.test", "SMTP_USER": "yo@test", "SMTP_PASS": "x"}.items():
+        monkeypatch.setenv(var, valor)
+
+    rc = pipeline.main(["--cities", "Madrid,Roto,Bilbao", "--format", "csv", "--send", "--retries", "1",
+                        "--fast-scrape", "--data-dir", str(pipeline_env)])
+    assert rc == 0
+    msg, = enviados
+    nombres = [a.get_filename() for a in msg.iter_attachments()]
+    assert nombres == ["informe_web_ciudades.Madrid.csv", "informe_web_ciudades.Bilbao.csv",
+                       "informe_web_ciudades.Errores.csv"]
@@ -0,0 +1,59 @@
+import threading
+
+from rpa_lab.metrics import MetricsWriter
+from rpa_lab.profiling import Profiler
+from src.day2 import transformer
+
+
+def _trabajo(n=20000):
+    return sorted(str(i) for i in range(n))
+
+
+def test_stage_writes_prof_alloc_and_collapsed(tmp_path):
+    with Profiler(tmp_path / "perfil", interval=0.001) as profiler:
+        with profiler.stage("scrape", city="San Sebastián"):
+            for _ in range(20):
+                _trabajo()
+    ficheros = sorted(p.name for p in (tmp_path / "perfil").iterdir())
+    assert ficheros == ["01_scrape_San_Sebastián.collapsed", "01_scrape_San_Sebastián.prof",
+                        "01_scrape_San_Sebastián_alloc.txt", "01_scrape_San_Sebastián_top.txt", "summary.txt"]
+    collapsed = (tmp_path / "perfil" / "01_scrape_San_Sebastián.collapsed").read_text(encoding="utf-8")
+    assert "test_profiling.py:_trabajo" in collapsed
+    stack, n = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(n) > 0 and ";" in stack
+    assert "_trabajo" in (tmp_path / "perfil" / "01_scrape_San_Sebastián_top.txt").read_text(encoding="utf-8")
+
+
+def test_concurrent_stages_skip_cprofile(tmp_path):
+    dentro = threading.Barrier(2)
+    with Profiler(tmp_path) as profiler:
+        def etapa(ciudad):
+            with profiler.stage("scrape", city=ciudad):
+                dentro.wait()
+        hilos = [threading.Thread(target=etapa, args=(c,)) for c in ("a", "b")]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+    assert "no (concurrente)" in (tmp_path / "summary.txt").read_text(encoding="utf-8")
+
+
+def test_metrics_spans_profile_only_leaf_stages(tmp_path):
+    with Profiler(tmp_path) as profiler, MetricsWriter(None, profiler=profiler) as metrics:
+        with metrics.span("pipeline", profile=False):
+            with metrics.span("report_write"):
+                _trabajo(100)
+    assert [p.name for p in tmp_path.glob("*.prof")] == ["01_report_write.prof"]
+
+
+def test_transformer_profile_flag(tmp_path, monkeypatch):
+    monkeypatch.setattr(transformer, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(transformer, "setup_logging", lambda: None)
+    monkeypatch.setattr(transformer, "CACHE_DIR", tmp_path / "cache")
+    for nombre in ("OUTPUT_EXCEL", "RECHAZADAS"):
+        monkeypatch.setattr(transformer, nombre, tmp_path / getattr(transformer, nombre).name)
+    transformer.main(["--profile", "--formato", "csv"])
+    perfil, = (tmp_path / "logs").iterdir()
+    assert sorted(p.name for p in perfil.glob("*.prof")) == [
+        "01_leer.prof", "02_transformar.prof", "03_rechazadas.prof", "04_exportar.prof"]
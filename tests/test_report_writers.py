@@ -0,0 +1,42 @@
+# tests/test_report_writers.py
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.day2.report_writers import write_report
+
+
+def _sheets():
+    datos = pd.DataFrame({
+        "fecha": ["2025-01-01", "2025-01-02", "2025-01-03"],
+        "categoria": ["Hogar", "Tecnología", np.nan],
+        "precio": [10.5, np.nan, 3.0],
+        "cantidad": [1, 2, 3],
+    })
+    resumen = pd.DataFrame({"fecha": ["2025-01-01"], "categoria": ["Hogar"],
+                            "total_ingresos": [10.5], "total_unidades": [1]})
+    return {"Datos": datos, "Resumen": resumen}
+
+
+@pytest.mark.parametrize("backend", ["openpyxl", "xlsx-stream"])
+def test_xlsx_backends_keep_sheet_layout(tmp_path, backend):
+    sheets = _sheets()
+    out = write_report(sheets, tmp_path / "informe.xlsx", backend)
+    assert out == [tmp_path / "informe.xlsx"]
+    leidas = pd.read_excel(out[0], sheet_name=None)
+    assert list(leidas) == ["Datos", "Resumen"]
+    for name, df in sheets.items():
+        pdt.assert_frame_equal(leidas[name], df, check_dtype=False)
+
+
+def test_csv_backend_writes_one_file_per_sheet(tmp_path):
+    out = write_report(_sheets(), tmp_path / "informe.xlsx", "csv")
+    assert [p.name for p in out] == ["informe.Datos.csv", "informe.Resumen.csv"]
+    single = write_report({"Resumen": _sheets()["Resumen"]}, tmp_path / "solo.xlsx", "csv")
+    assert [p.name for p in single] == ["solo.Resumen.csv"]  # el nombre no depende del número de hojas
+
+
+def test_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        write_report(_sheets(), tmp_path / "x.xlsx", "xls")
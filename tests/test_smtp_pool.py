@@ -0,0 +1,101 @@
+# tests/test_smtp_pool.py
+import smtplib
+import threading
+from email.message import EmailMessage
+
+import pytest
+
+from src.day3.smtp_pool import SMTPPool
+
+
+def _msg(i):
+    msg = EmailMessage()
+    msg["From"] = "rpa@example.com"
+    msg["To"] = f"cliente{i}@example.com"
+    msg["Subject"] = f"Prueba {i}"
+    msg.set_content("hola")
+    return msg
+
+
+def test_pool_reuses_and_recycles_connections(smtp_sink):
+    with SMTPPool(smtp_sink.host, smtp_sink.port, max_messages=4) as pool:
+        for i in range(10):
+            pool.send_message(_msg(i))
+    assert len(smtp_sink.messages) == 10
+    assert pool.connections_opened == 3  # 4 + 4 + 2
+
+
+def test_pool_reconnects_when_server_drops(smtp_sink_factory):
+    sink = smtp_sink_factory(drop_after=3)
+    with SMTPPool(sink.host, sink.port, max_messages=100) as pool:
+        for i in range(7):
+            pool.send_message(_msg(i))
+    assert len(sink.messages) == 7
+    assert pool.reconnects == 2
+
+
+def test_pool_treats_421_as_disconnect(smtp_sink_factory):
+    sink = smtp_sink_factory(replies_421=1)
+    with SMTPPool(sink.host, sink.port) as pool:
+        for i in range(3):
+            pool.send_message(_msg(i))
+    assert len(sink.messages) == 3
+    assert pool.reconnects == 1
+
+
+def test_failed_reconnect_does_not_return_dead_connection(smtp_sink_factory):
+    sink = smtp_sink_factory(drop_after=1)
+    calls = []
+
+    def factory(*args, **kwargs):
+        calls.append(args)
+        if len(calls) > 1:
+            raise smtplib.SMTPConnectError(554, "no disponible")
+        return smtplib.SMTP(*args, **kwargs)
+
+    pool = SMTPPool(sink.host, sink.port, smtp_factory=factory)
+    pool.send_message(_msg(0))
+    with pytest.raises(smtplib.SMTPConnectError):
+        pool.send_message(_msg(1))
+    assert pool._idle.empty()
+
+
+
+def test_connection_checked_in_after_close_is_closed(smtp_sink):
+    enviando, seguir = threading.Event(), threading.Event()
+    servidores = []
+
+    class LentoSMTP(smtplib.SMTP):
+        def send_message(self, msg, *args, **kwargs):
+            enviando.set()
+            seguir.wait(5)
+            return super().send_message(msg, *args, **kwargs)
+
+    def factory(*args, **kwargs):
+        servidores.append(LentoSMTP(*args, **kwargs))
+        return servidores[-1]
+
+    pool = SMTPPool(smtp_sink.host, smtp_sink.port, smtp_factory=factory)
+    hilo = threading.Thread(target=pool.send_message, args=(_msg(0),))
+    hilo.start()
+    assert enviando.wait(5)
+    pool.close()  # el envío sigue en curso en el otro hilo
+    seguir.set()
+    hilo.join(5)
+    assert len(smtp_sink.messages) == 1
+    assert pool._idle.empty()
+    assert servidores[0].sock is None  # cerrada al devolverse, no re-encolada
+
+def test_bulk_reports_connections(smtp_sink, tmp_path, monkeypatch):
+    from src.day3 import mailer
+
+    monkeypatch.setattr(mailer, "DEFAULT_FROM", "rpa@example.com")
+    clientes = tmp_path / "clientes.csv"
+    rows = ["nombre,email"] + [f"Cliente {i},c{i}@example.com" for i in range(5)] + ["Sin Email,"]
+    clientes.write_text("\n".join(rows), encoding="utf-8")
+
+    with SMTPPool(smtp_sink.host, smtp_sink.port, max_messages=2) as pool:
+        summary = mailer.send_bulk_from_csv(clientes, "email.html", "Informe - {nombre}", pool=pool)
+    assert summary == {"processed": 6, "sent": 5, "failed": 1, "skipped": 0,
+                       "duplicates": 0, "connections": 3}
+    assert len(smtp_sink.messages) == 5
@@ -0,0 +1,33 @@
+# tests/test_startup.py
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _loaded(code: str) -> str:
+    res = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr
+    return res.stdout.strip()
+
+
+def test_pipeline_import_is_light():
+    heavy = ("pandas", "tenacity", "dotenv", "smtplib", "selenium", "openpyxl")
+    out = _loaded("import sys, logging, rpa_lab.pipeline; "
+                  f"print([m for m in {heavy!r} if m in sys.modules], logging.getLogger().handlers)")
+    assert out == "[] []"
+
+
+def test_pipeline_help_without_heavy_imports():
+    res = subprocess.run([sys.executable, "-X", "importtime", "-m", "rpa_lab", "pipeline", "--help"],
+                         cwd=ROOT, capture_output=True, text=True)
+    assert res.returncode == 0
+    assert "--data-dir" in res.stdout
+    assert "| pandas" not in res.stderr and "| tenacity" not in res.stderr
+
+
+def test_day7_import_without_display():
+    out = _loaded("import sys, logging, src.day7.main; "
+                  "print('pyautogui' in sys.modules, logging.getLogger('day7').handlers)")
+    assert out == "False []"
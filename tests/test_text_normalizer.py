@@ -0,0 +1,23 @@
+# tests/test_text_normalizer.py
+import random
+
+from src.day1.processor import limpiar_texto
+from src.day1.text_normalizer import _strip_marks_nfd
+
+
+def _reference(texto):
+    return _strip_marks_nfd(texto.strip())
+
+
+def test_matches_reference_on_corpus():
+    corpus = [
+        "", "   ", "Hola mundo", "  Árbol, pingüino y ñandú \n", "Ça va? Œuvre, Ångström",
+        "é combinado", "Straße ǅemal Ǆ", "Ελληνικά ά", "Привет й", "한국어 텍스트",
+        "ﬁ ligadura", "ཀཱི tibetano", "a॒॑b", "𝒜 mates 😀",
+        "\U0001d165\U0001d16e\U0001d166 música",
+    ]
+    rng = random.Random(1234)
+    pool = [chr(cp) for cp in range(0x20, 0x3000) if not 0xd800 <= cp <= 0xdfff]
+    corpus += ["".join(rng.choice(pool) for _ in range(rng.randint(1, 40))) for _ in range(2000)]
+    for texto in corpus:
+        assert limpiar_texto(texto) == _reference(texto), repr(texto)
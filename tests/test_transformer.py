@@ -0,0 +1,129 @@
+# tests/test_transformer.py
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.day2 import transformer
+
+
+def _legacy(df):
+    """Transformación original (agregado con lambda por grupo)."""
+    df = df.copy()
+    df['precio'] = pd.to_numeric(df['precio'], errors='coerce')
+    df['cantidad'] = pd.to_numeric(df['cantidad'], errors='coerce')
+    cols = ['fecha', 'categoria', 'producto', 'precio', 'cantidad']
+    invalid_rows = df[df[cols].isnull().any(axis=1)]
+    valid_rows = df.dropna(subset=cols).copy()
+    valid_rows['categoria'] = valid_rows['categoria'].str.strip().str.title()
+    valid_rows['producto'] = valid_rows['producto'].str.strip().str.title()
+    resumen = (
+        valid_rows
+        .groupby(['fecha', 'categoria'])
+        .agg(total_ingresos=('precio', lambda x: (x * valid_rows.loc[x.index, 'cantidad']).sum()),
+             total_unidades=('cantidad', 'sum'))
+        .reset_index()
+    )
+    return valid_rows, invalid_rows, resumen
+
+
+def _check(df):
+    valid, invalid, resumen = transformer.transformar(df)
+    exp_valid, exp_invalid, exp_resumen = _legacy(df)
+    pdt.assert_frame_equal(valid, exp_valid)
+    pdt.assert_frame_equal(invalid.drop(columns="motivo"), exp_invalid)
+    pdt.assert_frame_equal(resumen, exp_resumen)
+
+
+def test_matches_legacy_on_repo_sample():
+    _check(transformer.leer_ventas(transformer.INPUT_CSV))
+
+
+def test_matches_legacy_on_synthetic_frame():
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame({
+        "fecha": rng.choice(["2025-01-01", "2025-01-02", "2025-01-03", None], n),
+        "categoria": rng.choice([" hogar", "Tecnología ", "JARDÍN"], n),
+        "producto": rng.choice(["silla", "mesa ", "lámpara"], n),
+        "precio": rng.choice(["10", "20.5", "abc", "7"], n),
+        "cantidad": rng.integers(0, 9, n).astype(str),
+    })
+    _check(df)
+
+
+def test_chunked_ingestion_matches_in_memory(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 3000
+    df = pd.DataFrame({
+        "fecha": rng.choice(["2025-01-01", "2025-01-02", "2025-01-03"], n),
+        "categoria": rng.choice([" hogar", "Tecnología ", "JARDÍN", "Hogar"], n),
+        "producto": rng.choice(["silla", "mesa ", "lámpara"], n),
+        "precio": rng.choice(["10", "20", "abc", "7", ""], n),
+        "cantidad": rng.integers(0, 9, n).astype(str),
+    })
+    src = tmp_path / "ventas.csv"
+    df.to_csv(src, index=False)
+
+    valid, invalid, resumen = transformer.transformar(transformer.leer_ventas(src))
+    chunked, n_validas, n_rechazadas = transformer.transformar_por_chunks(
+        src, chunksize=50, rechazadas=tmp_path / "rechazadas.csv", datos_csv=tmp_path / "datos.csv")
+
+    assert (n_validas, n_rechazadas) == (len(valid), len(invalid))
+    pdt.assert_frame_equal(chunked, resumen, check_dtype=False)
+    assert len(pd.read_csv(tmp_path / "rechazadas.csv")) == len(invalid)
+    assert len(pd.read_csv(tmp_path / "datos.csv")) == len(valid)
+
+
+def test_incremental_store_matches_full_recompute(tmp_path):
+    from src.day2.agg_store import AggregateStore
+
+    src = tmp_path / "ventas.csv"
+    lines = transformer.INPUT_CSV.read_text(encoding="utf-8-sig").splitlines()
+    src.write_text("\n".join(lines[:3]) + "\n", encoding="utf-8")
+
+    with AggregateStore(tmp_path / "estado.sqlite") as store:
+        transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv")
+        # llegan las filas del día siguiente (incluida una inválida)
+        with open(src, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines[3:]) + "\n2025-01-03, hogar ,Mesa,15.5,4\n")
+        incremental = transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv")
+        # sin datos nuevos no cambia nada
+        pdt.assert_frame_equal(
+            transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv"), incremental)
+
+    completo = transformer.transformar(transformer.leer_ventas(src))[2]
+    assert transformer.resumenes_iguales(incremental, completo)
+    assert len(pd.read_csv(tmp_path / "rechazadas.csv")) == 1
+
+
+def test_incremental_waits_for_half_written_line(tmp_path):
+    from src.day2.agg_store import AggregateStore
+
+    src = tmp_path / "ventas.csv"
+    lines = transformer.INPUT_CSV.read_text(encoding="utf-8-sig").splitlines()
+    src.write_text("\n".join(lines[:3]) + "\n2025-01-03, hogar ,Me", encoding="utf-8")  # escritor a mitad de fila
+
+    with AggregateStore(tmp_path / "estado.sqlite") as store:
+        transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv")
+        with open(src, "a", encoding="utf-8") as f:
+            f.write("sa,15.5,4\n")
+        incremental = transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv")
+
+    completo = transformer.transformar(transformer.leer_ventas(src))[2]
+    assert transformer.resumenes_iguales(incremental, completo)
+
+
+def test_incremental_detects_edits_beyond_first_block(tmp_path):
+    from src.day2.agg_store import AggregateStore
+
+    src = tmp_path / "ventas.csv"
+    fila = "2025-01-01,hogar,Mesa,10,1\n"
+    src.write_text("fecha,categoria,producto,precio,cantidad\n" + fila * 400, encoding="utf-8")  # > 4 KiB
+    with AggregateStore(tmp_path / "estado.sqlite") as store:
+        transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv")
+        datos = src.read_bytes()
+        src.write_bytes(datos[:-len(fila)] + fila.replace(",10,", ",90,").encode())  # mismo tamaño, al final
+        with pytest.raises(ValueError, match="--rebuild"):
+            transformer.actualizar_incremental(store, src, tmp_path / "rechazadas.csv")
+
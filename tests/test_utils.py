@@ -7,3 +7,7 @@ def test_filename_contains_name_and_timestamp():
     fn = filename_for_client(name)
     assert "Ana_Lopez" in fn or "Ana_Lopez" in fn  # basic check
     assert re.search(r"\d{8}_\d{6}\.xlsx$", fn)
+
+def test_filename_tag_separates_clients_with_same_sanitized_name():
+    a, b = filename_for_client("Ana Pérez", 0), filename_for_client("Ana-Pérez", 1)
+    assert a != b and a.endswith("_0.xlsx") and b.endswith("_1.xlsx")
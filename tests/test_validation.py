@@ -0,0 +1,77 @@
+# tests/test_validation.py
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.day2 import transformer
+from src.day2.validation import EsquemaCompilado, cargar_esquema
+
+
+def _ventas():
+    return pd.DataFrame({
+        "fecha": ["2024-01-01", "2024-13-01", None, "2024-01-03"],
+        "categoria": ["Hogar", " hogar ", "Jardín", "Coches"],
+        "producto": ["Silla", "Mesa", "Maceta", "Rueda"],
+        "precio": ["10", "abc", "5", "-1"],
+        "cantidad": ["1", "2", None, "3"],
+    })
+
+
+ESQUEMA = {
+    "fecha": {"requerido": True, "formato_fecha": "%Y-%m-%d"},
+    "categoria": {"requerido": True, "valores": ["Hogar", "Jardín"]},
+    "producto": {"requerido": True},
+    "precio": {"requerido": True, "tipo": "numerico", "min": 0},
+    "cantidad": {"requerido": True, "tipo": "numerico", "max": 100},
+}
+
+
+def test_mascara_motivos_y_conteos():
+    esquema = EsquemaCompilado(ESQUEMA)
+    df, mask = esquema.evaluar(_ventas())
+    assert mask.dtype == np.uint64
+    assert mask[0] == 0
+    assert esquema.motivos(mask) == [
+        "",
+        "fecha:formato_fecha;precio:numerico",
+        "fecha:requerido;cantidad:requerido",
+        "categoria:valores;precio:min",
+    ]
+    conteos = esquema.conteos(mask)
+    assert conteos["fecha:requerido"] == 1
+    assert conteos["precio:numerico"] == 1
+    assert conteos["categoria:valores"] == 1
+    assert conteos["cantidad:max"] == 0
+    assert df["precio"].dtype.kind == "f"
+
+
+def test_validar_detallado_anade_motivo(tmp_path):
+    ruta = tmp_path / "esquema.json"
+    ruta.write_text(json.dumps(ESQUEMA), encoding="utf-8")
+    esquema = EsquemaCompilado(cargar_esquema(ruta))
+    valid, invalid, mask, conteos = transformer.validar_detallado(_ventas(), esquema)
+    assert list(valid.index) == [0]
+    assert list(invalid.index) == [1, 2, 3]
+    assert invalid["motivo"].tolist() == esquema.motivos(mask[mask != 0])
+    assert sum(conteos.values()) == 6
+
+
+def test_esquema_por_defecto_solo_nulos_y_numericos():
+    _, invalid = transformer.validar(_ventas())
+    assert invalid["motivo"].tolist() == ["precio:numerico", "fecha:requerido;cantidad:requerido"]
+
+
+def test_reglas_desconocidas():
+    with pytest.raises(ValueError):
+        EsquemaCompilado({"precio": {"minimo": 0}})
+
+
+def test_min_max_exigen_columna_numerica():
+    with pytest.raises(ValueError, match="numerico"):
+        EsquemaCompilado({"categoria": {"min": 0}})
+    with pytest.raises(ValueError, match="número"):
+        EsquemaCompilado({"precio": {"tipo": "numerico", "max": "100"}})
+    df, mask = EsquemaCompilado({"precio": {"tipo": "numerico", "min": 0}}).evaluar(_ventas())
+    assert mask.tolist() == [0, 1, 0, 2]  # "abc" falla numerico, no min